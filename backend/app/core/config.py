@@ -11,6 +11,7 @@ class Settings(BaseSettings):
 
     mongo_uri: str = Field(default="mongodb://localhost:27017")
     mongo_db_name: str = Field(default="expense_manager")
+    mongo_ensure_indexes: bool = Field(default=True)
 
     jwt_secret_key: str = Field(default="change-me")
     jwt_algorithm: str = Field(default="HS256")
@@ -20,9 +21,75 @@ class Settings(BaseSettings):
 
     restcountries_url: str = Field(default="https://restcountries.com/v3.1/all?fields=name,currencies,cca2")
     currency_api_base_url: str = Field(default="https://api.exchangerate-api.com/v4/latest")
+    currency_pivot: str = Field(default="USD")
     currency_cache_ttl_minutes: int = Field(default=720)
+    currency_cache_stale_max_minutes: int = Field(default=60)
+    currency_history_base_url: str = Field(default="https://api.frankfurter.app")
+    currency_history_max_gap_days: int = Field(default=7)
+    currency_history_batch_days: int = Field(default=90)
+    currency_history_cache_max_entries: int = Field(default=3650)
+    currency_history_retry_seconds: float = Field(default=300.0)
+    country_snapshot_path: str = Field(default="data/country_currencies.json")
+    country_index_refresh_hours: int = Field(default=24)
+    country_index_offline: bool = Field(default=False)
+
+    http_timeout_seconds: float = Field(default=10.0)
+    http_connect_timeout_seconds: float = Field(default=5.0)
+    http_max_connections: int = Field(default=20)
+    http_max_keepalive_connections: int = Field(default=10)
+    http_keepalive_expiry_seconds: float = Field(default=30.0)
+    http_enable_http2: bool = Field(default=True)
+    http_retries: int = Field(default=2)
+    http_retry_backoff_seconds: float = Field(default=0.5)
 
     password_min_length: int = Field(default=8)
+    password_hash_workers: int = Field(default=4)
+    password_hash_queue_size: int = Field(default=64)
+    password_hash_retry_after_seconds: int = Field(default=1)
+
+    token_cache_enabled: bool = Field(default=True)
+    token_cache_max_entries: int = Field(default=10_000)
+
+    user_cache_enabled: bool = Field(default=True)
+    user_cache_ttl_seconds: float = Field(default=60.0)
+    user_cache_max_entries: int = Field(default=10_000)
+
+    ocr_workers: int = Field(default=0)
+    ocr_queue_size: int = Field(default=16)
+    ocr_timeout_seconds: float = Field(default=30.0)
+    ocr_retry_after_seconds: int = Field(default=5)
+    ocr_max_upload_bytes: int = Field(default=20 * 1024 * 1024)
+    ocr_spool_threshold_bytes: int = Field(default=1024 * 1024)
+    ocr_max_batch_files: int = Field(default=25)
+    ocr_max_pages: int = Field(default=50)
+    ocr_pdf_dpi: int = Field(default=200)
+    ocr_preprocess_enabled: bool = Field(default=True)
+    ocr_max_dimension: int = Field(default=2000)
+    ocr_grayscale: bool = Field(default=True)
+    ocr_binarize: bool = Field(default=True)
+    ocr_binarize_threshold: int = Field(default=0)
+    ocr_crop_to_receipt: bool = Field(default=False)
+    ocr_cache_enabled: bool = Field(default=True)
+    ocr_cache_ttl_days: int = Field(default=30)
+    ocr_cache_max_entries: int = Field(default=50_000)
+    ocr_job_ttl_minutes: int = Field(default=60)
+    ocr_job_event_timeout_seconds: float = Field(default=300.0)
+
+    company_cache_enabled: bool = Field(default=True)
+    company_cache_ttl_seconds: float = Field(default=60.0)
+    company_cache_max_entries: int = Field(default=10_000)
+
+    org_tree_cache_ttl_seconds: float = Field(default=300.0)
+    org_tree_cache_max_entries: int = Field(default=1000)
+
+    approval_rule_cache_ttl_seconds: float = Field(default=30.0)
+    approval_rule_cache_max_entries: int = Field(default=1000)
+
+    page_max_limit: int = Field(default=500)
+
+    expense_import_chunk_size: int = Field(default=500)
+    expense_import_max_rows: int = Field(default=10_000)
+    expense_export_batch_size: int = Field(default=1000)
 
     class Config:
         env_file = ".env"
@@ -5,10 +5,19 @@ from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.utils.executor import BoundedExecutor
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop.
+password_executor = BoundedExecutor(
+    "password_hashing",
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_queue_size,
+    retry_after_seconds=settings.password_hash_retry_after_seconds,
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -18,6 +27,14 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_executor.run(get_password_hash, password)
+
+
 def create_access_token(subject: str, additional_claims: Dict[str, Any] | None = None, expires_minutes: int | None = None) -> str:
     expire_minutes = expires_minutes or settings.access_token_expire_minutes
     expire = datetime.now(timezone.utc) + timedelta(minutes=expire_minutes)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+from app.db.client import get_collection
+from app.db.repositories.approval_rule_repository import ApprovalRuleRepository
+from app.db.repositories.company_repository import CompanyRepository
+from app.db.repositories.exchange_rate_repository import ExchangeRateRepository
+from app.db.repositories.expense_repository import ExpenseRepository
+from app.db.repositories.expense_rollup_repository import ExpenseRollupRepository
+from app.db.repositories.ocr_job_repository import OCRJobRepository
+from app.db.repositories.ocr_result_repository import OCRResultRepository
+from app.db.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _index_matches(existing: dict[str, Any], declared: dict[str, Any]) -> bool:
+    if list(existing.get("key", [])) != list(declared["key"].items()):
+        return False
+    return all(existing.get(option) == declared.get(option) for option in _COMPARED_OPTIONS)
+
+
+async def reconcile_indexes(collection: Any, indexes: list[IndexModel]) -> list[str]:
+    """Create missing indexes and rebuild any whose definition has drifted.
+
+    Indexes are matched by name, so the call is idempotent and safe to run on
+    every startup. Returns the names of the indexes that were (re)created.
+    """
+    if not indexes:
+        return []
+    existing = await collection.index_information()
+    to_create: list[IndexModel] = []
+    for index in indexes:
+        declared = index.document
+        current = existing.get(declared["name"])
+        if current is not None and _index_matches(current, declared):
+            continue
+        if current is not None:
+            logger.info("Dropping outdated index %s.%s", collection.name, declared["name"])
+            await collection.drop_index(declared["name"])
+        to_create.append(index)
+    if to_create:
+        await collection.create_indexes(to_create)
+    return [index.document["name"] for index in to_create]
+
+
+REPOSITORIES = [
+    UserRepository,
+    CompanyRepository,
+    ExpenseRepository,
+    ApprovalRuleRepository,
+    ExpenseRollupRepository,
+    ExchangeRateRepository,
+    OCRJobRepository,
+    OCRResultRepository,
+]
+
+
+async def ensure_indexes() -> None:
+    for repository in REPOSITORIES:
+        collection = get_collection(repository.collection_name)
+        try:
+            created = await reconcile_indexes(collection, repository.indexes)
+        except OperationFailure as exc:
+            logger.error("Failed to reconcile indexes for %s: %s", repository.collection_name, exc)
+            continue
+        if created:
+            logger.info("Created indexes on %s: %s", repository.collection_name, ", ".join(created))
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+
+# Placeholder values for declaring query shapes; only the shape matters to explain().
+SAMPLE_ID = ObjectId()
+SAMPLE_COMPANY = str(ObjectId())
+SAMPLE_USER = str(ObjectId())
+SAMPLE_DATE = datetime(2024, 1, 1)
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A query a repository method sends, declared beside the repository's ``indexes``.
+
+    ``name`` is the method name, optionally followed by a variant in
+    parentheses. ``scripts.check_query_plans`` explains every declared shape;
+    ``collection_scan`` marks the few that read a whole collection on purpose.
+    """
+
+    name: str
+    filter: dict[str, Any]
+    sort: list[tuple[str, int]] = field(default_factory=list)
+    collection_scan: bool = False
+
+    @property
+    def method(self) -> str:
+        return self.name.split(" ", 1)[0]
@@ -3,14 +3,27 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
 
 from app.db.client import get_collection
+from app.db.query_shapes import SAMPLE_COMPANY, SAMPLE_ID, QueryShape
 
 
 class ApprovalRuleRepository:
+    collection_name = "approval_rules"
+    indexes: list[IndexModel] = [
+        IndexModel([("company_id", ASCENDING), ("is_active", ASCENDING)], name="company_active"),
+    ]
+    query_shapes: list[QueryShape] = [
+        QueryShape("get_rule_by_id", {"_id": SAMPLE_ID}),
+        QueryShape("get_rules_by_ids", {"_id": {"$in": [SAMPLE_ID]}}),
+        QueryShape("list_rules_for_company", {"company_id": SAMPLE_COMPANY}),
+        QueryShape("list_active_rules_for_company", {"company_id": SAMPLE_COMPANY, "is_active": True}),
+    ]
+
     @property
     def collection(self):
-        return get_collection("approval_rules")
+        return get_collection(self.collection_name)
 
     async def create_rule(self, rule_data: dict) -> str:
         now = datetime.now(timezone.utc)
@@ -24,6 +37,13 @@ class ApprovalRuleRepository:
             return None
         return await self.collection.find_one({"_id": ObjectId(rule_id)})
 
+    async def get_rules_by_ids(self, rule_ids: list[str]) -> list[dict]:
+        valid_ids = [ObjectId(rule_id) for rule_id in rule_ids if ObjectId.is_valid(rule_id)]
+        if not valid_ids:
+            return []
+        cursor = self.collection.find({"_id": {"$in": valid_ids}})
+        return [doc async for doc in cursor]
+
     async def list_rules_for_company(self, company_id: str) -> list[dict]:
         cursor = self.collection.find({"company_id": company_id})
         return [doc async for doc in cursor]
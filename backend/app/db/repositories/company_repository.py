@@ -3,14 +3,23 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from bson import ObjectId
+from pymongo import IndexModel
 
 from app.db.client import get_collection
+from app.db.query_shapes import SAMPLE_ID, QueryShape
 
 
 class CompanyRepository:
+    collection_name = "companies"
+    indexes: list[IndexModel] = []
+    query_shapes: list[QueryShape] = [
+        QueryShape("get_company_by_id", {"_id": SAMPLE_ID}),
+        QueryShape("list_companies", {}, collection_scan=True),
+    ]
+
     @property
     def collection(self):
-        return get_collection("companies")
+        return get_collection(self.collection_name)
 
     async def create_company(self, company_data: dict) -> str:
         now = datetime.now(timezone.utc)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+
+from app.db.client import get_collection
+from app.db.query_shapes import SAMPLE_DATE, QueryShape
+from app.utils.serializers import to_mongo_date
+
+
+class ExchangeRateRepository:
+    """Daily pivot rate tables, one document per ``(pivot, date)``."""
+
+    collection_name = "exchange_rates"
+    indexes: list[IndexModel] = [
+        IndexModel([("pivot", ASCENDING), ("date", ASCENDING)], name="pivot_date", unique=True),
+    ]
+    query_shapes: list[QueryShape] = [
+        QueryShape(
+            "get_table_on_or_before",
+            {"pivot": "USD", "date": {"$gte": SAMPLE_DATE, "$lte": SAMPLE_DATE + timedelta(days=7)}},
+            [("date", DESCENDING)],
+        ),
+        QueryShape(
+            "list_tables",
+            {"pivot": "USD", "date": {"$gte": SAMPLE_DATE, "$lte": SAMPLE_DATE + timedelta(days=90)}},
+            [("date", ASCENDING)],
+        ),
+    ]
+
+    @property
+    def collection(self):
+        return get_collection(self.collection_name)
+
+    async def upsert_tables(self, pivot: str, tables: dict[date, dict[str, float]], source: str) -> int:
+        """Store each day's ``{code: rate}`` table, replacing whatever was recorded for that day."""
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {"pivot": pivot, "date": to_mongo_date(day)},
+                {"$set": {"rates": rates, "source": source, "fetched_at": now}},
+                upsert=True,
+            )
+            for day, rates in tables.items()
+        ]
+        if not operations:
+            return 0
+        result = await self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    async def get_table_on_or_before(self, pivot: str, day: date, max_gap_days: int) -> dict | None:
+        """Return the latest table dated ``day`` or up to ``max_gap_days`` earlier (weekends and holidays have none)."""
+        return await self.collection.find_one(
+            {
+                "pivot": pivot,
+                "date": {"$lte": to_mongo_date(day), "$gte": to_mongo_date(day - timedelta(days=max_gap_days))},
+            },
+            {"_id": 0, "date": 1, "rates": 1},
+            sort=[("date", DESCENDING)],
+        )
+
+    async def list_tables(self, pivot: str, start: date, end: date) -> list[dict]:
+        cursor = self.collection.find(
+            {"pivot": pivot, "date": {"$gte": to_mongo_date(start), "$lte": to_mongo_date(end)}},
+            {"_id": 0, "date": 1, "rates": 1},
+        ).sort("date", ASCENDING)
+        return [doc async for doc in cursor]
@@ -1,16 +1,73 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from typing import Any
 
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
 
 from app.db.client import get_collection
+from app.db.query_shapes import SAMPLE_COMPANY, SAMPLE_DATE, SAMPLE_ID, SAMPLE_USER, QueryShape
+from app.utils.pagination import KEYSET_SORT, KeysetPosition, find_page
+from app.utils.serializers import to_mongo_date
 
 
 class ExpenseRepository:
+    collection_name = "expenses"
+    indexes: list[IndexModel] = [
+        IndexModel([("company_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="company_created"),
+        IndexModel(
+            [("company_id", ASCENDING), ("employee_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+            name="company_employee_created",
+        ),
+        IndexModel(
+            [("company_id", ASCENDING), ("status", ASCENDING), ("current_approver_id", ASCENDING), ("created_at", ASCENDING)],
+            name="company_status_approver_created",
+        ),
+        IndexModel(
+            [("company_id", ASCENDING), ("status", ASCENDING), ("expense_date", ASCENDING), ("_id", ASCENDING)],
+            name="company_status_expense_date",
+        ),
+        IndexModel(
+            [("company_id", ASCENDING), ("expense_date", ASCENDING), ("_id", ASCENDING)],
+            name="company_expense_date",
+        ),
+    ]
+    query_shapes: list[QueryShape] = [
+        QueryShape("get_expense_by_id", {"_id": SAMPLE_ID}),
+        QueryShape("list_expenses_for_company", {"company_id": SAMPLE_COMPANY}, KEYSET_SORT),
+        QueryShape("list_expenses_for_employee", {"company_id": SAMPLE_COMPANY, "employee_id": SAMPLE_USER}, KEYSET_SORT),
+        QueryShape(
+            "iter_expenses_for_export",
+            {"company_id": SAMPLE_COMPANY, "expense_date": {"$gte": SAMPLE_DATE, "$lte": datetime(2024, 12, 31)}},
+            [("expense_date", ASCENDING), ("_id", ASCENDING)],
+        ),
+        QueryShape(
+            "iter_expenses_for_export (status filter)",
+            {
+                "company_id": SAMPLE_COMPANY,
+                "status": "approved",
+                "expense_date": {"$gte": SAMPLE_DATE, "$lte": datetime(2024, 12, 31)},
+            },
+            [("expense_date", ASCENDING), ("_id", ASCENDING)],
+        ),
+        QueryShape(
+            "list_pending_for_approver",
+            {"company_id": SAMPLE_COMPANY, "status": "pending", "current_approver_id": SAMPLE_USER},
+            [("created_at", ASCENDING)],
+        ),
+        QueryShape("update_expense", {"_id": SAMPLE_ID, "status": "pending", "version": 0}),
+        QueryShape("apply_approval", {"_id": SAMPLE_ID, "status": "pending", "version": 0, "current_step_index": 0}),
+        QueryShape("apply_approvals", {"_id": {"$in": [SAMPLE_ID]}, "approval_history.id": {"$in": [str(SAMPLE_ID)]}}),
+        QueryShape(
+            "list_pending_by_ids_for_approver",
+            {"_id": {"$in": [SAMPLE_ID]}, "company_id": SAMPLE_COMPANY, "status": "pending", "current_approver_id": SAMPLE_USER},
+        ),
+    ]
+
     @property
     def collection(self):
-        return get_collection("expenses")
+        return get_collection(self.collection_name)
 
     async def create_expense(self, expense_data: dict) -> str:
         now = datetime.now(timezone.utc)
@@ -19,41 +76,148 @@ class ExpenseRepository:
         result = await self.collection.insert_one(expense_data)
         return str(result.inserted_id)
 
+    async def create_expenses(self, expenses: list[dict]) -> list[str]:
+        now = datetime.now(timezone.utc)
+        for expense_data in expenses:
+            expense_data.setdefault("created_at", now)
+            expense_data.setdefault("updated_at", now)
+        result = await self.collection.insert_many(expenses, ordered=False)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+
     async def get_expense_by_id(self, expense_id: str) -> dict | None:
         if not ObjectId.is_valid(expense_id):
             return None
         return await self.collection.find_one({"_id": ObjectId(expense_id)})
 
-    async def list_expenses_for_company(self, company_id: str) -> list[dict]:
-        cursor = self.collection.find({"company_id": company_id})
-        return [doc async for doc in cursor]
+    async def list_expenses_for_company(
+        self,
+        company_id: str,
+        limit: int | None = None,
+        after: KeysetPosition | None = None,
+        projection: dict | None = None,
+    ) -> list[dict]:
+        return await find_page(self.collection, {"company_id": company_id}, limit, after, projection)
 
-    async def list_expenses_for_employee(self, company_id: str, employee_id: str) -> list[dict]:
-        cursor = self.collection.find({"company_id": company_id, "employee_id": employee_id})
-        return [doc async for doc in cursor]
+    async def list_expenses_for_employee(
+        self,
+        company_id: str,
+        employee_id: str,
+        limit: int | None = None,
+        after: KeysetPosition | None = None,
+        projection: dict | None = None,
+    ) -> list[dict]:
+        query = {"company_id": company_id, "employee_id": employee_id}
+        return await find_page(self.collection, query, limit, after, projection)
 
-    async def list_pending_for_approver(self, company_id: str) -> list[dict]:
-        cursor = self.collection.find({
-            "company_id": company_id,
-            "status": "pending",
-        })
+    def iter_expenses_for_export(
+        self,
+        company_id: str,
+        status: str | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        batch_size: int = 1000,
+    ) -> Any:
+        """Return an async cursor over matching expenses ordered by ``(expense_date, _id)``.
+
+        The sort matches the ``company_expense_date`` index, or
+        ``company_status_expense_date`` when filtering by status, so the server
+        never has to buffer the result set for an in-memory sort.
+        """
+        query: dict[str, Any] = {"company_id": company_id}
+        if status:
+            query["status"] = status
+        if date_from or date_to:
+            date_range: dict[str, datetime] = {}
+            if date_from:
+                date_range["$gte"] = to_mongo_date(date_from)
+            if date_to:
+                date_range["$lte"] = to_mongo_date(date_to)
+            query["expense_date"] = date_range
+        return self.collection.find(query).sort([("expense_date", 1), ("_id", 1)]).batch_size(batch_size)
+
+    async def list_pending_for_approver(self, company_id: str, approver_id: str) -> list[dict]:
+        cursor = self.collection.find(
+            {
+                "company_id": company_id,
+                "status": "pending",
+                "current_approver_id": approver_id,
+            }
+        ).sort("created_at", 1)
         return [doc async for doc in cursor]
 
-    async def update_expense(self, expense_id: str, update_data: dict) -> bool:
-        if not ObjectId.is_valid(expense_id):
-            return False
+    async def update_expense(self, expense: dict, update_data: dict) -> dict | None:
+        """Apply ``update_data`` to ``expense`` if it is still pending at the version it was read at.
+
+        Returns the updated document, or ``None`` if another write got there first.
+        """
         update_data["updated_at"] = datetime.now(timezone.utc)
-        result = await self.collection.update_one({"_id": ObjectId(expense_id)}, {"$set": update_data})
-        return result.modified_count > 0
+        return await self.collection.find_one_and_update(
+            self._version_guard(expense),
+            {"$set": update_data, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
 
-    async def add_approval_entry(self, expense_id: str, approval_entry: dict) -> bool:
-        if not ObjectId.is_valid(expense_id):
-            return False
-        result = await self.collection.update_one(
-            {"_id": ObjectId(expense_id)},
+    async def apply_approval(self, expense: dict, approval_entry: dict, status_update: dict) -> dict | None:
+        """Append ``approval_entry`` and apply ``status_update`` in one conditional write.
+
+        The update only matches while the expense is still pending at the step and
+        version it was read at, so concurrent decisions cannot both apply. Returns
+        the updated document, or ``None`` if the expense changed in the meantime.
+        """
+        return await self.collection.find_one_and_update(
+            self._approval_guard(expense),
+            self._approval_update(approval_entry, status_update),
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def apply_approvals(self, transitions: list[tuple[dict, dict, dict]]) -> set[ObjectId]:
+        """Apply many ``(expense, approval_entry, status_update)`` transitions in one ``bulk_write``.
+
+        Each update carries the same guard as :meth:`apply_approval`. Every
+        pushed entry has a fresh ``id``, and one read afterwards finds the
+        expenses whose history holds one of them: exactly the updates that
+        applied, whatever other writers did before or after. Returns their ids.
+        """
+        entry_ids: list[str] = []
+        operations = []
+        for expense, approval_entry, status_update in transitions:
+            update = self._approval_update(approval_entry, status_update)
+            entry_ids.append(update["$push"]["approval_history"]["id"])
+            operations.append(UpdateOne(self._approval_guard(expense), update))
+        await self.collection.bulk_write(operations, ordered=False)
+        cursor = self.collection.find(
+            {"_id": {"$in": [expense["_id"] for expense, _, _ in transitions]}, "approval_history.id": {"$in": entry_ids}},
+            {"_id": 1},
+        )
+        return {doc["_id"] async for doc in cursor}
+
+    async def list_pending_by_ids_for_approver(self, company_id: str, approver_id: str, expense_ids: list[str]) -> list[dict]:
+        valid_ids = [ObjectId(expense_id) for expense_id in expense_ids if ObjectId.is_valid(expense_id)]
+        if not valid_ids:
+            return []
+        cursor = self.collection.find(
             {
-                "$push": {"approval_history": approval_entry},
-                "$set": {"updated_at": datetime.now(timezone.utc)},
-            },
+                "_id": {"$in": valid_ids},
+                "company_id": company_id,
+                "status": "pending",
+                "current_approver_id": approver_id,
+            }
         )
-        return result.modified_count > 0
+        return [doc async for doc in cursor]
+
+    def _version_guard(self, expense: dict) -> dict:
+        return {
+            "_id": expense["_id"],
+            "status": "pending",
+            "version": expense["version"] if "version" in expense else {"$exists": False},
+        }
+
+    def _approval_guard(self, expense: dict) -> dict:
+        return {**self._version_guard(expense), "current_step_index": expense.get("current_step_index", 0)}
+
+    def _approval_update(self, approval_entry: dict, status_update: dict) -> dict:
+        return {
+            "$push": {"approval_history": {"id": str(ObjectId()), **approval_entry}},
+            "$set": {**status_update, "updated_at": datetime.now(timezone.utc)},
+            "$inc": {"version": 1},
+        }
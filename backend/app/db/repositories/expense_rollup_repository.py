@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+from pymongo import ASCENDING, IndexModel, UpdateOne
+
+from app.db.client import get_collection
+from app.db.query_shapes import SAMPLE_COMPANY, QueryShape
+
+ROLLUP_KEY_FIELDS = ("company_id", "month", "category", "employee_id", "status", "currency")
+
+
+class ExpenseRollupRepository:
+    collection_name = "expense_rollups"
+    indexes: list[IndexModel] = [
+        IndexModel([(field, ASCENDING) for field in ROLLUP_KEY_FIELDS], name="rollup_key", unique=True),
+    ]
+    query_shapes: list[QueryShape] = [
+        QueryShape("summarize", {"company_id": SAMPLE_COMPANY, "month": {"$gte": "2024-01", "$lte": "2024-12"}}),
+        QueryShape("list_rollups", {"company_id": SAMPLE_COMPANY}),
+    ]
+
+    @property
+    def collection(self):
+        return get_collection(self.collection_name)
+
+    async def apply_deltas(self, deltas: list[tuple[dict, float, int]]) -> None:
+        """``$inc`` each ``(key, amount, count)`` delta into its rollup bucket, creating it if needed."""
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                key,
+                {"$inc": {"total": amount, "count": count}, "$set": {"updated_at": now}},
+                upsert=True,
+            )
+            for key, amount, count in deltas
+        ]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def summarize(
+        self,
+        company_id: str,
+        group_by: list[str],
+        month_from: str | None = None,
+        month_to: str | None = None,
+        status: str | None = None,
+    ) -> list[dict]:
+        match: dict[str, Any] = {"company_id": company_id}
+        if month_from or month_to:
+            match["month"] = {}
+            if month_from:
+                match["month"]["$gte"] = month_from
+            if month_to:
+                match["month"]["$lte"] = month_to
+        if status:
+            match["status"] = status
+        group_keys = {field: f"${field}" for field in [*group_by, "currency"]}
+        pipeline = [
+            {"$match": match},
+            {"$group": {"_id": group_keys, "total": {"$sum": "$total"}, "count": {"$sum": "$count"}}},
+            {"$match": {"count": {"$ne": 0}}},
+            {"$replaceWith": {"$mergeObjects": ["$_id", {"total": "$total", "count": "$count"}]}},
+            {"$sort": {field: 1 for field in group_keys}},
+        ]
+        return [doc async for doc in self.collection.aggregate(pipeline)]
+
+    async def list_rollups(self, company_id: str | None = None) -> list[dict]:
+        query = {"company_id": company_id} if company_id else {}
+        cursor = self.collection.find(query, {"_id": 0, "updated_at": 0})
+        return [doc async for doc in cursor]
+
+    async def delete_rollups(self, company_id: str | None = None) -> int:
+        query = {"company_id": company_id} if company_id else {}
+        result = await self.collection.delete_many(query)
+        return result.deleted_count
+
+
+def rebuild_pipeline(company_id: str | None = None) -> list[dict]:
+    """Aggregation over ``expenses`` that recomputes every rollup bucket from scratch."""
+    pipeline: list[dict] = []
+    if company_id:
+        pipeline.append({"$match": {"company_id": company_id}})
+    pipeline += [
+        {
+            "$group": {
+                "_id": {
+                    "company_id": "$company_id",
+                    "month": {"$dateToString": {"format": "%Y-%m", "date": "$expense_date"}},
+                    "category": "$category",
+                    "employee_id": "$employee_id",
+                    "status": "$status",
+                    "currency": "$company_currency",
+                },
+                "total": {"$sum": "$converted_amount"},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$replaceWith": {"$mergeObjects": ["$_id", {"total": "$total", "count": "$count"}]}},
+    ]
+    return pipeline
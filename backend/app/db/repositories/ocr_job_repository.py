@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+
+from app.db.client import get_collection
+from app.db.query_shapes import SAMPLE_ID, QueryShape
+
+
+class OCRJobRepository:
+    collection_name = "ocr_jobs"
+    indexes: list[IndexModel] = [
+        # MongoDB's TTL monitor deletes each job once its expires_at passes.
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ]
+    query_shapes: list[QueryShape] = [
+        QueryShape("get_job", {"_id": SAMPLE_ID}),
+    ]
+
+    @property
+    def collection(self):
+        return get_collection(self.collection_name)
+
+    async def create_job(self, job_data: dict, ttl: timedelta) -> str:
+        now = datetime.now(timezone.utc)
+        job_data.setdefault("created_at", now)
+        job_data.setdefault("updated_at", now)
+        job_data.setdefault("expires_at", now + ttl)
+        result = await self.collection.insert_one(job_data)
+        return str(result.inserted_id)
+
+    async def get_job(self, job_id: str) -> dict | None:
+        if not ObjectId.is_valid(job_id):
+            return None
+        return await self.collection.find_one({"_id": ObjectId(job_id)})
+
+    async def update_job(self, job_id: str, update_data: dict, ttl: timedelta | None = None) -> None:
+        now = datetime.now(timezone.utc)
+        update_data["updated_at"] = now
+        if ttl is not None:
+            update_data["expires_at"] = now + ttl
+        await self.collection.update_one({"_id": ObjectId(job_id)}, {"$set": update_data})
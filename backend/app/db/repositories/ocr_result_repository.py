@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+
+from app.core.config import settings
+from app.db.client import get_collection
+from app.db.query_shapes import QueryShape
+
+
+class OCRResultRepository:
+    """Recognised text keyed by upload content hash and preprocessing options."""
+
+    collection_name = "ocr_results"
+    indexes: list[IndexModel] = [
+        # Entries not read for ocr_cache_ttl_days are dropped by MongoDB's TTL monitor.
+        IndexModel(
+            [("last_used_at", ASCENDING)],
+            name="last_used_at_ttl",
+            expireAfterSeconds=settings.ocr_cache_ttl_days * 24 * 3600,
+        ),
+    ]
+    query_shapes: list[QueryShape] = [
+        QueryShape("get_result", {"_id": "0" * 64}),
+        QueryShape("trim", {}, [("last_used_at", ASCENDING)]),
+    ]
+
+    @property
+    def collection(self):
+        return get_collection(self.collection_name)
+
+    async def get_result(self, key: str) -> dict | None:
+        """Return the cached result and mark it as recently used."""
+        return await self.collection.find_one_and_update(
+            {"_id": key},
+            {"$set": {"last_used_at": datetime.now(timezone.utc)}, "$inc": {"hits": 1}},
+            projection={"text": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def save_result(self, key: str, result: dict) -> None:
+        now = datetime.now(timezone.utc)
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {**result, "last_used_at": now}, "$setOnInsert": {"created_at": now, "hits": 0}},
+            upsert=True,
+        )
+
+    async def trim(self, max_entries: int) -> int:
+        """Delete the least recently used entries beyond ``max_entries``."""
+        excess = await self.collection.estimated_document_count() - max_entries
+        if excess <= 0:
+            return 0
+        cursor = self.collection.find({}, {"_id": 1}).sort("last_used_at", ASCENDING).limit(excess)
+        stale = [doc["_id"] async for doc in cursor]
+        result = await self.collection.delete_many({"_id": {"$in": stale}})
+        return result.deleted_count
@@ -3,14 +3,29 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
 
 from app.db.client import get_collection
+from app.db.query_shapes import SAMPLE_COMPANY, SAMPLE_ID, QueryShape
+from app.utils.pagination import KEYSET_SORT, KeysetPosition, find_page
 
 
 class UserRepository:
+    collection_name = "users"
+    indexes: list[IndexModel] = [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("company_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="company_created"),
+    ]
+    query_shapes: list[QueryShape] = [
+        QueryShape("get_user_by_email", {"email": "someone@example.com"}),
+        QueryShape("get_user_by_id", {"_id": SAMPLE_ID}),
+        QueryShape("list_users_by_company", {"company_id": SAMPLE_COMPANY}, KEYSET_SORT),
+        QueryShape("get_users_by_ids", {"_id": {"$in": [SAMPLE_ID]}}),
+    ]
+
     @property
     def collection(self):
-        return get_collection("users")
+        return get_collection(self.collection_name)
 
     async def create_user(self, user_data: dict) -> str:
         now = datetime.now(timezone.utc)
@@ -27,9 +42,14 @@ class UserRepository:
             return None
         return await self.collection.find_one({"_id": ObjectId(user_id)})
 
-    async def list_users_by_company(self, company_id: str) -> list[dict]:
-        cursor = self.collection.find({"company_id": company_id})
-        return [doc async for doc in cursor]
+    async def list_users_by_company(
+        self,
+        company_id: str,
+        limit: int | None = None,
+        after: KeysetPosition | None = None,
+        projection: dict | None = None,
+    ) -> list[dict]:
+        return await find_page(self.collection, {"company_id": company_id}, limit, after, projection)
 
     async def get_users_by_ids(self, user_ids: list[str]) -> list[dict]:
         valid_ids = [ObjectId(user_id) for user_id in user_ids if ObjectId.is_valid(user_id)]
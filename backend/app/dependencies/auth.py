@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import hashlib
+import time
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -10,9 +11,36 @@ from app.core.config import settings
 from app.db.repositories.user_repository import UserRepository
 from app.schemas.auth import TokenPayload
 from app.schemas.common import UserRole
+from app.services.user_service import user_cache
+from app.utils.cache import TTLCache
+from app.utils.metrics import cache_metrics
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Claims of tokens whose signature has already been checked, keyed by the
+# token's SHA-256 digest and dropped when the token expires.
+token_cache: TTLCache[TokenPayload] = TTLCache(settings.token_cache_max_entries, 0, cache_metrics("tokens"))
+
+
+def decode_token(token: str) -> TokenPayload | None:
+    """Verify ``token`` and return its claims, or ``None`` if it is invalid or expired."""
+    key = hashlib.sha256(token.encode()).digest() if settings.token_cache_enabled else None
+    if key is not None:
+        token_data = token_cache.get(key)
+        if token_data is not None:
+            return token_data
+    try:
+        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        token_data = TokenPayload(**payload)
+    except (JWTError, ValueError):
+        return None
+    remaining = token_data.exp - time.time()
+    if remaining <= 0:
+        return None
+    if key is not None:
+        token_cache.set(key, token_data, ttl_seconds=remaining)
+    return token_data
+
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
@@ -20,23 +48,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        token_data = TokenPayload(**payload)
-        if datetime.fromtimestamp(token_data.exp, tz=timezone.utc) < datetime.now(tz=timezone.utc):
-            raise credentials_exception
-    except (JWTError, ValueError):
+    token_data = decode_token(token)
+    if token_data is None:
         raise credentials_exception
 
-    user_repo = UserRepository()
-    user = await user_repo.get_user_by_id(token_data.sub)
-    if not user or user.get("company_id") != token_data.company_id:
+    user = user_cache.get(token_data.sub) if settings.user_cache_enabled else None
+    if user is None:
+        epoch = user_cache.epoch
+        user_repo = UserRepository()
+        user = await user_repo.get_user_by_id(token_data.sub)
+        if not user:
+            raise credentials_exception
+        user["id"] = str(user.pop("_id"))
+        user.pop("password_hash", None)
+        if settings.user_cache_enabled:
+            user_cache.set(token_data.sub, user, epoch=epoch)
+    if user.get("company_id") != token_data.company_id:
         raise credentials_exception
     if not user.get("is_active", True):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
-    user["id"] = str(user.pop("_id"))
-    user.pop("password_hash", None)
-    return user
+    # Handlers get their own copy so they cannot mutate the cached document.
+    return dict(user)
 
 
 def require_role(*roles: UserRole):
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.utils.pagination import PageParams, decode_cursor
+
+
+def pagination(model: type[BaseModel]):
+    allowed_fields = set(model.model_fields) - {"id"}
+
+    async def page_params(
+        limit: int | None = Query(default=None, ge=1, le=settings.page_max_limit, description="Maximum number of items to return"),
+        cursor: str | None = Query(default=None, description="Opaque cursor from a previous page's next_cursor"),
+        fields: str | None = Query(default=None, description="Comma-separated list of fields to return"),
+    ) -> PageParams:
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+        selected = None
+        if fields:
+            selected = [field.strip() for field in fields.split(",") if field.strip()]
+            unknown = sorted(set(selected) - allowed_fields)
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown fields: {', '.join(unknown)}",
+                )
+        return PageParams(limit=limit, after=after, fields=selected)
+
+    return page_params
@@ -2,8 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.security import password_executor
 from app.db.client import connect_to_mongo, close_mongo_connection
-from app.routers import auth, users, approval_rules, expenses, companies, health, ocr
+from app.db.indexes import ensure_indexes
+from app.routers import auth, users, approval_rules, expenses, companies, health, metrics, ocr, reports
+from app.services.currency_service import currency_service
+from app.services.ocr_service import ocr_service
 
 
 app = FastAPI(title=settings.project_name, version=settings.version)
@@ -20,10 +24,16 @@ app.add_middleware(
 @app.on_event("startup")
 async def on_startup() -> None:
     await connect_to_mongo()
+    if settings.mongo_ensure_indexes:
+        await ensure_indexes()
+    await currency_service.startup()
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
+    await currency_service.shutdown()
+    password_executor.shutdown()
+    ocr_service.shutdown()
     await close_mongo_connection()
 
 
@@ -34,3 +44,5 @@ app.include_router(users.router, prefix="/api")
 app.include_router(approval_rules.router, prefix="/api")
 app.include_router(expenses.router, prefix="/api")
 app.include_router(ocr.router, prefix="/api")
+app.include_router(reports.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
@@ -1,9 +1,25 @@
-from fastapi import APIRouter, Depends, Path
+from datetime import date, datetime, timezone
+
+from fastapi import APIRouter, Depends, File, Path, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.dependencies.auth import get_current_user, require_role
+from app.dependencies.pagination import pagination
 from app.schemas.common import ApprovalDecision, ExpenseStatus, UserRole
-from app.schemas.expense import ApprovalAction, ExpenseCreate, ExpenseListResponse, ExpensePublic, ExpenseUpdate
+from app.schemas.expense import (
+    ApprovalAction,
+    BulkApprovalRequest,
+    BulkApprovalResponse,
+    ExpenseCreate,
+    ExpenseImportResponse,
+    ExpenseListResponse,
+    ExpensePublic,
+    ExpenseUpdate,
+)
+from app.services.expense_export import MEDIA_TYPES, ExportFormat
+from app.services.expense_import import ImportFormat, detect_format
 from app.services.expense_service import expense_service
+from app.utils.pagination import PageParams
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
@@ -14,16 +30,49 @@ async def submit_expense(payload: ExpenseCreate, current_user = Depends(require_
     return expense
 
 
+@router.post("/import", response_model=ExpenseImportResponse, summary="Bulk import expenses from CSV or NDJSON")
+async def import_expenses(
+    file: UploadFile = File(...),
+    format: ImportFormat | None = Query(default=None, description="Upload format; inferred from the file name when omitted"),
+    current_user = Depends(require_role(UserRole.employee)),
+):
+    fmt = format or detect_format(file.filename, file.content_type)
+    return await expense_service.import_expenses(current_user["company_id"], current_user["id"], file.file, fmt)
+
+
 @router.get("/mine", response_model=ExpenseListResponse, summary="List my expenses")
-async def list_my_expenses(current_user = Depends(require_role(UserRole.employee))):
-    expenses = await expense_service.list_employee_expenses(current_user["company_id"], current_user["id"])
-    return {"expenses": expenses}
+async def list_my_expenses(
+    page: PageParams = Depends(pagination(ExpensePublic)),
+    current_user = Depends(require_role(UserRole.employee)),
+):
+    expenses, next_cursor = await expense_service.list_employee_expenses(current_user["company_id"], current_user["id"], page)
+    return {"expenses": expenses, "next_cursor": next_cursor}
 
 
 @router.get("", response_model=ExpenseListResponse, summary="List company expenses")
-async def list_company_expenses(current_user = Depends(require_role(UserRole.admin, UserRole.manager))):
-    expenses = await expense_service.list_company_expenses(current_user["company_id"])
-    return {"expenses": expenses}
+async def list_company_expenses(
+    page: PageParams = Depends(pagination(ExpensePublic)),
+    current_user = Depends(require_role(UserRole.admin, UserRole.manager)),
+):
+    expenses, next_cursor = await expense_service.list_company_expenses(current_user["company_id"], page)
+    return {"expenses": expenses, "next_cursor": next_cursor}
+
+
+@router.get("/export", summary="Stream company expenses as CSV or NDJSON")
+async def export_expenses(
+    format: ExportFormat = Query(default="csv"),
+    status: ExpenseStatus | None = Query(default=None),
+    date_from: date | None = Query(default=None, description="Earliest expense_date (inclusive)"),
+    date_to: date | None = Query(default=None, description="Latest expense_date (inclusive)"),
+    current_user = Depends(require_role(UserRole.admin, UserRole.manager)),
+):
+    rows = expense_service.export_expenses(current_user["company_id"], format, status, date_from, date_to)
+    filename = f"expenses-{datetime.now(timezone.utc):%Y%m%d}.{format}"
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/pending", response_model=ExpenseListResponse, summary="Expenses awaiting my approval")
@@ -50,3 +99,12 @@ async def approve_expense(
 ):
     expense = await expense_service.record_approval(current_user["company_id"], expense_id, current_user["id"], payload)
     return expense
+
+
+@router.post("/approvals", response_model=BulkApprovalResponse, summary="Approve or reject many expenses at once")
+async def approve_expenses(
+    payload: BulkApprovalRequest,
+    current_user = Depends(require_role(UserRole.manager, UserRole.admin)),
+):
+    results = await expense_service.record_approvals(current_user["company_id"], current_user["id"], payload.items)
+    return {"results": results}
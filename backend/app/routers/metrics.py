@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+
+from app.dependencies.auth import require_role
+from app.schemas.common import UserRole
+from app.utils.metrics import metrics_snapshot
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/caches", summary="Cache counters for this worker process")
+async def cache_metrics(current_user = Depends(require_role(UserRole.admin))) -> dict[str, dict]:
+    return metrics_snapshot()
@@ -1,12 +1,40 @@
-from fastapi import APIRouter, Depends, File, UploadFile
+from typing import List
+
+from fastapi import APIRouter, Depends, File, Path, UploadFile, status
+from fastapi.responses import StreamingResponse
 
 from app.dependencies.auth import require_role
 from app.schemas.common import UserRole
+from app.schemas.ocr import OCRJobPublic
 from app.services.ocr_service import ocr_service
 
 router = APIRouter(prefix="/ocr", tags=["ocr"])
 
+any_user = require_role(UserRole.employee, UserRole.manager, UserRole.admin)
+
 
 @router.post("/extract", summary="Extract text from receipt")
-async def extract_text(file: UploadFile = File(...), current_user = Depends(require_role(UserRole.employee, UserRole.manager, UserRole.admin))):
+async def extract_text(file: UploadFile = File(...), current_user = Depends(any_user)):
     return await ocr_service.extract_text(file)
+
+
+@router.post("/batch", summary="Extract text from several receipts, streamed as NDJSON")
+async def extract_batch(files: List[UploadFile] = File(...), current_user = Depends(any_user)):
+    results = await ocr_service.extract_batch(files)
+    return StreamingResponse(results, media_type="application/x-ndjson")
+
+
+@router.post("/jobs", response_model=OCRJobPublic, status_code=status.HTTP_202_ACCEPTED, summary="Queue receipt OCR")
+async def submit_job(file: UploadFile = File(...), current_user = Depends(any_user)):
+    return await ocr_service.submit_job(current_user, file)
+
+
+@router.get("/jobs/{job_id}", response_model=OCRJobPublic, summary="OCR job status and result")
+async def get_job(job_id: str = Path(..., description="OCR job identifier"), current_user = Depends(any_user)):
+    return await ocr_service.get_job(current_user, job_id)
+
+
+@router.get("/jobs/{job_id}/events", summary="Server-sent event when the OCR job finishes")
+async def job_events(job_id: str = Path(..., description="OCR job identifier"), current_user = Depends(any_user)):
+    events = await ocr_service.job_events(current_user, job_id)
+    return StreamingResponse(events, media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.dependencies.auth import require_role
+from app.schemas.common import ExpenseStatus, UserRole
+from app.schemas.report import SpendGroup, SpendReportResponse
+from app.services.rollup_service import rollup_service
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+@router.get("/spend", response_model=SpendReportResponse, summary="Company spend totals in company currency")
+async def spend_report(
+    group_by: list[SpendGroup] = Query(default=["category"]),
+    month_from: str | None = Query(default=None, pattern=MONTH_PATTERN, description="First month (YYYY-MM), inclusive"),
+    month_to: str | None = Query(default=None, pattern=MONTH_PATTERN, description="Last month (YYYY-MM), inclusive"),
+    status: ExpenseStatus | None = Query(default=None),
+    current_user = Depends(require_role(UserRole.admin, UserRole.manager)),
+):
+    group_by = list(dict.fromkeys(group_by))
+    rows = await rollup_service.spend_report(
+        current_user["company_id"], group_by, month_from, month_to, status.value if status else None
+    )
+    return {"group_by": group_by, "rows": rows}
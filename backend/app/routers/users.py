@@ -1,17 +1,22 @@
 from fastapi import APIRouter, Depends, Path
 
 from app.dependencies.auth import get_current_user, require_role
+from app.dependencies.pagination import pagination
 from app.schemas.common import UserRole
 from app.schemas.user import UserCreate, UserListResponse, UserPublic, UserUpdate
 from app.services.user_service import user_service
+from app.utils.pagination import PageParams
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("", response_model=UserListResponse, summary="List company users")
-async def list_users(current_user = Depends(require_role(UserRole.admin))):
-    users = await user_service.list_users(current_user["company_id"])
-    return {"users": users}
+async def list_users(
+    page: PageParams = Depends(pagination(UserPublic)),
+    current_user = Depends(require_role(UserRole.admin)),
+):
+    users, next_cursor = await user_service.list_users(current_user["company_id"], page)
+    return {"users": users, "next_cursor": next_cursor}
 
 
 @router.post("", response_model=UserPublic, summary="Create a new user")
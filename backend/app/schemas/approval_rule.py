@@ -15,6 +15,9 @@ class ApprovalRuleBase(BaseModel):
     percentage_threshold: int | None = Field(default=None, ge=1, le=100)
     specific_approver_id: str | None = None
     order: list[str] = Field(default_factory=list)
+    manager_levels: int = Field(default=1, ge=1, le=10)
+    escalation_amount: float | None = Field(default=None, gt=0)
+    escalation_manager_levels: int | None = Field(default=None, ge=1, le=10)
     is_active: bool = True
 
 
@@ -30,6 +33,9 @@ class ApprovalRuleUpdate(BaseModel):
     percentage_threshold: int | None = Field(default=None, ge=1, le=100)
     specific_approver_id: str | None = None
     order: list[str] | None = None
+    manager_levels: int | None = Field(default=None, ge=1, le=10)
+    escalation_amount: float | None = Field(default=None, gt=0)
+    escalation_manager_levels: int | None = Field(default=None, ge=1, le=10)
     is_active: bool | None = None
 
 
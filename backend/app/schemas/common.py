@@ -21,6 +21,13 @@ class ApprovalDecision(str, Enum):
     rejected = "rejected"
 
 
+class OCRJobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
 CurrencyCode = str
 CountryCode = str
 ApprovalRuleType = Literal["sequential", "percentage", "specific", "hybrid"]
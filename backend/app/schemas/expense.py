@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime, date
+from typing import Annotated, Literal, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.schemas.common import ApprovalDecision, CurrencyCode, ExpenseStatus
 
@@ -49,6 +50,7 @@ class ExpenseInDB(ExpenseBase):
     company_currency: CurrencyCode
     status: ExpenseStatus
     current_step_index: int
+    current_approver_id: str | None = None
     approver_sequence: list[str]
     approval_rule_id: str | None
     created_at: datetime
@@ -59,10 +61,50 @@ class ExpensePublic(ExpenseInDB):
     approval_history: list[dict]
 
 
+class ExpensePartial(BaseModel):
+    """Expense restricted to the fields requested with ``fields=``."""
+
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+
+
 class ExpenseListResponse(BaseModel):
-    expenses: list[ExpensePublic]
+    expenses: list[Annotated[Union[ExpensePublic, ExpensePartial], Field(union_mode="left_to_right")]]
+    next_cursor: str | None = None
+
+
+class ExpenseImportError(BaseModel):
+    row: int
+    message: str
+
+
+class ExpenseImportResponse(BaseModel):
+    imported: int
+    failed: int
+    expense_ids: list[str]
+    errors: list[ExpenseImportError]
 
 
 class ApprovalAction(BaseModel):
     decision: ApprovalDecision
     comment: str | None = Field(default=None, max_length=500)
+
+
+class BulkApprovalItem(ApprovalAction):
+    expense_id: str
+
+
+class BulkApprovalRequest(BaseModel):
+    items: list[BulkApprovalItem] = Field(min_length=1, max_length=500)
+
+
+class BulkApprovalResult(BaseModel):
+    expense_id: str
+    outcome: Literal["applied", "not_found", "conflict", "duplicate"]
+    status: ExpenseStatus | None = None
+    detail: str | None = None
+
+
+class BulkApprovalResponse(BaseModel):
+    results: list[BulkApprovalResult]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app.schemas.common import OCRJobStatus
+
+
+class OCRJobPublic(BaseModel):
+    id: str
+    status: OCRJobStatus
+    filename: str | None = None
+    text: str | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+    expires_at: datetime
+
+
+class OCRBatchResult(BaseModel):
+    """One NDJSON line of ``POST /api/ocr/batch``, emitted as soon as that file is done."""
+
+    index: int
+    filename: str | None = None
+    pages: list[str] = []
+    text: str | None = None
+    error: str | None = None
+    status_code: int = 200
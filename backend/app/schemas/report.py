@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+from app.schemas.common import CurrencyCode
+
+SpendGroup = Literal["category", "month", "employee_id", "status"]
+
+
+class SpendReportRow(BaseModel):
+    category: str | None = None
+    month: str | None = None
+    employee_id: str | None = None
+    status: str | None = None
+    currency: CurrencyCode
+    total: float
+    count: int
+
+
+class SpendReportResponse(BaseModel):
+    group_by: list[SpendGroup]
+    rows: list[SpendReportRow]
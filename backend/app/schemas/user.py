@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from pydantic import BaseModel, EmailStr, Field
+from typing import Annotated, Union
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 from app.schemas.common import UserRole
 
@@ -39,5 +41,14 @@ class UserPublic(UserBase):
     created_at: datetime
 
 
+class UserPartial(BaseModel):
+    """User restricted to the fields requested with ``fields=``."""
+
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+
+
 class UserListResponse(BaseModel):
-    users: list[UserPublic]
+    users: list[Annotated[Union[UserPublic, UserPartial], Field(union_mode="left_to_right")]]
+    next_cursor: str | None = None
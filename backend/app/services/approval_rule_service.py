@@ -6,6 +6,8 @@ from fastapi import HTTPException, status
 
 from app.db.repositories.approval_rule_repository import ApprovalRuleRepository
 from app.schemas.approval_rule import ApprovalRuleCreate, ApprovalRuleUpdate
+from app.services.company_config import company_config
+from app.services.rule_evaluator import rule_evaluators
 
 
 class ApprovalRuleService:
@@ -16,6 +18,7 @@ class ApprovalRuleService:
         rule_data = payload.model_dump()
         rule_data.update({"company_id": company_id})
         rule_id = await self.repo.create_rule(rule_data)
+        company_config.invalidate_rules(company_id)
         rule = await self.repo.get_rule_by_id(rule_id)
         assert rule is not None
         rule["id"] = str(rule.pop("_id"))
@@ -35,6 +38,8 @@ class ApprovalRuleService:
         success = await self.repo.update_rule(rule_id, payload.model_dump(exclude_unset=True))
         if not success:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update rule")
+        rule_evaluators.invalidate(rule_id)
+        company_config.invalidate_rules(company_id)
 
         updated = await self.repo.get_rule_by_id(rule_id)
         assert updated is not None
@@ -49,6 +54,8 @@ class ApprovalRuleService:
         success = await self.repo.delete_rule(rule_id)
         if not success:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete rule")
+        rule_evaluators.invalidate(rule_id)
+        company_config.invalidate_rules(company_id)
 
 
 approval_rule_service = ApprovalRuleService()
@@ -5,7 +5,7 @@ from typing import Any
 from fastapi import HTTPException, status
 
 from app.core.config import settings
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.security import create_access_token, get_password_hash_async, verify_password_async
 from app.db.repositories.user_repository import UserRepository
 from app.schemas.auth import AuthResponse, AuthUser, LoginRequest, SignupRequest, TokenResponse
 from app.schemas.common import UserRole
@@ -28,7 +28,7 @@ class AuthService:
         if not company or "id" not in company:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create company")
 
-        hashed_password = get_password_hash(payload.password)
+        hashed_password = await get_password_hash_async(payload.password)
         user_id = await self.user_repo.create_user(
             {
                 "name": payload.name,
@@ -62,7 +62,7 @@ class AuthService:
 
     async def login(self, payload: LoginRequest) -> AuthResponse:
         user = await self.user_repo.get_user_by_email(str(payload.email).lower())
-        if not user or not verify_password(payload.password, user.get("password_hash", "")):
+        if not user or not await verify_password_async(payload.password, user.get("password_hash", "")):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
         if not user.get("is_active", True):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
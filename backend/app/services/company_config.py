@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.core.config import settings
+from app.db.repositories.approval_rule_repository import ApprovalRuleRepository
+from app.db.repositories.company_repository import CompanyRepository
+from app.utils.cache import TTLCache
+from app.utils.metrics import cache_metrics
+
+
+class CompanyConfigCache:
+    """Read-through, per-worker cache of company documents and their active approval rules.
+
+    Both change rarely and are read on every expense submission. Writes made
+    through :class:`CompanyService` and :class:`ApprovalRuleService` invalidate
+    the entry in the worker that handled them; other workers see the change
+    once ``company_cache_ttl_seconds`` has passed. Callers receive shallow
+    copies and must not mutate nested values.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.company_repo = CompanyRepository()
+        self.rule_repo = ApprovalRuleRepository()
+        self._companies: TTLCache[dict[str, Any]] = TTLCache(max_entries, ttl_seconds, cache_metrics("companies"))
+        self._active_rules: TTLCache[list[dict[str, Any]]] = TTLCache(
+            max_entries, ttl_seconds, cache_metrics("active_rules")
+        )
+
+    async def get_company(self, company_id: str) -> dict[str, Any] | None:
+        company = self._companies.get(company_id) if settings.company_cache_enabled else None
+        if company is None:
+            epoch = self._companies.epoch
+            company = await self.company_repo.get_company_by_id(company_id)
+            if not company:
+                return None
+            company["id"] = str(company.pop("_id"))
+            if settings.company_cache_enabled:
+                self._companies.set(company_id, company, epoch=epoch)
+        return dict(company)
+
+    async def list_active_rules(self, company_id: str) -> list[dict[str, Any]]:
+        rules = self._active_rules.get(company_id) if settings.company_cache_enabled else None
+        if rules is None:
+            epoch = self._active_rules.epoch
+            rules = await self.rule_repo.list_active_rules_for_company(company_id)
+            for rule in rules:
+                rule["id"] = str(rule.pop("_id"))
+            if settings.company_cache_enabled:
+                self._active_rules.set(company_id, rules, epoch=epoch)
+        return [dict(rule) for rule in rules]
+
+    def invalidate_company(self, company_id: str) -> None:
+        self._companies.invalidate(company_id)
+
+    def invalidate_rules(self, company_id: str) -> None:
+        self._active_rules.invalidate(company_id)
+
+    def clear(self) -> None:
+        self._companies.clear()
+        self._active_rules.clear()
+
+
+company_config = CompanyConfigCache(settings.company_cache_max_entries, settings.company_cache_ttl_seconds)
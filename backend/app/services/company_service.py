@@ -6,6 +6,7 @@ from fastapi import HTTPException, status
 
 from app.db.repositories.company_repository import CompanyRepository
 from app.schemas.company import CompanyCreate, CompanyUpdate
+from app.services.company_config import company_config
 from app.services.currency_service import currency_service
 
 
@@ -38,6 +39,7 @@ class CompanyService:
             update_data["currency_code"] = await currency_service.get_country_currency(update_data["country_code"])
         if update_data:
             success = await self.company_repo.update_company(company_id, update_data)
+            company_config.invalidate_company(company_id)
             if not success:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update company")
         company = await self.company_repo.get_company_by_id(company_id)
@@ -47,6 +49,7 @@ class CompanyService:
 
     async def set_admin_user(self, company_id: str, admin_user_id: str) -> None:
         await self.company_repo.update_company(company_id, {"admin_user_id": admin_user_id})
+        company_config.invalidate_company(company_id)
 
 
 company_service = CompanyService()
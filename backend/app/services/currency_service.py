@@ -1,70 +1,354 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Any
+import asyncio
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Sequence
 
 import httpx
+import numpy as np
+from pymongo.errors import PyMongoError
 
 from app.core.config import settings
+from app.db.repositories.exchange_rate_repository import ExchangeRateRepository
+from app.services.rate_table import RateTable
+from app.utils.cache import TTLCache
+from app.utils.metrics import CacheMetrics, cache_metrics
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 
 
 class CurrencyService:
-    def __init__(self) -> None:
-        self._country_cache: dict[str, tuple[datetime, dict[str, Any]]] = {}
-        self._rates_cache: dict[str, tuple[datetime, dict[str, float]]] = {}
+    def __init__(
+        self,
+        restcountries_url: str | None = None,
+        currency_api_base_url: str | None = None,
+        currency_history_base_url: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        country_snapshot_path: str | Path | None = None,
+    ) -> None:
+        # The URLs and transport can be overridden to point the service at a
+        # local stand-in server (or an httpx.MockTransport) in tests and benchmarks.
+        self.restcountries_url = restcountries_url or settings.restcountries_url
+        self.currency_api_base_url = (currency_api_base_url or settings.currency_api_base_url).rstrip("/")
+        self.currency_history_base_url = (currency_history_base_url or settings.currency_history_base_url).rstrip("/")
+        self.country_snapshot_path = Path(country_snapshot_path or settings.country_snapshot_path)
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        # cca2 -> currency code for every country, plus when it was fetched
+        self._country_index: dict[str, str] = {}
+        self._country_index_fetched_at: datetime | None = None
+        # (fresh until, usable until, table) for the pivot currency
+        self._rate_table: tuple[datetime, datetime, RateTable] | None = None
+        # Past days' tables never change; they are kept as long as the live rates filled into them.
+        self._history: TTLCache[RateTable] = TTLCache(
+            settings.currency_history_cache_max_entries, settings.currency_cache_ttl_minutes * 60
+        )
+        # Days whose backfill just failed, so they fall back to live rates without calling the history API again.
+        self._backfill_failures: TTLCache[bool] = TTLCache(
+            settings.currency_history_cache_max_entries, settings.currency_history_retry_seconds
+        )
+        self.rate_repo = ExchangeRateRepository()
+        self._flight = SingleFlight()
+        self._background: set[asyncio.Task[Any]] = set()
+        self.rates_metrics = cache_metrics("exchange_rates")
+        self.country_metrics = cache_metrics("country_currencies")
+        self.history_metrics = cache_metrics("historical_rates")
+
+    async def startup(self) -> None:
+        self._get_client()
+        self.load_country_snapshot()
+        if not settings.country_index_offline and not self._country_index_is_fresh():
+            self._refresh_in_background(("countries",), self._refresh_country_index, self.country_metrics)
+
+    async def shutdown(self) -> None:
+        for task in self._background:
+            task.cancel()
+        self._background.clear()
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared pooled client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=settings.http_enable_http2,
+                timeout=httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry_seconds,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def _get_json(self, url: str) -> Any:
+        """GET ``url`` on the pooled client, retrying transport errors and 429/5xx with exponential backoff."""
+        client = self._get_client()
+        for attempt in range(settings.http_retries + 1):
+            try:
+                response = await client.get(url)
+                if response.status_code not in _RETRY_STATUS_CODES or attempt == settings.http_retries:
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError:
+                if attempt == settings.http_retries:
+                    raise
+            await asyncio.sleep(settings.http_retry_backoff_seconds * 2**attempt)
 
     async def get_country_currency(self, country_code: str) -> str:
+        """Look up a country's currency in the full ``cca2`` index.
+
+        The index is loaded from the local snapshot at startup and refreshed
+        from restcountries in the background once it is older than
+        ``country_index_refresh_hours``. It is only fetched inline when it is
+        empty or stale and lacks the requested country. With
+        ``country_index_offline`` it is never fetched.
+        """
         country_code = country_code.upper()
-        cached = self._country_cache.get(country_code)
-        if cached and cached[0] > datetime.now(timezone.utc):
-            return cached[1]["currency"]
+        currency_code = self._country_index.get(country_code)
+        fresh = self._country_index_is_fresh()
+        if currency_code and not fresh and not settings.country_index_offline:
+            self.country_metrics.incr("stale_serves")
+            self._refresh_in_background(("countries",), self._refresh_country_index, self.country_metrics)
+            return currency_code
+        if currency_code:
+            self.country_metrics.incr("hits")
+            return currency_code
+
+        if not fresh and not settings.country_index_offline:
+            self.country_metrics.incr("misses")
+            _, shared = await self._flight.do(("countries",), self._refresh_country_index)
+            if shared:
+                self.country_metrics.incr("coalesced")
+            currency_code = self._country_index.get(country_code)
+            if currency_code:
+                return currency_code
+
+        raise ValueError(f"No currency found for country code {country_code}")
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(settings.restcountries_url)
-            response.raise_for_status()
-            countries = response.json()
+    def load_country_snapshot(self) -> bool:
+        try:
+            snapshot = json.loads(self.country_snapshot_path.read_text(encoding="utf-8"))
+            self._country_index = dict(snapshot["countries"])
+            self._country_index_fetched_at = datetime.fromisoformat(snapshot["fetched_at"])
+        except FileNotFoundError:
+            return False
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring unreadable country snapshot at %s", self.country_snapshot_path, exc_info=True)
+            return False
+        return True
 
+    def _country_index_is_fresh(self) -> bool:
+        if not self._country_index or self._country_index_fetched_at is None:
+            return False
+        age = datetime.now(timezone.utc) - self._country_index_fetched_at
+        return age < timedelta(hours=settings.country_index_refresh_hours)
+
+    async def _refresh_country_index(self) -> None:
+        countries = await self._get_json(self.restcountries_url)
+        index: dict[str, str] = {}
         for country in countries:
-            if country_code == country.get("cca2"):
-                currencies = country.get("currencies", {})
-                if currencies:
-                    currency_code = next(iter(currencies.keys()))
-                    self._country_cache[country_code] = (
-                        datetime.now(timezone.utc) + timedelta(minutes=settings.currency_cache_ttl_minutes),
-                        {"currency": currency_code},
-                    )
-                    return currency_code
+            currencies = country.get("currencies") or {}
+            if country.get("cca2") and currencies:
+                index[country["cca2"].upper()] = next(iter(currencies.keys()))
+        if not index:
+            raise ValueError("Country list did not contain any currencies")
 
-        raise ValueError(f"No currency found for country code {country_code}")
+        fetched_at = datetime.now(timezone.utc)
+        self._country_index = index
+        self._country_index_fetched_at = fetched_at
+        try:
+            await asyncio.to_thread(self._write_country_snapshot, index, fetched_at)
+        except OSError:
+            logger.warning("Could not write country snapshot to %s", self.country_snapshot_path, exc_info=True)
+
+    def _write_country_snapshot(self, index: dict[str, str], fetched_at: datetime) -> None:
+        self.country_snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.country_snapshot_path.with_suffix(".tmp")
+        temporary.write_text(
+            json.dumps({"fetched_at": fetched_at.isoformat(), "countries": index}, indent=0, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(temporary, self.country_snapshot_path)
 
-    async def convert_to_company_currency(self, amount: float, from_currency: str, to_currency: str) -> tuple[float, float]:
+    async def convert_to_company_currency(
+        self, amount: float, from_currency: str, to_currency: str, on_date: date | None = None
+    ) -> tuple[float, float]:
         if from_currency.upper() == to_currency.upper():
             return amount, 1.0
 
-        rates = await self._get_rates_for_currency(from_currency)
-        rate = rates.get(to_currency.upper())
+        table = await self._table_for(on_date)
+        rate = table.rate(from_currency, to_currency)
         if rate is None:
             raise ValueError(f"Conversion rate from {from_currency} to {to_currency} not available")
         converted = amount * rate
         return converted, rate
 
-    async def _get_rates_for_currency(self, base_currency: str) -> dict[str, float]:
-        base_currency = base_currency.upper()
-        cached = self._rates_cache.get(base_currency)
-        if cached and cached[0] > datetime.now(timezone.utc):
-            return cached[1]
+    async def convert_many(
+        self,
+        amounts: Sequence[float] | np.ndarray,
+        from_codes: Iterable[str],
+        to_code: str,
+        on_date: date | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized :meth:`convert_to_company_currency` for bulk imports and reports.
+
+        Returns ``(converted, rates)`` arrays; entries whose rate is not
+        available are ``NaN`` instead of raising.
+        """
+        table = await self._table_for(on_date)
+        return table.convert_many(amounts, from_codes, to_code)
+
+    async def _table_for(self, on_date: date | None) -> RateTable:
+        if on_date is None:
+            return await self.get_rate_table()
+        return await self.get_rate_table_on(on_date)
+
+    async def get_rate_table_on(self, day: date) -> RateTable:
+        """Return the rate table in effect on ``day``.
+
+        Today and future dates use the live table. Past dates are answered
+        from the ``exchange_rates`` store, using the latest table at most
+        ``currency_history_max_gap_days`` earlier. A day the store does not
+        cover is backfilled from the history API once, and the live table is
+        used if that fails; the backfill is not retried for that day until
+        ``currency_history_retry_seconds`` have passed. The history source covers fewer currencies than
+        the live one, so currencies it lacks are filled in at live rates.
+        """
+        if isinstance(day, datetime):
+            day = day.date()
+        if day >= datetime.now(timezone.utc).date():
+            return await self.get_rate_table()
+        table = self._history.get(day)
+        if table is not None:
+            self.history_metrics.incr("hits")
+            return table
+
+        pivot = settings.currency_pivot.upper()
+        stored = await self.rate_repo.get_table_on_or_before(pivot, day, settings.currency_history_max_gap_days)
+        if stored is None:
+            self.history_metrics.incr("misses")
+            if self._backfill_failures.get(day):
+                self.history_metrics.incr("backfill_skips")
+            else:
+                start = day - timedelta(days=settings.currency_history_max_gap_days)
+                try:
+                    _, shared = await self._flight.do(("history", pivot, day), lambda: self.backfill_rates(start, day))
+                    if shared:
+                        self.history_metrics.incr("coalesced")
+                except (httpx.HTTPError, ValueError):
+                    logger.warning("Could not backfill exchange rates for %s", day, exc_info=True)
+                    self._backfill_failures.set(day, True)
+                stored = await self.rate_repo.get_table_on_or_before(pivot, day, settings.currency_history_max_gap_days)
+        else:
+            self.history_metrics.incr("store_hits")
+        if stored is None:
+            self.history_metrics.incr("fallbacks")
+            return await self.get_rate_table()
+
+        table = RateTable.from_rates(pivot, stored["rates"])
+        try:
+            table = table.filled_from(await self.get_rate_table())
+        except (httpx.HTTPError, ValueError):
+            logger.warning("Live rates unavailable; %s converts with historical currencies only", day, exc_info=True)
+            return table
+        # A day answered from an earlier table may still get its own table recorded later.
+        if stored["date"].date() == day or day < datetime.now(timezone.utc).date() - timedelta(
+            days=settings.currency_history_max_gap_days
+        ):
+            self._history.set(day, table)
+        return table
+
+    async def backfill_rates(self, start: date, end: date) -> int:
+        """Fetch daily pivot tables for ``start..end`` from the history API and store them.
+
+        The range is requested in windows of ``currency_history_batch_days``,
+        each fetched in one call and written in one bulk write. Returns the
+        number of days stored.
+        """
+        pivot = settings.currency_pivot.upper()
+        stored = 0
+        window_start = start
+        while window_start <= end:
+            window_end = min(end, window_start + timedelta(days=settings.currency_history_batch_days - 1))
+            data = await self._get_json(
+                f"{self.currency_history_base_url}/{window_start.isoformat()}..{window_end.isoformat()}?from={pivot}"
+            )
+            tables = {date.fromisoformat(day): rates for day, rates in (data.get("rates") or {}).items()}
+            stored += await self.rate_repo.upsert_tables(pivot, tables, source="history")
+            window_start = window_end + timedelta(days=1)
+        return stored
+
+    async def _record_table(self, pivot: str, day: date, rates: dict[str, float]) -> None:
+        try:
+            await self.rate_repo.upsert_tables(pivot, {day: rates}, source="latest")
+        except (PyMongoError, RuntimeError):
+            logger.warning("Could not record exchange rates for %s", day, exc_info=True)
+
+    async def get_rate_table(self) -> RateTable:
+        """Return the pivot rate table using a stale-while-revalidate cache.
+
+        A fresh table is served directly. Past its TTL but within
+        ``currency_cache_stale_max_minutes`` it is served while a single
+        background task refreshes it. Anything older is fetched inline, with
+        concurrent misses sharing one request.
+        """
+        now = datetime.now(timezone.utc)
+        key = ("rates", settings.currency_pivot.upper())
+        cached = self._rate_table
+        if cached and cached[0] > now:
+            self.rates_metrics.incr("hits")
+            return cached[2]
+        if cached and cached[1] > now:
+            self.rates_metrics.incr("stale_serves")
+            self._refresh_in_background(key, self._fetch_rate_table, self.rates_metrics)
+            return cached[2]
+
+        self.rates_metrics.incr("misses")
+        table, shared = await self._flight.do(key, self._fetch_rate_table)
+        if shared:
+            self.rates_metrics.incr("coalesced")
+        return table
+
+    def _refresh_in_background(self, key: tuple, fetch: Callable[[], Awaitable[Any]], metrics: CacheMetrics) -> None:
+        if self._flight.in_flight(key):
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._flight.do(key, fetch)
+            except Exception:
+                metrics.incr("refresh_errors")
+                logger.warning("Background refresh of %s failed", key, exc_info=True)
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(f"{settings.currency_api_base_url}/{base_currency}")
-            response.raise_for_status()
-            data = response.json()
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
 
+    async def _fetch_rate_table(self) -> RateTable:
+        pivot = settings.currency_pivot.upper()
+        data = await self._get_json(f"{self.currency_api_base_url}/{pivot}")
         rates = data.get("rates") or {}
-        self._rates_cache[base_currency] = (
-            datetime.now(timezone.utc) + timedelta(minutes=settings.currency_cache_ttl_minutes),
-            rates,
+        table = RateTable.from_rates(pivot, rates)
+        # Every live table is also recorded as that day's rates.
+        day = date.fromisoformat(data["date"]) if data.get("date") else datetime.now(timezone.utc).date()
+        await self._record_table(pivot, day, rates)
+        fresh_until = datetime.now(timezone.utc) + timedelta(minutes=settings.currency_cache_ttl_minutes)
+        self._rate_table = (
+            fresh_until,
+            fresh_until + timedelta(minutes=settings.currency_cache_stale_max_minutes),
+            table,
         )
-        return rates
+        return table
 
 
 currency_service = CurrencyService()
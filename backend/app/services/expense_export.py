@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterable, AsyncIterator, Literal
+
+from bson import ObjectId
+
+ExportFormat = Literal["csv", "ndjson"]
+
+CSV_COLUMNS = (
+    "id",
+    "employee_id",
+    "title",
+    "category",
+    "description",
+    "amount",
+    "currency_code",
+    "converted_amount",
+    "company_currency",
+    "conversion_rate",
+    "expense_date",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+MEDIA_TYPES: dict[ExportFormat, str] = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Rows are buffered into chunks of this size before being handed to the
+# response, so the socket sees a few large writes rather than one per row.
+ROWS_PER_CHUNK = 500
+
+
+def _export_value(key: str, value: Any) -> Any:
+    if key == "expense_date" and isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def _export_row(expense: dict[str, Any]) -> dict[str, Any]:
+    row = {key: _export_value(key, value) for key, value in expense.items() if key != "_id"}
+    row["id"] = str(expense["_id"])
+    return row
+
+
+async def encode_rows(expenses: AsyncIterable[dict[str, Any]], fmt: ExportFormat) -> AsyncIterator[str]:
+    """Encode expenses as CSV or NDJSON text chunks without materializing the export."""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+
+    rows = 0
+    async for expense in expenses:
+        row = _export_row(expense)
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row, default=str))
+            buffer.write("\n")
+        rows += 1
+        if rows % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from typing import IO, Any, Iterator, Literal
+
+ImportFormat = Literal["csv", "ndjson"]
+
+CSV_COLUMNS = (
+    "title",
+    "description",
+    "category",
+    "amount",
+    "currency_code",
+    "expense_date",
+    "receipt_url",
+    "receipt_text",
+    "approval_rule_id",
+)
+
+ImportRow = tuple[int, dict[str, Any] | None, str | None]
+
+
+def detect_format(filename: str | None, content_type: str | None) -> ImportFormat:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or (content_type or "").endswith(("ndjson", "jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def iter_rows(stream: IO[bytes], fmt: ImportFormat) -> Iterator[ImportRow]:
+    """Yield ``(row_number, data, error)`` for each record in the upload.
+
+    The binary stream is read and decoded one line at a time, so only one line
+    is held in memory and a line that is not valid UTF-8 only fails its own
+    row. Rows that cannot be parsed are yielded with ``data`` set to ``None``
+    and a message in ``error``.
+    """
+    lines = _DecodedLines(stream)
+    if fmt == "ndjson":
+        yield from _iter_ndjson(lines)
+    else:
+        yield from _iter_csv(lines)
+
+
+class _DecodedLines:
+    """Iterate the UTF-8 lines of a binary stream, collecting undecodable ones in ``errors``.
+
+    An undecodable line is replaced by an empty one, which both readers skip.
+    """
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        self.stream = stream
+        self.errors: list[tuple[int, str]] = []
+        self.line_number = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for line_number, raw in enumerate(self.stream, start=1):
+            self.line_number = line_number
+            if line_number == 1:
+                raw = raw.removeprefix(codecs.BOM_UTF8)
+            try:
+                yield raw.decode("utf-8")
+            except UnicodeDecodeError as exc:
+                self.errors.append((line_number, f"Line is not valid UTF-8 (byte {exc.start + 1})"))
+                yield "\n"
+
+    def drain_errors(self) -> Iterator[ImportRow]:
+        for line_number, message in self.errors:
+            yield line_number, None, message
+        self.errors.clear()
+
+
+def _iter_ndjson(lines: _DecodedLines) -> Iterator[ImportRow]:
+    for row_number, line in enumerate(lines, start=1):
+        yield from lines.drain_errors()
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield row_number, None, f"Invalid JSON: {exc.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, data, None
+
+
+def _iter_csv(lines: _DecodedLines) -> Iterator[ImportRow]:
+    reader = csv.DictReader(iter(lines))
+    try:
+        fieldnames = reader.fieldnames or []
+    except csv.Error as exc:
+        yield 1, None, f"Invalid CSV header: {exc}"
+        return
+    if lines.errors and lines.errors[0][0] == 1:
+        yield 1, None, "Header row is not valid UTF-8"
+        return
+    unknown = sorted(set(fieldnames) - set(CSV_COLUMNS))
+    if unknown:
+        yield 1, None, f"Unknown columns: {', '.join(unknown)}"
+        return
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as exc:
+            yield from lines.drain_errors()
+            yield lines.line_number, None, f"Invalid CSV: {exc}"
+            continue
+        yield from lines.drain_errors()
+        # Row numbers count the header line so they match what spreadsheets show.
+        yield reader.line_num, {key: value for key, value in record.items() if value not in (None, "")}, None
+    yield from lines.drain_errors()
+
+
+def format_validation_error(errors: list[dict[str, Any]]) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in errors)
@@ -1,84 +1,286 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Any
-
+import asyncio
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from itertools import islice
+from typing import IO, Any, AsyncIterator
+
+import httpx
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
 
 from app.db.repositories.approval_rule_repository import ApprovalRuleRepository
-from app.db.repositories.company_repository import CompanyRepository
 from app.db.repositories.expense_repository import ExpenseRepository
 from app.db.repositories.user_repository import UserRepository
 from app.schemas.common import ApprovalDecision, ExpenseStatus, UserRole
-from app.schemas.expense import ApprovalAction, ExpenseCreate, ExpenseUpdate
+from app.schemas.expense import ApprovalAction, BulkApprovalItem, ExpenseCreate, ExpenseUpdate
+from app.services.company_config import company_config
 from app.services.currency_service import currency_service
+from app.services.expense_export import ExportFormat, encode_rows
+from app.services.expense_import import ImportFormat, ImportRow, format_validation_error, iter_rows
+from app.services.org_tree import OrgTree, org_trees
+from app.services.rollup_service import rollup_service
+from app.services.rule_evaluator import NO_RULE, CompiledRule, rule_evaluators
+from app.utils.pagination import PageParams, build_projection, next_cursor, select_fields
+from app.utils.serializers import to_mongo_date
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _ImportContext:
+    """State shared across the chunks of one bulk import."""
+
+    employee: dict[str, Any]
+    company: dict[str, Any]
+    managers: tuple[str, ...]
+    routes: dict[str | None, tuple[dict[str, Any] | None, CompiledRule]] = field(default_factory=dict)
+    sequences: dict[tuple[str | None, int], list[str]] = field(default_factory=dict)
+    expense_ids: list[str] = field(default_factory=list)
+    errors: list[dict[str, Any]] = field(default_factory=list)
 
 
 class ExpenseService:
     def __init__(self) -> None:
         self.expense_repo = ExpenseRepository()
         self.user_repo = UserRepository()
-        self.company_repo = CompanyRepository()
         self.rule_repo = ApprovalRuleRepository()
 
     async def create_expense(self, company_id: str, employee_id: str, payload: ExpenseCreate) -> dict[str, Any]:
-        employee = await self.user_repo.get_user_by_id(employee_id)
+        employee, company, rule, org_tree = await asyncio.gather(
+            self.user_repo.get_user_by_id(employee_id),
+            company_config.get_company(company_id),
+            self._resolve_rule(company_id, payload.approval_rule_id),
+            org_trees.get(company_id),
+        )
+        self._check_submitter(company_id, employee, company)
+
+        # The amount is converted first: rules escalate to more managers above a company-currency threshold.
+        converted_amount, rate = await currency_service.convert_to_company_currency(
+            payload.amount, payload.currency_code, company["currency_code"], on_date=payload.expense_date
+        )
+        approver_sequence = rule_evaluators.compile(rule).approver_sequence(
+            employee, self._management_chain(employee, org_tree), converted_amount
+        )
+        if not approver_sequence:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No approvers configured")
+
+        expense_data = self._build_expense_document(
+            payload, company_id, employee_id, company, rule, approver_sequence, converted_amount, rate
+        )
+        # insert_one sets _id on the document, so it can be returned without re-reading it.
+        await self.expense_repo.create_expense(expense_data)
+        await rollup_service.record_changes([(None, expense_data)])
+        return self._serialize_expense(expense_data)
+
+    async def import_expenses(self, company_id: str, employee_id: str, stream: IO[bytes], fmt: ImportFormat) -> dict[str, Any]:
+        employee, company, org_tree = await asyncio.gather(
+            self.user_repo.get_user_by_id(employee_id),
+            company_config.get_company(company_id),
+            org_trees.get(company_id),
+        )
+        self._check_submitter(company_id, employee, company)
+
+        context = _ImportContext(employee=employee, company=company, managers=self._management_chain(employee, org_tree))
+        rows = iter_rows(stream, fmt)
+        processed = 0
+        while chunk := list(islice(rows, settings.expense_import_chunk_size)):
+            allowed = settings.expense_import_max_rows - processed
+            if allowed < len(chunk):
+                if allowed:
+                    await self._import_chunk(company_id, employee_id, chunk[:allowed], context)
+                context.errors.append(
+                    {
+                        "row": chunk[allowed][0],
+                        "message": f"Import is limited to {settings.expense_import_max_rows} rows; this row and the rest were not imported",
+                    }
+                )
+                break
+            processed += len(chunk)
+            await self._import_chunk(company_id, employee_id, chunk, context)
+
+        return {
+            "imported": len(context.expense_ids),
+            "failed": len(context.errors),
+            "expense_ids": context.expense_ids,
+            "errors": context.errors,
+        }
+
+    async def _import_chunk(self, company_id: str, employee_id: str, chunk: list[ImportRow], context: _ImportContext) -> None:
+        valid: list[tuple[int, ExpenseCreate]] = []
+        for row_number, data, error in chunk:
+            if error is not None:
+                context.errors.append({"row": row_number, "message": error})
+                continue
+            try:
+                valid.append((row_number, ExpenseCreate.model_validate(data)))
+            except ValidationError as exc:
+                context.errors.append({"row": row_number, "message": format_validation_error(exc.errors())})
+
+        # Rules and approver sequences are resolved once per distinct rule for the
+        # whole import, and the chunk is converted in one vectorized call per expense_date.
+        company_currency = context.company["currency_code"]
+        new_rule_ids = {payload.approval_rule_id for _, payload in valid} - context.routes.keys()
+        await asyncio.gather(*(self._load_import_route(company_id, context, rule_id) for rule_id in new_rule_ids))
+        converted, rates = await self._convert_import_amounts([payload for _, payload in valid], company_currency)
+
+        rows: list[int] = []
+        documents: list[dict[str, Any]] = []
+        for position, (row_number, payload) in enumerate(valid):
+            rule, evaluator = context.routes[payload.approval_rule_id]
+            if math.isnan(rates[position]):
+                context.errors.append(
+                    {"row": row_number, "message": f"Conversion rate from {payload.currency_code} to {company_currency} not available"}
+                )
+                continue
+            levels = evaluator.manager_levels_for(float(converted[position]))
+            approver_sequence = context.sequences.get((payload.approval_rule_id, levels))
+            if approver_sequence is None:
+                approver_sequence = evaluator.approver_sequence(context.employee, context.managers, float(converted[position]))
+                context.sequences[(payload.approval_rule_id, levels)] = approver_sequence
+            if not approver_sequence:
+                context.errors.append({"row": row_number, "message": "No approvers configured"})
+                continue
+            rows.append(row_number)
+            documents.append(
+                self._build_expense_document(
+                    payload,
+                    company_id,
+                    employee_id,
+                    context.company,
+                    rule,
+                    approver_sequence,
+                    float(converted[position]),
+                    float(rates[position]),
+                )
+            )
+        if not documents:
+            return
+
+        inserted = documents
+        try:
+            await self.expense_repo.create_expenses(documents)
+        except BulkWriteError as exc:
+            failed = {error["index"]: error.get("errmsg", "Insert failed") for error in exc.details.get("writeErrors", [])}
+            inserted = [document for index, document in enumerate(documents) if index not in failed]
+            for index, message in failed.items():
+                context.errors.append({"row": rows[index], "message": message})
+        context.expense_ids.extend(str(document["_id"]) for document in inserted)
+        await rollup_service.record_changes([(None, document) for document in inserted])
+
+    async def _load_import_route(self, company_id: str, context: _ImportContext, rule_id: str | None) -> None:
+        rule = await self._resolve_rule(company_id, rule_id)
+        context.routes[rule_id] = (rule, rule_evaluators.compile(rule))
+
+    async def _convert_import_amounts(self, payloads: list[ExpenseCreate], company_currency: str) -> tuple[list[float], list[float]]:
+        converted = [payload.amount for payload in payloads]
+        rates = [1.0] * len(payloads)
+        by_date: dict[date, list[int]] = {}
+        for position, payload in enumerate(payloads):
+            if payload.currency_code.upper() != company_currency.upper():
+                by_date.setdefault(payload.expense_date, []).append(position)
+        for expense_date, positions in by_date.items():
+            try:
+                day_converted, day_rates = await currency_service.convert_many(
+                    [payloads[position].amount for position in positions],
+                    [payloads[position].currency_code for position in positions],
+                    company_currency,
+                    on_date=expense_date,
+                )
+            except (httpx.HTTPError, ValueError):
+                # Reported per row like a missing rate, so the rest of the import still goes in.
+                logger.warning("Exchange rates for %s unavailable during import", expense_date, exc_info=True)
+                for position in positions:
+                    rates[position] = math.nan
+                continue
+            for position, amount, rate in zip(positions, day_converted.tolist(), day_rates.tolist()):
+                converted[position] = amount
+                rates[position] = rate
+        return converted, rates
+
+    def _check_submitter(self, company_id: str, employee: dict[str, Any] | None, company: dict[str, Any] | None) -> None:
         if not employee or employee.get("company_id") != company_id:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
         if employee.get("role") != UserRole.employee.value:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only employees can submit expenses")
-
-        company = await self.company_repo.get_company_by_id(company_id)
         if not company:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
 
-        rule = await self._resolve_rule(company_id, payload.approval_rule_id)
-        approver_sequence = await self._build_approver_sequence(employee, rule)
-        if not approver_sequence:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No approvers configured")
-
-        converted_amount, rate = await currency_service.convert_to_company_currency(
-            payload.amount, payload.currency_code, company["currency_code"]
-        )
-
+    def _build_expense_document(
+        self,
+        payload: ExpenseCreate,
+        company_id: str,
+        employee_id: str,
+        company: dict[str, Any],
+        rule: dict[str, Any] | None,
+        approver_sequence: list[str],
+        converted_amount: float,
+        rate: float,
+    ) -> dict[str, Any]:
         expense_data = payload.model_dump()
         expense_data.update(
             {
+                "expense_date": to_mongo_date(payload.expense_date),
                 "company_id": company_id,
                 "employee_id": employee_id,
                 "status": ExpenseStatus.pending.value,
                 "approver_sequence": approver_sequence,
                 "current_step_index": 0,
+                "current_approver_id": approver_sequence[0],
+                "version": 0,
                 "approval_rule_id": rule["id"] if rule else None,
                 "approval_history": [],
+                "approval_count": 0,
+                "specific_approved": False,
                 "company_currency": company["currency_code"],
                 "converted_amount": converted_amount,
                 "conversion_rate": rate,
             }
         )
-        expense_id = await self.expense_repo.create_expense(expense_data)
-        expense = await self.expense_repo.get_expense_by_id(expense_id)
-        return self._serialize_expense(expense)
-
-    async def list_employee_expenses(self, company_id: str, employee_id: str) -> list[dict[str, Any]]:
-        expenses = await self.expense_repo.list_expenses_for_employee(company_id, employee_id)
-        return [self._serialize_expense(expense) for expense in expenses]
+        return expense_data
+
+    async def list_employee_expenses(
+        self, company_id: str, employee_id: str, page: PageParams | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        page = page or PageParams()
+        expenses = await self.expense_repo.list_expenses_for_employee(
+            company_id, employee_id, page.limit, page.after, build_projection(page.fields)
+        )
+        return self._serialize_page(expenses, page)
 
-    async def list_company_expenses(self, company_id: str) -> list[dict[str, Any]]:
-        expenses = await self.expense_repo.list_expenses_for_company(company_id)
-        return [self._serialize_expense(expense) for expense in expenses]
+    async def list_company_expenses(self, company_id: str, page: PageParams | None = None) -> tuple[list[dict[str, Any]], str | None]:
+        page = page or PageParams()
+        expenses = await self.expense_repo.list_expenses_for_company(
+            company_id, page.limit, page.after, build_projection(page.fields)
+        )
+        return self._serialize_page(expenses, page)
+
+    def export_expenses(
+        self,
+        company_id: str,
+        fmt: ExportFormat,
+        status_filter: ExpenseStatus | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> AsyncIterator[str]:
+        cursor = self.expense_repo.iter_expenses_for_export(
+            company_id,
+            status_filter.value if status_filter else None,
+            date_from,
+            date_to,
+            batch_size=settings.expense_export_batch_size,
+        )
+        return encode_rows(cursor, fmt)
 
     async def list_pending_for_approver(self, company_id: str, approver_id: str) -> list[dict[str, Any]]:
-        expenses = await self.expense_repo.list_pending_for_approver(company_id)
-        pending: list[dict[str, Any]] = []
-        for expense in expenses:
-            approver_sequence: list[str] = expense.get("approver_sequence", [])
-            current_index: int = expense.get("current_step_index", 0)
-            if expense.get("status") != ExpenseStatus.pending.value:
-                continue
-            if current_index < len(approver_sequence) and approver_sequence[current_index] == approver_id:
-                pending.append(self._serialize_expense(expense))
-        return pending
+        expenses = await self.expense_repo.list_pending_for_approver(company_id, approver_id)
+        return [self._serialize_expense(expense) for expense in expenses]
 
     async def update_expense(self, company_id: str, expense_id: str, payload: ExpenseUpdate, requester: dict[str, Any]) -> dict[str, Any]:
         expense = await self.expense_repo.get_expense_by_id(expense_id)
@@ -90,24 +292,32 @@ class ExpenseService:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorised to update this expense")
 
         update_data = payload.model_dump(exclude_unset=True)
+        if update_data.get("expense_date") is not None:
+            update_data["expense_date"] = to_mongo_date(update_data["expense_date"])
         if update_data:
-            if "amount" in update_data or "currency_code" in update_data:
-                company = await self.company_repo.get_company_by_id(company_id)
+            if update_data.keys() & {"amount", "currency_code", "expense_date"}:
+                company = await company_config.get_company(company_id)
                 if company:
                     amount = update_data.get("amount", expense.get("amount"))
                     currency = update_data.get("currency_code", expense.get("currency_code"))
+                    expense_date = update_data.get("expense_date", expense.get("expense_date"))
                     converted_amount, rate = await currency_service.convert_to_company_currency(
                         amount,
                         currency,
                         company["currency_code"],
+                        on_date=expense_date,
                     )
                     update_data["converted_amount"] = converted_amount
                     update_data["conversion_rate"] = rate
-        success = await self.expense_repo.update_expense(expense_id, update_data)
-        if not success:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update expense")
-
-        updated = await self.expense_repo.get_expense_by_id(expense_id)
+                    if converted_amount != expense.get("converted_amount"):
+                        update_data.update(await self._reroute(company_id, expense, converted_amount))
+        updated = await self.expense_repo.update_expense(expense, update_data)
+        if updated is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Expense was modified by another request; reload it and try again",
+            )
+        await rollup_service.record_changes([(expense, updated)])
         return self._serialize_expense(updated)
 
     async def record_approval(self, company_id: str, expense_id: str, approver_id: str, payload: ApprovalAction) -> dict[str, Any]:
@@ -128,96 +338,147 @@ class ExpenseService:
             "comment": payload.comment,
             "timestamp": datetime.now(timezone.utc),
         }
-        await self.expense_repo.add_approval_entry(expense_id, approval_entry)
-
-        expense = await self.expense_repo.get_expense_by_id(expense_id)
-        rule = None
-        if expense.get("approval_rule_id"):
-            rule = await self.rule_repo.get_rule_by_id(expense["approval_rule_id"])
-            if rule:
-                rule["id"] = str(rule.pop("_id"))
-
-        status_update = await self._evaluate_approval(expense, rule, payload.decision == ApprovalDecision.approved)
-        await self.expense_repo.update_expense(expense_id, status_update)
-
-        updated = await self.expense_repo.get_expense_by_id(expense_id)
+        evaluators = await self._load_evaluators([expense.get("approval_rule_id")])
+        evaluator = evaluators.get(expense.get("approval_rule_id") or "", NO_RULE)
+        status_update = evaluator.evaluate(expense, approver_id, payload.decision == ApprovalDecision.approved)
+        updated = await self.expense_repo.apply_approval(expense, approval_entry, status_update)
+        if updated is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Expense was modified by another request; reload it and try again",
+            )
+        await rollup_service.record_changes([(expense, updated)])
         return self._serialize_expense(updated)
 
+    async def record_approvals(self, company_id: str, approver_id: str, items: list[BulkApprovalItem]) -> list[dict[str, Any]]:
+        """Apply a batch of decisions with a fixed number of round-trips.
+
+        One query loads every expense the caller may act on, at most one loads
+        the rules not already compiled in this worker, one ``bulk_write``
+        applies all transitions and one read checks which of the guarded
+        updates matched.
+        """
+        expense_ids = list(dict.fromkeys(item.expense_id for item in items))
+        expenses = {
+            str(expense["_id"]): expense
+            for expense in await self.expense_repo.list_pending_by_ids_for_approver(company_id, approver_id, expense_ids)
+        }
+        evaluators = await self._load_evaluators([expense.get("approval_rule_id") for expense in expenses.values()])
+
+        results: list[dict[str, Any]] = []
+        transitions: list[tuple[dict[str, Any], dict[str, Any], dict[str, Any]]] = []
+        pending_results: dict[str, dict[str, Any]] = {}
+        seen: set[str] = set()
+        timestamp = datetime.now(timezone.utc)
+        for item in items:
+            result: dict[str, Any] = {"expense_id": item.expense_id, "outcome": "applied", "status": None, "detail": None}
+            results.append(result)
+            if item.expense_id in seen:
+                result.update(outcome="duplicate", detail="Expense appears more than once in the batch")
+                continue
+            seen.add(item.expense_id)
+            expense = expenses.get(item.expense_id)
+            if expense is None:
+                result.update(outcome="not_found", detail="Expense not found or not awaiting your approval")
+                continue
+            approval_entry = {
+                "approver_id": approver_id,
+                "decision": item.decision.value,
+                "comment": item.comment,
+                "timestamp": timestamp,
+            }
+            evaluator = evaluators.get(expense.get("approval_rule_id") or "", NO_RULE)
+            status_update = evaluator.evaluate(expense, approver_id, item.decision == ApprovalDecision.approved)
+            transitions.append((expense, approval_entry, status_update))
+            pending_results[item.expense_id] = result
+
+        if transitions:
+            applied = await self.expense_repo.apply_approvals(transitions)
+            changes = []
+            for expense, _, status_update in transitions:
+                result = pending_results[str(expense["_id"])]
+                if expense["_id"] in applied:
+                    result["status"] = status_update.get("status", expense.get("status"))
+                    changes.append((expense, {**expense, **status_update}))
+                else:
+                    result.update(outcome="conflict", detail="Expense was modified by another request")
+            await rollup_service.record_changes(changes)
+        return results
+
     async def _resolve_rule(self, company_id: str, rule_id: str | None) -> dict[str, Any] | None:
-        rule = None
+        active_rules = await company_config.list_active_rules(company_id)
         if rule_id:
+            for rule in active_rules:
+                if rule["id"] == rule_id:
+                    return rule
+            # Inactive rules can still be chosen explicitly; they are not cached.
             rule = await self.rule_repo.get_rule_by_id(rule_id)
             if rule and rule.get("company_id") == company_id:
                 rule["id"] = str(rule.pop("_id"))
-            else:
-                rule = None
-        if rule is None:
-            rules = await self.rule_repo.list_active_rules_for_company(company_id)
-            if rules:
-                rule = rules[0]
-                rule["id"] = str(rule.pop("_id"))
-        return rule
-
-    async def _build_approver_sequence(self, employee: dict[str, Any], rule: dict[str, Any] | None) -> list[str]:
-        sequence: list[str] = []
-        if employee.get("manager_id") and employee.get("is_manager_approver"):
-            sequence.append(employee["manager_id"])
-        if rule:
-            order = rule.get("order") or []
-            for approver_id in order:
-                if approver_id not in sequence:
-                    sequence.append(approver_id)
-            for approver_id in rule.get("approver_ids", []):
-                if approver_id not in sequence:
-                    sequence.append(approver_id)
-            specific = rule.get("specific_approver_id")
-            if specific and specific not in sequence:
-                sequence.append(specific)
-        return sequence
-
-    async def _evaluate_approval(self, expense: dict[str, Any], rule: dict[str, Any] | None, approved: bool) -> dict[str, Any]:
-        approver_sequence: list[str] = expense.get("approver_sequence", [])
-        current_index: int = expense.get("current_step_index", 0)
-        approval_history: list[dict[str, Any]] = expense.get("approval_history", [])
-
-        if not approved:
-            return {
-                "status": ExpenseStatus.rejected.value,
-                "current_step_index": len(approver_sequence),
-            }
-
-        if rule and rule.get("rule_type") in {"percentage", "hybrid"} and rule.get("percentage_threshold"):
-            approvals = len({entry["approver_id"] for entry in approval_history if entry["decision"] == ApprovalDecision.approved.value})
-            required = max(1, round(len(approver_sequence) * (rule["percentage_threshold"] / 100)))
-            if approvals >= required:
-                return {
-                    "status": ExpenseStatus.approved.value,
-                    "current_step_index": len(approver_sequence),
-                }
-
-        if rule and rule.get("rule_type") in {"specific", "hybrid"} and rule.get("specific_approver_id"):
-            specific = rule["specific_approver_id"]
-            specific_approved = any(
-                entry["approver_id"] == specific and entry["decision"] == ApprovalDecision.approved.value
-                for entry in approval_history
-            )
-            if specific_approved:
-                return {
-                    "status": ExpenseStatus.approved.value,
-                    "current_step_index": len(approver_sequence),
-                }
-
-        next_index = current_index + 1
-        if next_index >= len(approver_sequence):
-            return {
-                "status": ExpenseStatus.approved.value,
-                "current_step_index": next_index,
-            }
-
+                return rule
+        return active_rules[0] if active_rules else None
+
+    def _management_chain(self, employee: dict[str, Any], org_tree: OrgTree) -> tuple[str, ...]:
+        """The employee's managers, nearest first, read from the cached org tree.
+
+        The employee document is authoritative for the first link, so a change
+        made by another worker since the tree was built is still honoured.
+        """
+        manager_id = employee.get("manager_id")
+        if not manager_id:
+            return ()
+        employee_id = str(employee["_id"])
+        return tuple(approver_id for approver_id in org_tree.management_chain(manager_id) if approver_id != employee_id)
+
+    async def _reroute(self, company_id: str, expense: dict[str, Any], converted_amount: float) -> dict[str, Any]:
+        """Approval routing for ``expense`` at its new amount, restarting from the first approver.
+
+        Escalation depends on the amount, so approvals given at the old amount
+        no longer count; they stay in the history.
+        """
+        rule_id = expense.get("approval_rule_id")
+        employee, org_tree, evaluators = await asyncio.gather(
+            self.user_repo.get_user_by_id(expense["employee_id"]),
+            org_trees.get(company_id),
+            self._load_evaluators([rule_id]),
+        )
+        if not employee:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
+        approver_sequence = evaluators.get(rule_id or "", NO_RULE).approver_sequence(
+            employee, self._management_chain(employee, org_tree), converted_amount
+        )
+        if not approver_sequence:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No approvers configured")
         return {
-            "current_step_index": next_index,
+            "approver_sequence": approver_sequence,
+            "current_step_index": 0,
+            "current_approver_id": approver_sequence[0],
+            "approval_count": 0,
+            "specific_approved": False,
         }
 
+    async def _load_evaluators(self, rule_ids: list[str | None]) -> dict[str, CompiledRule]:
+        """Compiled evaluators for ``rule_ids``, reading from Mongo only the rules not cached in this worker."""
+        evaluators: dict[str, CompiledRule] = {}
+        missing: list[str] = []
+        for rule_id in dict.fromkeys(rule_id for rule_id in rule_ids if rule_id):
+            evaluator = rule_evaluators.current(rule_id)
+            if evaluator is None:
+                missing.append(rule_id)
+            else:
+                evaluators[rule_id] = evaluator
+        for rule in await self.rule_repo.get_rules_by_ids(missing) if missing else []:
+            rule["id"] = str(rule.pop("_id"))
+            evaluators[rule["id"]] = rule_evaluators.compile(rule)
+        return evaluators
+
+    def _serialize_page(self, expenses: list[dict[str, Any]], page: PageParams) -> tuple[list[dict[str, Any]], str | None]:
+        if page.fields:
+            items = [select_fields(expense, page.fields) for expense in expenses]
+        else:
+            items = [self._serialize_expense(expense) for expense in expenses]
+        return items, next_cursor(expenses, page.limit)
+
     def _serialize_expense(self, expense: dict[str, Any] | None) -> dict[str, Any]:
         if not expense:
             return {}
@@ -1,8 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, AsyncIterator
 
 from fastapi import HTTPException, UploadFile, status
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.db.repositories.ocr_job_repository import OCRJobRepository
+from app.db.repositories.ocr_result_repository import OCRResultRepository
+from app.schemas.common import OCRJobStatus
+from app.schemas.ocr import OCRBatchResult, OCRJobPublic
+from app.services.receipt_preprocessing import PreprocessOptions, preprocess
+from app.utils.executor import BoundedExecutor
+from app.utils.metrics import cache_metrics
+from app.utils.serializers import serialize_document
+from app.utils.singleflight import SingleFlight
 
 try:
     import pytesseract
@@ -14,24 +37,362 @@ except Exception as exc:  # pragma: no cover - optional dependency
 else:
     _import_error = None
 
+try:
+    import pypdfium2 as pdfium
+except Exception:  # pragma: no cover - optional dependency
+    pdfium = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+_FINISHED = {OCRJobStatus.succeeded.value, OCRJobStatus.failed.value}
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+class OCRUnavailableError(RuntimeError):
+    pass
+
+
+def _extract_text(content: bytes, timeout_seconds: float, options: PreprocessOptions) -> str:
+    """Runs in an OCR worker process; must stay a picklable module-level function."""
+    try:
+        image = Image.open(BytesIO(content))  # type: ignore[union-attr]
+        image.load()
+        image = preprocess(image, options)
+    except Exception as exc:
+        raise InvalidImageError(f"Invalid image: {exc}") from None
+    # pytesseract's own exceptions do not survive pickling back to the parent,
+    # so they are re-raised as plain ones.
+    try:
+        with image:
+            # pytesseract kills the tesseract subprocess once the timeout passes.
+            return pytesseract.image_to_string(image, timeout=timeout_seconds)  # type: ignore[union-attr]
+    except pytesseract.TesseractNotFoundError as exc:  # type: ignore[union-attr]
+        raise OCRUnavailableError(str(exc)) from None
+    except pytesseract.TesseractError as exc:  # type: ignore[union-attr]
+        raise RuntimeError(str(exc)) from None
+
+
+def _split_pages(content: bytes, max_pages: int, pdf_dpi: int) -> list[bytes]:
+    """Runs in an OCR worker process: split a multi-page TIFF or PDF into one PNG per page.
+
+    Single-page images are returned as-is so their bytes still match the OCR result cache.
+    """
+    if content.startswith(b"%PDF"):
+        if pdfium is None:
+            raise InvalidImageError("PDF receipts require the pypdfium2 package")
+        try:
+            document = pdfium.PdfDocument(content)
+        except Exception as exc:
+            raise InvalidImageError(f"Invalid PDF: {exc}") from None
+        if len(document) > max_pages:
+            raise InvalidImageError(f"Receipts are limited to {max_pages} pages")
+        return [_encode_page(page.render(scale=pdf_dpi / 72).to_pil()) for page in document]
+
+    try:
+        image = Image.open(BytesIO(content))  # type: ignore[union-attr]
+    except Exception as exc:
+        raise InvalidImageError(f"Invalid image: {exc}") from None
+    frames = getattr(image, "n_frames", 1)
+    if frames == 1:
+        return [content]
+    if frames > max_pages:
+        raise InvalidImageError(f"Receipts are limited to {max_pages} pages")
+    pages = []
+    try:
+        for frame in range(frames):
+            image.seek(frame)
+            pages.append(_encode_page(image))
+    except Exception as exc:
+        raise InvalidImageError(f"Invalid image: page {len(pages) + 1}: {exc}") from None
+    return pages
+
+
+def _encode_page(image: Any) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    # Forking a process that holds an event loop and a Mongo client is unsafe, so workers are spawned.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
 
 class OCRService:
     def __init__(self) -> None:
         self.available = pytesseract is not None and Image is not None
+        self.executor = BoundedExecutor(
+            "ocr",
+            max_workers=settings.ocr_workers or os.cpu_count() or 1,
+            max_queue=settings.ocr_queue_size,
+            retry_after_seconds=settings.ocr_retry_after_seconds,
+            executor_factory=_process_pool,
+        )
+        self.job_repo = OCRJobRepository()
+        self.result_repo = OCRResultRepository()
+        self.result_metrics = cache_metrics("ocr_results")
+        self._flight = SingleFlight()
+        self._jobs: set[asyncio.Task[None]] = set()
+        # Set when a job started by this worker process finishes.
+        self._job_events: dict[str, asyncio.Event] = {}
+
+    def shutdown(self) -> None:
+        for task in self._jobs:
+            task.cancel()
+        self._jobs.clear()
+        self.executor.shutdown()
 
     async def extract_text(self, file: UploadFile) -> dict[str, str]:
+        self._check_available()
+        content = await self.read_upload(file)
+        return {"text": (await self.run_ocr(content)).strip()}
+
+    async def spool_upload(self, file: UploadFile) -> IO[bytes]:
+        """Copy an upload into a temporary file that rolls over to disk past ``ocr_spool_threshold_bytes``.
+
+        Uploads larger than ``ocr_max_upload_bytes`` are rejected with 413.
+        The copy outlives the request's own upload, which is closed before a
+        streamed response body runs.
+        """
+        spool = SpooledTemporaryFile(max_size=settings.ocr_spool_threshold_bytes)
+        size = 0
+        try:
+            while chunk := await file.read(256 * 1024):
+                size += len(chunk)
+                if size > settings.ocr_max_upload_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"{file.filename or 'Upload'} exceeds {settings.ocr_max_upload_bytes} bytes",
+                    )
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
+    async def read_upload(self, file: UploadFile) -> bytes:
+        with await self.spool_upload(file) as spool:
+            return spool.read()
+
+    async def extract_batch(self, files: list[UploadFile]) -> AsyncIterator[str]:
+        """OCR several uploads, splitting multi-page TIFFs and PDFs into pages.
+
+        Every page of every file is recognised in parallel on the worker pool,
+        and one NDJSON line per file is yielded as soon as that file is done.
+        """
+        self._check_available()
+        if len(files) > settings.ocr_max_batch_files:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.ocr_max_batch_files} files can be processed per request",
+            )
+        spools: list[IO[bytes]] = []
+        try:
+            for file in files:
+                spools.append(await self.spool_upload(file))
+        except BaseException:
+            for spool in spools:
+                spool.close()
+            raise
+        return self._stream_batch([file.filename for file in files], spools)
+
+    async def _stream_batch(self, filenames: list[str | None], spools: list[IO[bytes]]) -> AsyncIterator[str]:
+        # Keeps one batch from filling the shared queue and starving other uploads.
+        slots = asyncio.Semaphore(self.executor.max_workers)
+        tasks = [
+            asyncio.create_task(self._batch_file(index, filename, spool, slots))
+            for index, (filename, spool) in enumerate(zip(filenames, spools))
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                yield result.model_dump_json() + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            for spool in spools:
+                spool.close()
+
+    async def _batch_file(self, index: int, filename: str | None, spool: IO[bytes], slots: asyncio.Semaphore) -> OCRBatchResult:
+        try:
+            content = spool.read()
+            spool.close()
+            async with slots:
+                pages = await self._run_in_pool(_split_pages, content, settings.ocr_max_pages, settings.ocr_pdf_dpi)
+            del content
+
+            async def page_text(page: bytes) -> str:
+                async with slots:
+                    return (await self.run_ocr(page)).strip()
+
+            texts = await asyncio.gather(*(page_text(page) for page in pages))
+        except HTTPException as exc:
+            return OCRBatchResult(index=index, filename=filename, error=str(exc.detail), status_code=exc.status_code)
+        except Exception:
+            # One bad file must not cut off the stream for the rest of the batch.
+            logger.exception("OCR failed for batch file %s (%s)", index, filename)
+            return OCRBatchResult(
+                index=index, filename=filename, error="OCR failed", status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return OCRBatchResult(index=index, filename=filename, pages=texts, text="\n\n".join(texts))
+
+    async def submit_job(self, user: dict[str, Any], file: UploadFile) -> dict[str, Any]:
+        """Queue OCR for ``file`` and return the job right away; the result is stored on the job."""
+        self._check_available()
+        if len(self._jobs) >= self.executor.capacity:
+            raise self._busy_error()
+        content = await self.read_upload(file)
+        job = {
+            "user_id": user["id"],
+            "company_id": user["company_id"],
+            "status": OCRJobStatus.queued.value,
+            "filename": file.filename,
+            "text": None,
+            "error": None,
+            "finished_at": None,
+        }
+        job_id = await self.job_repo.create_job(job, timedelta(minutes=settings.ocr_job_ttl_minutes))
+        self._job_events[job_id] = asyncio.Event()
+        task = asyncio.create_task(self._run_job(job_id, content))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+        return serialize_document(job) or {}
+
+    async def get_job(self, user: dict[str, Any], job_id: str) -> dict[str, Any]:
+        job = await self.job_repo.get_job(job_id)
+        if not job or job.get("user_id") != user["id"]:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OCR job not found")
+        return serialize_document(job) or {}
+
+    async def job_events(self, user: dict[str, Any], job_id: str) -> AsyncIterator[str]:
+        """Server-sent events for a job: keep-alive comments while it runs, then one final event."""
+        job = await self.get_job(user, job_id)
+        return self._stream_job_events(job)
+
+    async def _stream_job_events(self, job: dict[str, Any]) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ocr_job_event_timeout_seconds
+        while job["status"] not in _FINISHED:
+            if loop.time() >= deadline:
+                yield "event: timeout\ndata: {}\n\n"
+                return
+            event = self._job_events.get(job["id"])
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), 15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+            else:
+                # The job runs in another worker process (or finished meanwhile); poll the store.
+                await asyncio.sleep(1)
+            job = serialize_document(await self.job_repo.get_job(job["id"])) or {"id": job["id"], **job}
+        yield f"event: {job['status']}\ndata: {OCRJobPublic.model_validate(job).model_dump_json()}\n\n"
+
+    async def _run_job(self, job_id: str, content: bytes) -> None:
+        update: dict[str, Any]
+        try:
+            await self.job_repo.update_job(job_id, {"status": OCRJobStatus.running.value})
+            text = await self.run_ocr(content)
+            update = {"status": OCRJobStatus.succeeded.value, "text": text.strip()}
+        except HTTPException as exc:
+            update = {"status": OCRJobStatus.failed.value, "error": exc.detail}
+        except Exception:
+            logger.exception("OCR job %s failed", job_id)
+            update = {"status": OCRJobStatus.failed.value, "error": "OCR failed"}
+        update["finished_at"] = datetime.now(timezone.utc)
+        try:
+            await self.job_repo.update_job(job_id, update, ttl=timedelta(minutes=settings.ocr_job_ttl_minutes))
+        finally:
+            event = self._job_events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    def _check_available(self) -> None:
         if not self.available:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail=f"OCR service not available: {_import_error}",
             )
-        content = await file.read()
+
+    async def run_ocr(self, content: bytes) -> str:
+        """Recognise ``content``, answering repeat uploads of the same bytes from the result cache.
+
+        Results are keyed by the SHA-256 of the upload and the preprocessing
+        options, and concurrent uploads of the same image share one OCR run.
+        """
+        options = PreprocessOptions.from_settings()
+        if not settings.ocr_cache_enabled:
+            return await self._recognize(content, options)
+
+        key = f"{hashlib.sha256(content).hexdigest()}:{options.fingerprint()}"
+        cached = await self._cached_result(key)
+        if cached is not None:
+            self.result_metrics.incr("hits")
+            return cached
+        self.result_metrics.incr("misses")
+        text, shared = await self._flight.do(("ocr", key), lambda: self._recognize_and_store(key, content, options))
+        if shared:
+            self.result_metrics.incr("coalesced")
+        return text
+
+    async def _cached_result(self, key: str) -> str | None:
+        try:
+            cached = await self.result_repo.get_result(key)
+        except (PyMongoError, RuntimeError):
+            logger.warning("OCR result cache lookup failed", exc_info=True)
+            return None
+        return cached["text"] if cached else None
+
+    async def _recognize_and_store(self, key: str, content: bytes, options: PreprocessOptions) -> str:
+        text = await self._recognize(content, options)
+        try:
+            await self.result_repo.save_result(
+                key, {"content_sha256": key.split(":", 1)[0], "options": asdict(options), "text": text}
+            )
+            await self.result_repo.trim(settings.ocr_cache_max_entries)
+        except (PyMongoError, RuntimeError):
+            logger.warning("Could not store OCR result", exc_info=True)
+        return text
+
+    async def _recognize(self, content: bytes, options: PreprocessOptions) -> str:
+        return await self._run_in_pool(_extract_text, content, settings.ocr_timeout_seconds, options)
+
+    async def _run_in_pool(self, fn: Any, *args: Any) -> Any:
+        timeout = settings.ocr_timeout_seconds
         try:
-            with Image.open(BytesIO(content)) as image:  # type: ignore[arg-type]
-                text = pytesseract.image_to_string(image)  # type: ignore[arg-type]
-        except Exception as exc:  # pragma: no cover - invalid image
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid image: {exc}")
-        return {"text": text.strip()}
+            # The outer timeout only fires if the worker itself fails to stop tesseract in time.
+            return await asyncio.wait_for(self.executor.run(fn, *args), timeout + 5)
+        except InvalidImageError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        except asyncio.TimeoutError:
+            raise self._timeout_error()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool for the next job.
+            self.executor.shutdown()
+            raise self._busy_error("OCR worker crashed, retry shortly")
+        except OCRUnavailableError as exc:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"OCR service not available: {exc}")
+        except RuntimeError as exc:
+            if "timeout" in str(exc).lower():
+                raise self._timeout_error()
+            raise
+
+    def _busy_error(self, detail: str = "Server is busy (ocr), retry shortly") -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(settings.ocr_retry_after_seconds)},
+        )
+
+    def _timeout_error(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"OCR did not finish within {settings.ocr_timeout_seconds:g} seconds",
+        )
 
 
 ocr_service = OCRService()
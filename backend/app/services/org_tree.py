@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+
+from app.core.config import settings
+from app.db.repositories.user_repository import UserRepository
+from app.utils.cache import TTLCache
+from app.utils.metrics import cache_metrics
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class OrgTree:
+    """Manager links of one company, with each user's chain of managers memoized.
+
+    Chains are resolved on first use and dropped for a whole subtree when a
+    user's manager changes. Links to users outside the company end a chain,
+    and so does a cycle already present in the data; cycles are logged rather
+    than raised so routing keeps working.
+    """
+
+    def __init__(self, managers: dict[str, str | None]) -> None:
+        self._managers = managers
+        self._reports: dict[str, set[str]] = {}
+        for user_id, manager_id in managers.items():
+            if manager_id:
+                self._reports.setdefault(manager_id, set()).add(user_id)
+        self._chains: dict[str, tuple[str, ...]] = {}
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._managers
+
+    def __len__(self) -> int:
+        return len(self._managers)
+
+    def ancestors(self, user_id: str) -> tuple[str, ...]:
+        """Managers above ``user_id``, nearest first."""
+        chain = self._chains.get(user_id)
+        if chain is not None:
+            return chain
+        path: list[str] = []
+        seen = {user_id}
+        current = self._managers.get(user_id)
+        while current and current in self._managers:
+            if current in seen:
+                logger.warning("Manager cycle through user %s; chain of %s truncated", current, user_id)
+                break
+            cached = self._chains.get(current)
+            if cached is not None and seen.isdisjoint(cached):
+                path.append(current)
+                path.extend(cached)
+                break
+            path.append(current)
+            seen.add(current)
+            current = self._managers.get(current)
+        chain = tuple(path)
+        self._chains[user_id] = chain
+        return chain
+
+    def management_chain(self, manager_id: str) -> tuple[str, ...]:
+        """``manager_id`` followed by their own managers: the approvers above a direct report."""
+        return (manager_id, *self.ancestors(manager_id))
+
+    def would_cycle(self, user_id: str, manager_id: str | None) -> bool:
+        return bool(manager_id) and (manager_id == user_id or user_id in self.ancestors(manager_id))
+
+    def set_manager(self, user_id: str, manager_id: str | None) -> None:
+        previous = self._managers.get(user_id)
+        if previous:
+            self._reports.get(previous, set()).discard(user_id)
+        self._managers[user_id] = manager_id
+        if manager_id:
+            self._reports.setdefault(manager_id, set()).add(user_id)
+        self._forget_subtree(user_id)
+
+    def remove(self, user_id: str) -> None:
+        previous = self._managers.pop(user_id, None)
+        if previous:
+            self._reports.get(previous, set()).discard(user_id)
+        self._forget_subtree(user_id)
+
+    def _forget_subtree(self, user_id: str) -> None:
+        pending = [user_id]
+        seen: set[str] = set()
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            self._chains.pop(current, None)
+            pending.extend(self._reports.get(current, ()))
+
+
+class OrgTreeCache:
+    """Per-company :class:`OrgTree` built from one scan of the company's users.
+
+    Edits made through :class:`UserService` are applied to the cached tree in
+    place; ``org_tree_cache_ttl_seconds`` bounds how long edits made by other
+    workers go unseen.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.user_repo = UserRepository()
+        self._trees: TTLCache[OrgTree] = TTLCache(max_entries, ttl_seconds, cache_metrics("org_trees"))
+        self._builds = SingleFlight()
+        # Bumped on every edit, so a scan that raced with one is not cached.
+        self._generations: Counter[str] = Counter()
+
+    async def get(self, company_id: str) -> OrgTree:
+        tree = self._trees.get(company_id)
+        if tree is None:
+            tree, _ = await self._builds.do(company_id, lambda: self._build(company_id))
+        return tree
+
+    async def _build(self, company_id: str) -> OrgTree:
+        generation = self._generations[company_id]
+        users = await self.user_repo.list_users_by_company(company_id, projection={"manager_id": 1})
+        tree = OrgTree({str(user["_id"]): user.get("manager_id") for user in users})
+        if self._generations[company_id] == generation:
+            self._trees.set(company_id, tree)
+        return tree
+
+    def set_manager(self, company_id: str, user_id: str, manager_id: str | None) -> None:
+        self._generations[company_id] += 1
+        tree = self._trees.get(company_id)
+        if tree is not None:
+            tree.set_manager(user_id, manager_id)
+
+    def remove_user(self, company_id: str, user_id: str) -> None:
+        self._generations[company_id] += 1
+        tree = self._trees.get(company_id)
+        if tree is not None:
+            tree.remove(user_id)
+
+    def clear(self) -> None:
+        self._trees.clear()
+
+
+org_trees = OrgTreeCache(settings.org_tree_cache_max_entries, settings.org_tree_cache_ttl_seconds)
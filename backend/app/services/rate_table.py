@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """Exchange rates for every currency relative to a single pivot currency.
+
+    ``rates[i]`` is the number of units of ``codes[i]`` per unit of the pivot,
+    so the rate from any currency to any other is ``rates[to] / rates[from]``.
+    One table therefore serves every currency pair.
+    """
+
+    pivot: str
+    codes: tuple[str, ...]
+    rates: np.ndarray
+    index: dict[str, int] = field(repr=False)
+
+    @classmethod
+    def from_rates(cls, pivot: str, rates: dict[str, float]) -> RateTable:
+        pivot = pivot.upper()
+        merged = {code.upper(): float(rate) for code, rate in rates.items() if rate}
+        merged[pivot] = 1.0
+        codes = tuple(sorted(merged))
+        vector = np.array([merged[code] for code in codes], dtype=np.float64)
+        vector.setflags(write=False)
+        return cls(pivot=pivot, codes=codes, rates=vector, index={code: position for position, code in enumerate(codes)})
+
+    def filled_from(self, other: RateTable) -> RateTable:
+        """This table plus the currencies only ``other`` (same pivot) knows, at ``other``'s rates."""
+        if other.pivot != self.pivot:
+            raise ValueError(f"Cannot merge {other.pivot}-based rates into a {self.pivot}-based table")
+        missing = [code for code in other.codes if code not in self.index]
+        if not missing:
+            return self
+        rates = dict(zip(self.codes, self.rates.tolist()))
+        rates.update((code, float(other.rates[other.index[code]])) for code in missing)
+        return RateTable.from_rates(self.pivot, rates)
+
+    def __contains__(self, code: str) -> bool:
+        return code.upper() in self.index
+
+    def rate(self, from_currency: str, to_currency: str) -> float | None:
+        from_position = self.index.get(from_currency.upper())
+        to_position = self.index.get(to_currency.upper())
+        if from_position is None or to_position is None:
+            return None
+        return float(self.rates[to_position] / self.rates[from_position])
+
+    def convert_many(
+        self, amounts: Sequence[float] | np.ndarray, from_codes: Iterable[str], to_code: str
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Convert ``amounts[i]`` from ``from_codes[i]`` into ``to_code`` in one vectorized pass.
+
+        Returns ``(converted, rates)``. Entries whose source currency (or every
+        entry, if the target) is not in the table are ``NaN``.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        codes = np.asarray([code.upper() for code in from_codes])
+        if codes.shape != amounts.shape:
+            raise ValueError("amounts and from_codes must have the same length")
+        to_position = self.index.get(to_code.upper())
+        if to_position is None or amounts.size == 0:
+            nan = np.full(amounts.shape, np.nan)
+            return nan, nan.copy()
+
+        # Only the distinct codes are looked up in Python; the rest is array arithmetic.
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        source = np.array([self.rates[self.index[code]] if code in self.index else np.nan for code in unique_codes])
+        rates = self.rates[to_position] / source[inverse]
+        return amounts * rates, rates
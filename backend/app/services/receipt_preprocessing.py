@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+
+from app.core.config import settings
+
+try:
+    from PIL import Image, ImageFilter, ImageOps
+except Exception:  # pragma: no cover - optional dependency
+    Image = ImageFilter = ImageOps = None  # type: ignore
+
+# Receipts are located on a small copy of the photo; the crop box is scaled back up.
+_CROP_PROBE_SIZE = 256
+_CROP_MARGIN = 0.02
+_CROP_MIN_AREA = 0.05
+
+
+@dataclass(frozen=True)
+class PreprocessOptions:
+    """How a receipt photo is prepared for Tesseract. Picklable, so it can be sent to OCR workers."""
+
+    enabled: bool = True
+    max_dimension: int = 2000
+    grayscale: bool = True
+    binarize: bool = True
+    threshold: int = 0
+    crop: bool = False
+
+    @classmethod
+    def from_settings(cls) -> PreprocessOptions:
+        return cls(
+            enabled=settings.ocr_preprocess_enabled,
+            max_dimension=settings.ocr_max_dimension,
+            grayscale=settings.ocr_grayscale,
+            binarize=settings.ocr_binarize,
+            threshold=settings.ocr_binarize_threshold,
+            crop=settings.ocr_crop_to_receipt,
+        )
+
+    def fingerprint(self) -> str:
+        """Stable digest of the options, so cached OCR results are only reused for identical settings."""
+        return hashlib.sha256(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()[:16]
+
+
+def preprocess(image: Image.Image, options: PreprocessOptions) -> Image.Image:
+    """Orient, crop, downscale, grayscale and binarize ``image`` according to ``options``."""
+    if not options.enabled:
+        return image
+    image = ImageOps.exif_transpose(image)
+    if options.crop:
+        image = crop_to_receipt(image)
+    if options.max_dimension and max(image.size) > options.max_dimension:
+        image = image.copy()
+        image.thumbnail((options.max_dimension, options.max_dimension), Image.Resampling.LANCZOS)
+    if options.grayscale or options.binarize:
+        image = image.convert("L")
+    if options.binarize:
+        threshold = options.threshold or otsu_threshold(image.histogram())
+        image = image.point([0] * threshold + [255] * (256 - threshold))
+    return image
+
+
+def crop_to_receipt(image: Image.Image) -> Image.Image:
+    """Crop to the bounding box of the bright pixels, assuming a light receipt on a darker background.
+
+    The image is returned unchanged when no plausible receipt region is found.
+    """
+    probe = image.convert("L")
+    probe.thumbnail((_CROP_PROBE_SIZE, _CROP_PROBE_SIZE))
+    threshold = otsu_threshold(probe.histogram())
+    mask = probe.point([0] * threshold + [255] * (256 - threshold)).filter(ImageFilter.MedianFilter(5))
+    box = mask.getbbox()
+    if box is None:
+        return image
+    left, top, right, bottom = box
+    if (right - left) * (bottom - top) < _CROP_MIN_AREA * probe.width * probe.height:
+        return image
+    scale_x = image.width / probe.width
+    scale_y = image.height / probe.height
+    margin_x = int(image.width * _CROP_MARGIN)
+    margin_y = int(image.height * _CROP_MARGIN)
+    return image.crop(
+        (
+            max(0, int(left * scale_x) - margin_x),
+            max(0, int(top * scale_y) - margin_y),
+            min(image.width, int(right * scale_x) + margin_x),
+            min(image.height, int(bottom * scale_y) + margin_y),
+        )
+    )
+
+
+def otsu_threshold(histogram: list[int]) -> int:
+    """Grey level that best separates the two classes of a 256-bin histogram (Otsu's method)."""
+    histogram = histogram[:256]
+    total = sum(histogram)
+    if not total:
+        return 128
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    background = weighted_background = 0
+    best_threshold, best_variance = 128, -1.0
+    for level, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        weighted_background += level * count
+        mean_background = weighted_background / background
+        mean_foreground = (weighted_total - weighted_background) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = level + 1, variance
+    return min(max(best_threshold, 1), 255)
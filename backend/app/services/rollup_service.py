@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from pymongo.errors import PyMongoError
+
+from app.db.repositories.expense_rollup_repository import ExpenseRollupRepository
+
+logger = logging.getLogger(__name__)
+
+ExpenseChange = tuple[dict[str, Any] | None, dict[str, Any] | None]
+
+
+class RollupService:
+    """Keeps per-company spend rollups in step with expense writes.
+
+    Every write to an expense is described as a ``(before, after)`` pair; the
+    old bucket is decremented and the new one incremented with ``$inc``. A
+    failed rollup write is logged rather than failing the request, and
+    ``scripts.rebuild_rollups`` recomputes the buckets from the expenses.
+    """
+
+    def __init__(self) -> None:
+        self.repo = ExpenseRollupRepository()
+
+    async def record_changes(self, changes: list[ExpenseChange]) -> None:
+        buckets: dict[tuple, list] = {}
+        for before, after in changes:
+            before_key = self._key(before) if before else None
+            after_key = self._key(after) if after else None
+            if before_key == after_key and before and after and before.get("converted_amount") == after.get("converted_amount"):
+                continue
+            if before_key is not None:
+                self._add(buckets, before_key, -before.get("converted_amount", 0.0), -1)
+            if after_key is not None:
+                self._add(buckets, after_key, after.get("converted_amount", 0.0), 1)
+
+        deltas = [(dict(key), amount, count) for key, (amount, count) in buckets.items() if amount or count]
+        try:
+            await self.repo.apply_deltas(deltas)
+        except PyMongoError:
+            logger.exception("Failed to update expense rollups; run scripts.rebuild_rollups to resync")
+
+    async def spend_report(
+        self,
+        company_id: str,
+        group_by: list[str],
+        month_from: str | None = None,
+        month_to: str | None = None,
+        status: str | None = None,
+    ) -> list[dict[str, Any]]:
+        return await self.repo.summarize(company_id, group_by, month_from, month_to, status)
+
+    def _key(self, expense: dict[str, Any]) -> tuple:
+        expense_date = expense.get("expense_date")
+        return (
+            ("company_id", expense.get("company_id")),
+            ("month", expense_date.strftime("%Y-%m") if expense_date else None),
+            ("category", expense.get("category")),
+            ("employee_id", expense.get("employee_id")),
+            ("status", expense.get("status")),
+            ("currency", expense.get("company_currency")),
+        )
+
+    def _add(self, buckets: dict[tuple, list], key: tuple, amount: float, count: int) -> None:
+        bucket = buckets.setdefault(key, [0.0, 0])
+        bucket[0] += amount
+        bucket[1] += count
+
+
+rollup_service = RollupService()
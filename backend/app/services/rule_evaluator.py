@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Sequence
+
+from app.core.config import settings
+from app.schemas.common import ApprovalDecision, ExpenseStatus
+from app.utils.cache import TTLCache
+from app.utils.metrics import cache_metrics
+
+_APPROVED = ApprovalDecision.approved.value
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """An approval rule prepared once for repeated sequence building and decision evaluation.
+
+    ``template`` is the rule's deduplicated approver order (``order``, then
+    ``approver_ids``, then the specific approver); the submitter's managers,
+    up to ``manager_levels`` of them, go in front. Decisions are evaluated
+    against the running ``approval_count`` and ``specific_approved`` counters
+    on the expense rather than by rescanning its approval history.
+    """
+
+    rule_id: str | None
+    updated_at: datetime | None
+    template: tuple[str, ...]
+    percentage_threshold: int | None
+    specific_approver_id: str | None
+    manager_levels: int = 1
+    escalation_amount: float | None = None
+    escalation_manager_levels: int | None = None
+
+    @classmethod
+    def from_rule(cls, rule: dict[str, Any] | None) -> CompiledRule:
+        if not rule:
+            return NO_RULE
+        rule_type = rule.get("rule_type")
+        specific = rule.get("specific_approver_id")
+        # dict.fromkeys keeps the first occurrence of each approver in O(n).
+        template = dict.fromkeys([*(rule.get("order") or []), *(rule.get("approver_ids") or [])])
+        if specific:
+            template.setdefault(specific)
+        return cls(
+            rule_id=rule.get("id"),
+            updated_at=rule.get("updated_at"),
+            template=tuple(template),
+            percentage_threshold=rule.get("percentage_threshold") if rule_type in {"percentage", "hybrid"} else None,
+            specific_approver_id=specific if rule_type in {"specific", "hybrid"} else None,
+            manager_levels=rule.get("manager_levels") or 1,
+            escalation_amount=rule.get("escalation_amount"),
+            escalation_manager_levels=rule.get("escalation_manager_levels"),
+        )
+
+    def manager_levels_for(self, amount: float | None) -> int:
+        """Levels of management that approve ``amount`` (in company currency)."""
+        if self.escalation_amount is not None and self.escalation_manager_levels and amount is not None:
+            if amount > self.escalation_amount:
+                return max(self.manager_levels, self.escalation_manager_levels)
+        return self.manager_levels
+
+    def approver_sequence(
+        self, employee: dict[str, Any], managers: Sequence[str] = (), amount: float | None = None
+    ) -> list[str]:
+        """``managers`` is the submitter's management chain, nearest first; it defaults to their direct manager."""
+        manager_id = employee.get("manager_id") if employee.get("is_manager_approver") else None
+        if not manager_id:
+            return list(self.template)
+        chain = list(dict.fromkeys(managers or (manager_id,)))[: self.manager_levels_for(amount)]
+        in_chain = set(chain)
+        return [*chain, *(approver_id for approver_id in self.template if approver_id not in in_chain)]
+
+    def required_approvals(self, sequence_length: int) -> int | None:
+        if not self.percentage_threshold:
+            return None
+        return max(1, round(sequence_length * (self.percentage_threshold / 100)))
+
+    def evaluate(self, expense: dict[str, Any], approver_id: str, approved: bool) -> dict[str, Any]:
+        """Return the ``$set`` update for ``approver_id``'s decision on the expense's current step."""
+        approver_sequence: list[str] = expense.get("approver_sequence", [])
+        if not approved:
+            return {
+                "status": ExpenseStatus.rejected.value,
+                "current_step_index": len(approver_sequence),
+                "current_approver_id": None,
+            }
+
+        approval_count, specific_approved = self._counters(expense)
+        update: dict[str, Any] = {
+            "approval_count": approval_count + 1,
+            "specific_approved": specific_approved or approver_id == self.specific_approver_id,
+        }
+        required = self.required_approvals(len(approver_sequence))
+        if (required is not None and update["approval_count"] >= required) or (
+            self.specific_approver_id and update["specific_approved"]
+        ):
+            return {
+                **update,
+                "status": ExpenseStatus.approved.value,
+                "current_step_index": len(approver_sequence),
+                "current_approver_id": None,
+            }
+
+        next_index = expense.get("current_step_index", 0) + 1
+        if next_index >= len(approver_sequence):
+            return {**update, "status": ExpenseStatus.approved.value, "current_step_index": next_index, "current_approver_id": None}
+        return {**update, "current_step_index": next_index, "current_approver_id": approver_sequence[next_index]}
+
+    def _counters(self, expense: dict[str, Any]) -> tuple[int, bool]:
+        if "approval_count" in expense:
+            return expense["approval_count"], bool(expense.get("specific_approved"))
+        # Expenses created before the counters existed: derive them from the history once.
+        approvers = {entry["approver_id"] for entry in expense.get("approval_history", []) if entry["decision"] == _APPROVED}
+        return len(approvers), self.specific_approver_id in approvers
+
+
+NO_RULE = CompiledRule(rule_id=None, updated_at=None, template=(), percentage_threshold=None, specific_approver_id=None)
+
+
+class RuleEvaluatorCache:
+    """Compiled rules keyed by ``(rule id, updated_at)``, plus a short-lived pointer to each rule's current version.
+
+    The pointer spares a Mongo read per decision; it expires after
+    ``approval_rule_cache_ttl_seconds`` and is dropped as soon as a rule is
+    changed through this worker.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        metrics = cache_metrics("approval_rules")
+        self._compiled: TTLCache[CompiledRule] = TTLCache(max_entries, 24 * 3600)
+        self._current: TTLCache[CompiledRule] = TTLCache(max_entries, ttl_seconds, metrics)
+
+    def current(self, rule_id: str) -> CompiledRule | None:
+        return self._current.get(rule_id)
+
+    def compile(self, rule: dict[str, Any] | None) -> CompiledRule:
+        if not rule or not rule.get("id"):
+            return CompiledRule.from_rule(rule)
+        key = (rule["id"], rule.get("updated_at"))
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = CompiledRule.from_rule(rule)
+            self._compiled.set(key, compiled)
+        self._current.set(rule["id"], compiled)
+        return compiled
+
+    def invalidate(self, rule_id: str) -> None:
+        self._current.invalidate(rule_id)
+
+
+rule_evaluators = RuleEvaluatorCache(settings.approval_rule_cache_max_entries, settings.approval_rule_cache_ttl_seconds)
@@ -4,10 +4,20 @@ from typing import Any
 
 from fastapi import HTTPException, status
 
-from app.core.security import get_password_hash
+from app.core.config import settings
+from app.core.security import get_password_hash_async
 from app.db.repositories.user_repository import UserRepository
 from app.schemas.common import UserRole
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.org_tree import org_trees
+from app.utils.cache import TTLCache
+from app.utils.metrics import cache_metrics
+from app.utils.pagination import PageParams, build_projection, next_cursor, select_fields
+
+# Sanitized user documents served to get_current_user, keyed by user id.
+user_cache: TTLCache[dict[str, Any]] = TTLCache(
+    settings.user_cache_max_entries, settings.user_cache_ttl_seconds, cache_metrics("users")
+)
 
 
 class UserService:
@@ -24,18 +34,25 @@ class UserService:
         user_data.update(
             {
                 "company_id": company_id,
-                "password_hash": get_password_hash(password),
+                "password_hash": await get_password_hash_async(password),
                 "email": str(payload.email).lower(),
             }
         )
         user_id = await self.user_repo.create_user(user_data)
+        org_trees.set_manager(company_id, user_id, user_data.get("manager_id"))
         user = await self.user_repo.get_user_by_id(user_id)
         assert user is not None
         return self._to_public(user)
 
-    async def list_users(self, company_id: str) -> list[dict[str, Any]]:
-        users = await self.user_repo.list_users_by_company(company_id)
-        return [self._to_public(user) for user in users]
+    async def list_users(self, company_id: str, page: PageParams | None = None) -> tuple[list[dict[str, Any]], str | None]:
+        page = page or PageParams()
+        projection = build_projection(page.fields)
+        users = await self.user_repo.list_users_by_company(company_id, page.limit, page.after, projection)
+        if page.fields:
+            items = [select_fields(user, page.fields) for user in users]
+        else:
+            items = [self._to_public(user) for user in users]
+        return items, next_cursor(users, page.limit)
 
     async def update_user(self, company_id: str, user_id: str, payload: UserUpdate) -> dict[str, Any]:
         user = await self.user_repo.get_user_by_id(user_id)
@@ -44,12 +61,23 @@ class UserService:
 
         update_data = payload.model_dump(exclude_unset=True)
         if "password" in update_data:
-            update_data["password_hash"] = get_password_hash(update_data.pop("password"))
+            update_data["password_hash"] = await get_password_hash_async(update_data.pop("password"))
 
         if not update_data:
             return self._to_public(user)
 
+        manager_changed = "manager_id" in update_data and update_data["manager_id"] != user.get("manager_id")
+        if manager_changed:
+            org_tree = await org_trees.get(company_id)
+            if org_tree.would_cycle(user_id, update_data["manager_id"]):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="A user cannot report to themselves or to one of their reports"
+                )
+
         success = await self.user_repo.update_user(user_id, update_data)
+        user_cache.invalidate(user_id)
+        if manager_changed:
+            org_trees.set_manager(company_id, user_id, update_data["manager_id"])
         if not success:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update user")
 
@@ -63,6 +91,8 @@ class UserService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
         success = await self.user_repo.delete_user(user_id)
+        user_cache.invalidate(user_id)
+        org_trees.remove_user(company_id, user_id)
         if not success:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete user")
 
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+from app.utils.metrics import CacheMetrics
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Bounded in-process cache with per-entry expiry and least-recently-used eviction.
+
+    Not shared between worker processes, so entries must be safe to serve for
+    up to ``ttl_seconds`` after the source changes in another process.
+
+    Read-through callers should take :attr:`epoch` before reading the source
+    and pass it to :meth:`set`. Every invalidation advances the epoch, so a
+    value read before an invalidation can never be stored after it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        metrics: CacheMetrics | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.metrics = metrics
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self._epoch = 0
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> V | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self._clock():
+            del self._entries[key]
+            self._incr("expirations")
+            entry = None
+        if entry is None:
+            self._incr("misses")
+            return None
+        self._entries.move_to_end(key)
+        self._incr("hits")
+        return entry[1]
+
+    def set(self, key: Hashable, value: V, ttl_seconds: float | None = None, epoch: int | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        if epoch is not None and epoch != self._epoch:
+            self._incr("stale_fills")
+            return
+        expires_at = self._clock() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._incr("evictions")
+
+    def invalidate(self, key: Hashable) -> None:
+        # The epoch advances even for absent keys: a reader may be about to fill one.
+        self._epoch += 1
+        if self._entries.pop(key, None) is not None:
+            self._incr("invalidations")
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+
+    def _incr(self, event: str) -> None:
+        if self.metrics is not None:
+            self.metrics.incr(event)
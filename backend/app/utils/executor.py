@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """Runs blocking calls off the event loop with a cap on queued work.
+
+    At most ``max_workers`` calls run at once and up to ``max_queue`` more
+    wait for a worker. Beyond that :meth:`run` fails fast with a 503 and a
+    ``Retry-After`` header instead of letting latency grow without bound.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue: int,
+        retry_after_seconds: int = 1,
+        executor_factory: Callable[[int], Executor] | None = None,
+    ) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self._executor_factory = executor_factory or (
+            lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        )
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Server is busy ({self.name}), retry shortly",
+                    headers={"Retry-After": str(self.retry_after_seconds)},
+                )
+            self._pending += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the call finishes, even if the awaiting request is cancelled.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._executor_factory(self.max_workers)
+        return self._executor
+
+    def _release(self, _: Future | None = None) -> None:
+        with self._lock:
+            self._pending -= 1
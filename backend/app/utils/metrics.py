@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any
+
+
+class CacheMetrics:
+    """Process-local counters for a cache, exposed through ``GET /api/metrics/caches``."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._counts: Counter[str] = Counter()
+
+    def incr(self, event: str, amount: int = 1) -> None:
+        self._counts[event] += amount
+
+    def reset(self) -> None:
+        self._counts.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        counts = dict(self._counts)
+        lookups = counts.get("hits", 0) + counts.get("misses", 0) + counts.get("stale_serves", 0)
+        counts["hit_rate"] = round((lookups - counts.get("misses", 0)) / lookups, 4) if lookups else None
+        return counts
+
+
+_registry: dict[str, CacheMetrics] = {}
+
+
+def cache_metrics(name: str) -> CacheMetrics:
+    if name not in _registry:
+        _registry[name] = CacheMetrics(name)
+    return _registry[name]
+
+
+def metrics_snapshot() -> dict[str, dict[str, Any]]:
+    return {name: metrics.snapshot() for name, metrics in sorted(_registry.items())}
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+KeysetPosition = tuple[datetime, ObjectId]
+
+KEYSET_SORT = [("created_at", 1), ("_id", 1)]
+
+
+@dataclass(frozen=True)
+class PageParams:
+    limit: int | None = None
+    after: KeysetPosition | None = None
+    fields: list[str] | None = None
+
+
+def encode_cursor(document: dict[str, Any]) -> str:
+    raw = f"{document['created_at'].isoformat()}|{document['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> KeysetPosition:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, object_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), ObjectId(object_id)
+    except (ValueError, InvalidId, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def build_projection(fields: list[str] | None) -> dict[str, int] | None:
+    if not fields:
+        return None
+    projection = {field: 1 for field in fields}
+    projection["created_at"] = 1
+    return projection
+
+
+async def find_page(
+    collection: Any,
+    query: dict[str, Any],
+    limit: int | None = None,
+    after: KeysetPosition | None = None,
+    projection: dict[str, int] | None = None,
+) -> list[dict[str, Any]]:
+    """Return documents ordered by ``(created_at, _id)``, starting after ``after``.
+
+    Without a ``limit`` every matching document is returned, which keeps the
+    behaviour of the original unpaginated listings.
+    """
+    if after is not None:
+        created_at, object_id = after
+        query = {
+            **query,
+            "$or": [
+                {"created_at": {"$gt": created_at}},
+                {"created_at": created_at, "_id": {"$gt": object_id}},
+            ],
+        }
+    cursor = collection.find(query, projection).sort(KEYSET_SORT)
+    if limit:
+        cursor = cursor.limit(limit)
+    return [doc async for doc in cursor]
+
+
+def select_fields(document: dict[str, Any], fields: list[str]) -> dict[str, Any]:
+    selected = {field: document[field] for field in fields if field in document}
+    selected["id"] = str(document["_id"])
+    return selected
+
+
+def next_cursor(documents: list[dict[str, Any]], limit: int | None) -> str | None:
+    if not limit or len(documents) < limit:
+        return None
+    return encode_cursor(documents[-1])
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+from datetime import date, datetime, time
 from typing import Any
 
 from bson import ObjectId
 
 
+def to_mongo_date(value: date) -> datetime:
+    """BSON has no date type, so calendar dates are stored as midnight datetimes."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time.min)
+
+
 def serialize_document(document: dict[str, Any] | None) -> dict[str, Any] | None:
     if document is None:
         return None
@@ -0,0 +1,108 @@
+"""Latency benchmark for ``POST /api/expenses`` against a local MongoDB.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_create_expense [--requests 500] [--concurrency 1]
+
+Each run measures the endpoint twice: once through
+:meth:`ExpenseService.create_expense` and once with a ``sequential`` baseline
+that reproduces the earlier round-trip pattern, reading the employee, company
+and active rules one after another straight from MongoDB and re-reading the
+expense after inserting it. Both paths build the same document, so the
+difference is the database round-trips alone. The expense is submitted in the
+company currency so no exchange-rate call is made.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from app.db.repositories.company_repository import CompanyRepository
+from app.schemas.expense import ExpenseCreate
+from app.services.currency_service import currency_service
+from app.services.expense_service import expense_service
+from app.services.org_tree import org_trees
+from app.services.rollup_service import rollup_service
+from app.services.rule_evaluator import rule_evaluators
+from benchmarks.common import api_client, bench_database, seed_company, summarize
+
+PAYLOAD = {
+    "title": "Client dinner",
+    "category": "Meals",
+    "amount": 42.5,
+    "currency_code": "USD",
+    "expense_date": "2024-05-01",
+}
+
+
+async def sequential_create_expense(company_id: str, employee_id: str, payload: ExpenseCreate) -> dict[str, Any]:
+    service = expense_service
+    employee = await service.user_repo.get_user_by_id(employee_id)
+    company = await CompanyRepository().get_company_by_id(company_id)
+    service._check_submitter(company_id, employee, company)
+    active_rules = await service.rule_repo.list_active_rules_for_company(company_id)
+    rule = active_rules[0] if active_rules else None
+    if rule:
+        rule["id"] = str(rule.pop("_id"))
+
+    converted_amount, rate = await currency_service.convert_to_company_currency(
+        payload.amount, payload.currency_code, company["currency_code"], on_date=payload.expense_date
+    )
+    managers = service._management_chain(employee, await org_trees.get(company_id))
+    approver_sequence = rule_evaluators.compile(rule).approver_sequence(employee, managers, converted_amount)
+    expense_data = service._build_expense_document(
+        payload, company_id, employee_id, company, rule, approver_sequence, converted_amount, rate
+    )
+    expense_id = await service.expense_repo.create_expense(expense_data)
+    await rollup_service.record_changes([(None, expense_data)])
+    return service._serialize_expense(await service.expense_repo.get_expense_by_id(expense_id))
+
+
+@contextmanager
+def create_path(name: str) -> Iterator[None]:
+    if name == "sequential":
+        expense_service.create_expense = sequential_create_expense
+    try:
+        yield
+    finally:
+        expense_service.__dict__.pop("create_expense", None)
+
+
+async def measure(client, headers: dict[str, str], requests: int, concurrency: int) -> list[float]:
+    samples: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def submit() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/api/expenses", json=PAYLOAD, headers=headers)
+            samples.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    for _ in range(min(20, requests)):
+        await submit()
+    samples.clear()
+    await asyncio.gather(*(submit() for _ in range(requests)))
+    return samples
+
+
+async def run(requests: int, concurrency: int) -> None:
+    async with bench_database("expense_manager_bench"):
+        seed = await seed_company()
+        headers = {"Authorization": f"Bearer {seed['employee_token']}"}
+        async with api_client() as client:
+            for name in ("sequential", "current"):
+                with create_path(name):
+                    samples = await measure(client, headers, requests, concurrency)
+                print(summarize(f"{name} c={concurrency}", samples))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
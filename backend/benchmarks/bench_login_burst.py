@@ -0,0 +1,81 @@
+"""Latency of an unrelated endpoint while ``POST /api/auth/login`` is hammered.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_login_burst [--logins 200] [--concurrency 32] [--probe-interval-ms 10]
+
+``GET /api/companies/me`` is probed at a fixed interval before and during a
+burst of concurrent logins. With bcrypt on the event loop the probe p99 grows
+with the burst; with hashing in ``password_executor`` it should stay flat.
+Logins rejected with 503 once ``PASSWORD_HASH_QUEUE_SIZE`` is exceeded are
+counted separately.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.common import api_client, bench_database, seed_company, summarize
+
+
+async def probe(client: httpx.AsyncClient, headers: dict[str, str], interval: float, stop: asyncio.Event) -> list[float]:
+    samples: list[float] = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/api/companies/me", headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def run(logins: int, concurrency: int, probe_interval_ms: float) -> None:
+    async with bench_database("expense_manager_bench_login"):
+        seed = await seed_company()
+        headers = {"Authorization": f"Bearer {seed['manager_token']}"}
+        credentials = {"email": f"manager-{seed['company_id']}@bench.local", "password": "bench-password"}
+        interval = probe_interval_ms / 1000
+
+        async with api_client() as client:
+            stop = asyncio.Event()
+            baseline = asyncio.create_task(probe(client, headers, interval, stop))
+            await asyncio.sleep(1.0)
+            stop.set()
+            baseline_samples = await baseline
+
+            stop = asyncio.Event()
+            during = asyncio.create_task(probe(client, headers, interval, stop))
+            semaphore = asyncio.Semaphore(concurrency)
+            login_samples: list[float] = []
+            statuses: Counter[int] = Counter()
+
+            async def login() -> None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/api/auth/login", json=credentials)
+                    statuses[response.status_code] += 1
+                    if response.status_code == 200:
+                        login_samples.append((time.perf_counter() - started) * 1000)
+
+            await asyncio.gather(*(login() for _ in range(logins)))
+            stop.set()
+            during_samples = await during
+
+        print(summarize("GET /companies/me (idle)", baseline_samples))
+        print(summarize("GET /companies/me (login burst)", during_samples))
+        if login_samples:
+            print(summarize(f"POST /auth/login c={concurrency}", login_samples))
+        print("login statuses:", dict(sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--probe-interval-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.concurrency, args.probe_interval_ms))
@@ -0,0 +1,128 @@
+"""OCR latency and accuracy for each receipt preprocessing configuration.
+
+Run from the ``backend`` directory (requires the ``tesseract`` binary)::
+
+    python -m benchmarks.bench_ocr_preprocessing --generate data/ocr_corpus --count 20
+    python -m benchmarks.bench_ocr_preprocessing --corpus data/ocr_corpus
+
+A corpus is a directory of receipt images, each with a ``<name>.txt`` file
+holding the expected text. ``--generate`` writes a synthetic one: phone-sized
+photos of a receipt on a dark background, slightly rotated, noisy and stored
+sideways with an EXIF orientation tag. Real receipts can be dropped into the
+same directory. Accuracy is the character-level similarity between the
+expected and recognised text (1.0 is a perfect match); deltas are against
+the unprocessed image.
+"""
+from __future__ import annotations
+
+import argparse
+import difflib
+import random
+import statistics
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from app.services.ocr_service import _extract_text
+from app.services.receipt_preprocessing import PreprocessOptions
+
+CONFIGS: dict[str, PreprocessOptions] = {
+    "raw": PreprocessOptions(enabled=False),
+    "downscale": PreprocessOptions(grayscale=False, binarize=False),
+    "downscale+gray": PreprocessOptions(binarize=False),
+    "default": PreprocessOptions(),
+    "default+crop": PreprocessOptions(crop=True),
+    "default@1400px": PreprocessOptions(max_dimension=1400),
+}
+
+ITEMS = ["Coffee", "Bagel", "Taxi fare", "Parking", "Sandwich", "Water", "Notebook", "Printer paper", "Lunch", "Tip"]
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+ORIENTATION_TAG = 0x0112
+
+
+def receipt_text(rng: random.Random) -> str:
+    lines = ["ACME STORE #%03d" % rng.randint(1, 999), "2024-%02d-%02d" % (rng.randint(1, 12), rng.randint(1, 28))]
+    total = 0.0
+    for item in rng.sample(ITEMS, rng.randint(3, 7)):
+        price = rng.randint(100, 5000) / 100
+        total += price
+        lines.append(f"{item:<16}{price:>8.2f}")
+    lines.append(f"{'TOTAL':<16}{total:>8.2f}")
+    return "\n".join(lines)
+
+
+def render_photo(text: str, rng: random.Random) -> Image.Image:
+    font = ImageFont.load_default(size=80)
+    receipt = Image.new("RGB", (1800, 260 + 115 * text.count("\n")), (245, 242, 235))
+    ImageDraw.Draw(receipt).multiline_text((100, 100), text, fill=(25, 25, 25), font=font, spacing=34)
+    receipt = receipt.rotate(rng.uniform(-3, 3), expand=True, fillcolor=(60, 55, 50))
+
+    photo = Image.new("RGB", (3000, 4000), (60, 55, 50))
+    photo.paste(receipt, ((photo.width - receipt.width) // 2, (photo.height - receipt.height) // 2))
+    noise = Image.effect_noise(photo.size, 24).convert("RGB")
+    return Image.blend(photo, noise, 0.12).filter(ImageFilter.GaussianBlur(1.2))
+
+
+def generate(directory: Path, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    for number in range(count):
+        text = receipt_text(rng)
+        photo = render_photo(text, rng)
+        # Stored sideways the way phones do, with EXIF saying how to rotate it back.
+        exif = Image.Exif()
+        exif[ORIENTATION_TAG] = 6
+        photo.rotate(90, expand=True).save(directory / f"receipt-{number:03d}.jpg", quality=90, exif=exif)
+        (directory / f"receipt-{number:03d}.txt").write_text(text + "\n", encoding="utf-8")
+    print(f"Wrote {count} synthetic receipts to {directory}")
+
+
+def similarity(expected: str, actual: str) -> float:
+    def normalize(value: str) -> str:
+        return " ".join(value.split()).lower()
+
+    return difflib.SequenceMatcher(None, normalize(expected), normalize(actual)).ratio()
+
+
+def run(corpus: Path, configs: list[str], timeout: float) -> None:
+    samples = sorted(path for path in corpus.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+    samples = [path for path in samples if path.with_suffix(".txt").exists()]
+    if not samples:
+        raise SystemExit(f"No images with matching .txt files in {corpus}")
+
+    results: dict[str, tuple[float, float]] = {}
+    print(f"{'config':<18}{'mean ms':>10}{'p95 ms':>10}{'accuracy':>10}{'Δ ms':>10}{'Δ acc':>8}")
+    for name in configs:
+        latencies: list[float] = []
+        scores: list[float] = []
+        for path in samples:
+            content = path.read_bytes()
+            started = time.perf_counter()
+            text = _extract_text(content, timeout, CONFIGS[name])
+            latencies.append((time.perf_counter() - started) * 1000)
+            scores.append(similarity(path.with_suffix(".txt").read_text(encoding="utf-8"), text))
+        mean_ms = statistics.fmean(latencies)
+        p95_ms = statistics.quantiles(latencies * 2 if len(latencies) == 1 else latencies, n=20)[18]
+        accuracy = statistics.fmean(scores)
+        results[name] = (mean_ms, accuracy)
+        base_ms, base_accuracy = results.get("raw", (mean_ms, accuracy))
+        print(f"{name:<18}{mean_ms:>10.1f}{p95_ms:>10.1f}{accuracy:>10.3f}{mean_ms - base_ms:>+10.1f}{accuracy - base_accuracy:>+8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, help="Directory of receipt images with .txt ground truth")
+    parser.add_argument("--generate", type=Path, help="Write a synthetic corpus to this directory and exit")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--config", action="append", choices=sorted(CONFIGS), help="Only run these configurations")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    if args.generate:
+        generate(args.generate, args.count, args.seed)
+    elif args.corpus:
+        selected = args.config or list(CONFIGS)
+        run(args.corpus, ["raw", *[name for name in selected if name != "raw"]], args.timeout)
+    else:
+        parser.error("pass --corpus or --generate")
@@ -0,0 +1,120 @@
+"""Approver-sequence building and approval evaluation for large approval rules.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_rule_evaluator [--sizes 100 1000 10000] [--repeat 5]
+
+Compares :class:`app.services.rule_evaluator.CompiledRule` with copies of the
+previous implementation, which deduplicated approvers with list membership
+checks (quadratic in the rule size) and rescanned the approval history on
+every decision. The rule has ``size`` approvers, half of them listed twice;
+evaluation is measured on an expense whose history already holds ``size``
+approvals. No database is needed.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable
+
+from app.services.rule_evaluator import CompiledRule, RuleEvaluatorCache
+
+APPROVED = "approved"
+
+
+def legacy_sequence(employee: dict[str, Any], rule: dict[str, Any]) -> list[str]:
+    sequence: list[str] = []
+    if employee.get("manager_id") and employee.get("is_manager_approver"):
+        sequence.append(employee["manager_id"])
+    for approver_id in rule.get("order") or []:
+        if approver_id not in sequence:
+            sequence.append(approver_id)
+    for approver_id in rule.get("approver_ids", []):
+        if approver_id not in sequence:
+            sequence.append(approver_id)
+    specific = rule.get("specific_approver_id")
+    if specific and specific not in sequence:
+        sequence.append(specific)
+    return sequence
+
+
+def legacy_evaluate(expense: dict[str, Any], rule: dict[str, Any]) -> bool:
+    history = expense["approval_history"]
+    approvals = len({entry["approver_id"] for entry in history if entry["decision"] == APPROVED})
+    required = max(1, round(len(expense["approver_sequence"]) * (rule["percentage_threshold"] / 100)))
+    if approvals >= required:
+        return True
+    specific = rule["specific_approver_id"]
+    return any(entry["approver_id"] == specific and entry["decision"] == APPROVED for entry in history)
+
+
+def best_of(fn: Callable[[], object], repeat: int, number: int) -> float:
+    """Fastest of ``repeat`` runs, in microseconds per call."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return min(timings) * 1_000_000
+
+
+def run(sizes: list[int], repeat: int) -> None:
+    employee = {"manager_id": "manager", "is_manager_approver": True}
+    cache = RuleEvaluatorCache(max_entries=16, ttl_seconds=60)
+    print(f"{'operation':<36}{'approvers':>10}{'legacy us':>14}{'compiled us':>14}{'speed-up':>10}")
+    for size in sizes:
+        approvers = [f"approver-{index}" for index in range(size)]
+        rule = {
+            "id": f"rule-{size}",
+            "rule_type": "hybrid",
+            "order": approvers[: size // 2],
+            "approver_ids": approvers,
+            "percentage_threshold": 100,
+            "specific_approver_id": "nobody",
+            "updated_at": None,
+        }
+        number = max(1, 20_000 // size)
+        compiled = cache.compile(rule)
+        assert compiled.approver_sequence(employee) == legacy_sequence(employee, rule)
+
+        sequence = compiled.approver_sequence(employee)
+        history = [{"approver_id": approver_id, "decision": APPROVED} for approver_id in sequence[:-2]]
+        expense = {
+            "approver_sequence": sequence,
+            "current_step_index": len(history),
+            "approval_history": history,
+            "approval_count": len(history),
+            "specific_approved": False,
+        }
+
+        rows = [
+            (
+                "build sequence",
+                lambda: legacy_sequence(employee, rule),
+                lambda: cache.compile(rule).approver_sequence(employee),
+            ),
+            (
+                "build sequence (first compile)",
+                lambda: legacy_sequence(employee, rule),
+                lambda: CompiledRule.from_rule(rule).approver_sequence(employee),
+            ),
+            (
+                "evaluate approval",
+                lambda: legacy_evaluate(expense, rule),
+                lambda: compiled.evaluate(expense, sequence[-2], True),
+            ),
+        ]
+        for label, legacy, current in rows:
+            # The quadratic baseline gets few iterations at large sizes so runs stay short.
+            legacy_us = best_of(legacy, repeat, max(1, number // 10) if label.startswith("build") else number)
+            current_us = best_of(current, repeat, number)
+            print(f"{label:<36}{size:>10}{legacy_us:>14.1f}{current_us:>14.1f}{legacy_us / current_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,83 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks talk to a real MongoDB (``MONGO_URI``) but use a throwaway
+database that is dropped when the run finishes.
+"""
+from __future__ import annotations
+
+import statistics
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash
+from app.db import client as db_client
+from app.db.indexes import ensure_indexes
+from app.db.repositories.company_repository import CompanyRepository
+from app.db.repositories.user_repository import UserRepository
+from app.main import app
+
+
+@asynccontextmanager
+async def bench_database(name: str) -> AsyncIterator[None]:
+    settings.mongo_db_name = name
+    await db_client.connect_to_mongo()
+    await ensure_indexes()
+    try:
+        yield
+    finally:
+        await db_client.get_database().client.drop_database(name)
+        await db_client.close_mongo_connection()
+
+
+def api_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+async def seed_company(currency_code: str = "USD") -> dict[str, str]:
+    """Create a company with a manager and an employee; return ids and bearer tokens."""
+    company_id = await CompanyRepository().create_company(
+        {"name": "Bench Corp", "country_code": "US", "currency_code": currency_code}
+    )
+    users = UserRepository()
+    password_hash = get_password_hash("bench-password")
+    manager_id = await users.create_user(
+        {
+            "name": "Bench Manager",
+            "email": f"manager-{company_id}@bench.local",
+            "password_hash": password_hash,
+            "role": "manager",
+            "company_id": company_id,
+            "is_active": True,
+        }
+    )
+    employee_id = await users.create_user(
+        {
+            "name": "Bench Employee",
+            "email": f"employee-{company_id}@bench.local",
+            "password_hash": password_hash,
+            "role": "employee",
+            "company_id": company_id,
+            "manager_id": manager_id,
+            "is_manager_approver": True,
+            "is_active": True,
+        }
+    )
+    return {
+        "company_id": company_id,
+        "manager_id": manager_id,
+        "employee_id": employee_id,
+        "manager_token": create_access_token(manager_id, {"role": "manager", "company_id": company_id}),
+        "employee_token": create_access_token(employee_id, {"role": "employee", "company_id": company_id}),
+    }
+
+
+def summarize(label: str, samples_ms: list[float]) -> str:
+    ordered = sorted(samples_ms)
+    quantiles = statistics.quantiles(ordered if len(ordered) > 1 else ordered * 2, n=100, method="inclusive")
+    return (
+        f"{label:<32} n={len(ordered):<6} mean={statistics.fmean(ordered):8.2f}ms "
+        f"p50={quantiles[49]:8.2f}ms p95={quantiles[94]:8.2f}ms p99={quantiles[98]:8.2f}ms"
+    )
@@ -0,0 +1,71 @@
+"""Backfill ``current_approver_id`` on existing expenses.
+
+Run from the ``backend`` directory::
+
+    python -m scripts.backfill_current_approver [--batch-size 1000]
+
+The script is idempotent: it only touches documents that do not carry the
+field yet, and reconciles the expense indexes, including the pending-queue index.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from typing import Any
+
+from pymongo import UpdateOne
+
+from app.db.client import close_mongo_connection, connect_to_mongo, get_collection
+from app.db.indexes import reconcile_indexes
+from app.db.repositories.expense_repository import ExpenseRepository
+
+
+def current_approver_for(expense: dict[str, Any]) -> str | None:
+    if expense.get("status") != "pending":
+        return None
+    approver_sequence: list[str] = expense.get("approver_sequence", [])
+    current_index: int = expense.get("current_step_index", 0)
+    if current_index < len(approver_sequence):
+        return approver_sequence[current_index]
+    return None
+
+
+async def backfill(batch_size: int) -> int:
+    collection = get_collection(ExpenseRepository.collection_name)
+    cursor = collection.find(
+        {"current_approver_id": {"$exists": False}},
+        {"status": 1, "approver_sequence": 1, "current_step_index": 1},
+    ).batch_size(batch_size)
+
+    updated = 0
+    operations: list[UpdateOne] = []
+    async for expense in cursor:
+        operations.append(
+            UpdateOne({"_id": expense["_id"]}, {"$set": {"current_approver_id": current_approver_for(expense)}})
+        )
+        if len(operations) >= batch_size:
+            result = await collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+            operations = []
+    if operations:
+        result = await collection.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+
+    await reconcile_indexes(collection, ExpenseRepository.indexes)
+    return updated
+
+
+async def main(batch_size: int) -> None:
+    await connect_to_mongo()
+    try:
+        updated = await backfill(batch_size)
+    finally:
+        await close_mongo_connection()
+    print(f"Backfilled current_approver_id on {updated} expenses")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,81 @@
+"""Run ``explain()`` on every repository query and fail on collection scans and in-memory sorts.
+
+Run from the ``backend`` directory::
+
+    python -m scripts.check_query_plans [--skip-index-sync]
+
+The queries are the ``query_shapes`` each repository declares beside its
+``indexes``. Indexes are reconciled first (unless ``--skip-index-sync`` is
+passed) so the report reflects what the application creates at startup. The
+exit status is non-zero when any winning plan contains a ``COLLSCAN`` stage,
+or a blocking ``SORT`` stage for a query whose order an index should supply.
+Shapes marked ``collection_scan`` are reported but never fail.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from typing import Any
+
+from app.db.client import close_mongo_connection, connect_to_mongo, get_collection
+from app.db.indexes import REPOSITORIES, ensure_indexes
+from app.db.query_shapes import QueryShape
+
+
+def declared_queries() -> list[tuple[str, str, QueryShape]]:
+    """``(label, collection, shape)`` for every query shape the repositories declare."""
+    return [
+        (f"{repository.__name__}.{shape.name}", repository.collection_name, shape)
+        for repository in REPOSITORIES
+        for shape in repository.query_shapes
+    ]
+
+
+def find_stages(plan: Any) -> set[str]:
+    stages: set[str] = set()
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.add(plan["stage"])
+        for value in plan.values():
+            stages |= find_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            stages |= find_stages(item)
+    return stages
+
+
+async def explain(collection: str, shape: QueryShape) -> set[str]:
+    cursor = get_collection(collection).find(shape.filter)
+    if shape.sort:
+        cursor = cursor.sort(shape.sort)
+    plan = await cursor.explain()
+    return find_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+
+
+async def main(sync_indexes: bool) -> int:
+    queries = declared_queries()
+    await connect_to_mongo()
+    failures = 0
+    try:
+        if sync_indexes:
+            await ensure_indexes()
+        for label, collection, shape in queries:
+            stages = await explain(collection, shape)
+            if shape.collection_scan:
+                outcome = "scan"
+            else:
+                outcome = "FAIL" if stages & {"COLLSCAN", "SORT"} else "ok"
+                failures += outcome == "FAIL"
+            print(f"{outcome:<4}  {label:<65} {', '.join(sorted(stages))}")
+    finally:
+        await close_mongo_connection()
+    print(f"\n{len(queries) - failures}/{len(queries)} queries are answered from an index or scan by design")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skip-index-sync", action="store_true", help="Do not reconcile indexes before explaining")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(not args.skip_index_sync)))
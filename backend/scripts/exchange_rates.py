@@ -0,0 +1,142 @@
+"""Backfill the daily exchange rate store and recompute converted amounts from it.
+
+Run from the ``backend`` directory::
+
+    python -m scripts.exchange_rates backfill --from 2024-01-01 --to 2024-12-31
+    python -m scripts.exchange_rates recompute --from 2024-01-01 --to 2024-12-31 [--company COMPANY_ID] [--dry-run]
+
+``backfill`` fetches the range from the history API in a few batched calls.
+``recompute`` loads the stored tables for the range once and rewrites
+``converted_amount``/``conversion_rate`` on expenses dated in it, without any
+network calls; spend rollups are adjusted by the same deltas. Expenses whose
+date has no stored table (run ``backfill`` first) are left untouched.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import bisect
+import math
+from datetime import date, timedelta
+from typing import Any
+
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.db.client import close_mongo_connection, connect_to_mongo, get_collection
+from app.db.indexes import reconcile_indexes
+from app.db.repositories.exchange_rate_repository import ExchangeRateRepository
+from app.db.repositories.expense_repository import ExpenseRepository
+from app.services.currency_service import currency_service
+from app.services.rate_table import RateTable
+from app.services.rollup_service import rollup_service
+from app.utils.serializers import to_mongo_date
+
+_RECOMPUTE_FIELDS = {
+    "amount": 1,
+    "currency_code": 1,
+    "company_id": 1,
+    "company_currency": 1,
+    "expense_date": 1,
+    "category": 1,
+    "employee_id": 1,
+    "status": 1,
+    "converted_amount": 1,
+    "conversion_rate": 1,
+}
+
+
+async def backfill(start: date, end: date) -> None:
+    repo = ExchangeRateRepository()
+    await reconcile_indexes(repo.collection, repo.indexes)
+    stored = await currency_service.backfill_rates(start, end)
+    print(f"Stored {stored} daily {settings.currency_pivot.upper()} rate tables for {start}..{end}")
+
+
+class _TableLookup:
+    """The latest stored table on or before a day, within the configured gap."""
+
+    def __init__(self, pivot: str, documents: list[dict]) -> None:
+        self.days = [document["date"].date() for document in documents]
+        self.tables = [RateTable.from_rates(pivot, document["rates"]) for document in documents]
+
+    def on(self, day: date) -> RateTable | None:
+        position = bisect.bisect_right(self.days, day) - 1
+        if position < 0 or (day - self.days[position]).days > settings.currency_history_max_gap_days:
+            return None
+        return self.tables[position]
+
+
+async def recompute(start: date, end: date, company_id: str | None, dry_run: bool, batch_size: int) -> None:
+    pivot = settings.currency_pivot.upper()
+    documents = await ExchangeRateRepository().list_tables(
+        pivot, start - timedelta(days=settings.currency_history_max_gap_days), end
+    )
+    lookup = _TableLookup(pivot, documents)
+
+    query: dict[str, Any] = {"expense_date": {"$gte": to_mongo_date(start), "$lte": to_mongo_date(end)}}
+    if company_id:
+        query["company_id"] = company_id
+    expenses = get_collection(ExpenseRepository.collection_name)
+    cursor = expenses.find(query, _RECOMPUTE_FIELDS).batch_size(batch_size)
+
+    scanned = changed = missing = 0
+    operations: list[UpdateOne] = []
+    changes: list[tuple[dict, dict]] = []
+
+    async def flush() -> None:
+        if operations and not dry_run:
+            await expenses.bulk_write(operations, ordered=False)
+            await rollup_service.record_changes(changes)
+        operations.clear()
+        changes.clear()
+
+    async for expense in cursor:
+        scanned += 1
+        table = lookup.on(expense["expense_date"].date())
+        rate = table.rate(expense["currency_code"], expense["company_currency"]) if table else None
+        if expense["currency_code"].upper() == expense["company_currency"].upper():
+            rate = 1.0
+        if rate is None:
+            missing += 1
+            continue
+        converted_amount = expense["amount"] * rate
+        if math.isclose(converted_amount, expense.get("converted_amount") or 0.0, rel_tol=1e-9, abs_tol=1e-9):
+            continue
+        changed += 1
+        operations.append(
+            UpdateOne({"_id": expense["_id"]}, {"$set": {"converted_amount": converted_amount, "conversion_rate": rate}})
+        )
+        changes.append((expense, {**expense, "converted_amount": converted_amount, "conversion_rate": rate}))
+        if len(operations) >= batch_size:
+            await flush()
+    await flush()
+
+    verb = "Would update" if dry_run else "Updated"
+    print(f"{verb} {changed} of {scanned} expenses; {missing} had no stored rate for their date")
+
+
+async def main(args: argparse.Namespace) -> None:
+    await connect_to_mongo()
+    try:
+        if args.command == "backfill":
+            await backfill(args.start, args.end)
+        else:
+            await recompute(args.start, args.end, args.company, args.dry_run, args.batch_size)
+    finally:
+        await currency_service.shutdown()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in ("backfill", "recompute"):
+        subparser = subparsers.add_parser(name)
+        subparser.add_argument("--from", dest="start", type=date.fromisoformat, required=True)
+        subparser.add_argument("--to", dest="end", type=date.fromisoformat, required=True)
+    recompute_parser = subparsers.choices["recompute"]
+    recompute_parser.add_argument("--company", help="Only recompute expenses for this company id")
+    recompute_parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    recompute_parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
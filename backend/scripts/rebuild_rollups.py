@@ -0,0 +1,75 @@
+"""Recompute expense spend rollups from the expenses collection.
+
+Run from the ``backend`` directory::
+
+    python -m scripts.rebuild_rollups [--company COMPANY_ID] [--check]
+
+With ``--check`` the recomputed buckets are compared with the stored ones and
+the exit status is non-zero if they differ; nothing is written. Without it the
+stored buckets are replaced. Writes that land while a rebuild is running can
+be lost, so run it when submissions are quiet.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import sys
+
+from app.db.client import close_mongo_connection, connect_to_mongo, get_collection
+from app.db.indexes import reconcile_indexes
+from app.db.repositories.expense_repository import ExpenseRepository
+from app.db.repositories.expense_rollup_repository import (
+    ROLLUP_KEY_FIELDS,
+    ExpenseRollupRepository,
+    rebuild_pipeline,
+)
+
+
+def _by_key(rollups: list[dict]) -> dict[tuple, dict]:
+    return {tuple(rollup.get(field) for field in ROLLUP_KEY_FIELDS): rollup for rollup in rollups}
+
+
+def diff(expected: list[dict], stored: list[dict]) -> list[str]:
+    expected_by_key = _by_key(expected)
+    stored_by_key = {key: rollup for key, rollup in _by_key(stored).items() if rollup.get("count")}
+    problems: list[str] = []
+    for key in sorted(expected_by_key.keys() | stored_by_key.keys(), key=str):
+        want = expected_by_key.get(key, {"total": 0.0, "count": 0})
+        have = stored_by_key.get(key, {"total": 0.0, "count": 0})
+        if want["count"] != have["count"] or not math.isclose(want["total"], have["total"], rel_tol=1e-9, abs_tol=1e-6):
+            problems.append(
+                f"{dict(zip(ROLLUP_KEY_FIELDS, key))}: expected total={want['total']} count={want['count']}, "
+                f"stored total={have['total']} count={have['count']}"
+            )
+    return problems
+
+
+async def main(company_id: str | None, check: bool) -> int:
+    await connect_to_mongo()
+    repo = ExpenseRollupRepository()
+    try:
+        expenses = get_collection(ExpenseRepository.collection_name)
+        expected = [doc async for doc in expenses.aggregate(rebuild_pipeline(company_id))]
+        if check:
+            problems = diff(expected, await repo.list_rollups(company_id))
+            for problem in problems:
+                print(problem)
+            print(f"{len(problems)} mismatched rollup buckets")
+            return 1 if problems else 0
+
+        await reconcile_indexes(repo.collection, repo.indexes)
+        deleted = await repo.delete_rollups(company_id)
+        await repo.apply_deltas([({field: doc[field] for field in ROLLUP_KEY_FIELDS}, doc["total"], doc["count"]) for doc in expected])
+        print(f"Replaced {deleted} rollup buckets with {len(expected)} recomputed buckets")
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--company", help="Only rebuild rollups for this company id")
+    parser.add_argument("--check", action="store_true", help="Compare with stored rollups instead of replacing them")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.company, args.check)))
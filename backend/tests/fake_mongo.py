@@ -0,0 +1,141 @@
+"""A small in-memory stand-in for the Motor collection API used by the repositories.
+
+It understands only the query and update operators the repositories use, so
+guarded writes can be tested without a MongoDB server.
+"""
+from __future__ import annotations
+
+import copy
+from typing import Any
+
+from bson import ObjectId
+
+_MISSING = object()
+
+
+def _values(document: Any, path: str) -> list[Any]:
+    head, _, rest = path.partition(".")
+    if isinstance(document, list):
+        return [value for item in document for value in _values(item, path)]
+    if not isinstance(document, dict) or head not in document:
+        return [_MISSING]
+    value = document[head]
+    if not rest:
+        return [value, *(value if isinstance(value, list) else [])]
+    return _values(value, rest)
+
+
+def _matches_condition(values: list[Any], condition: Any) -> bool:
+    present = [value for value in values if value is not _MISSING]
+    if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+        for operator, operand in condition.items():
+            if operator == "$exists":
+                if bool(present) != operand:
+                    return False
+            elif operator == "$in":
+                if not any(value in operand for value in present):
+                    return False
+            elif operator == "$ne":
+                if operand in present:
+                    return False
+            elif operator == "$gt":
+                if not any(value is not None and value > operand for value in present):
+                    return False
+            else:
+                raise NotImplementedError(operator)
+        return True
+    if condition is None:
+        return not present or None in present
+    return condition in present
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(document, branch) for branch in condition):
+                return False
+        elif not _matches_condition(_values(document, key), condition):
+            return False
+    return True
+
+
+def apply_update(document: dict, update: dict) -> None:
+    for operator, fields in update.items():
+        for key, value in fields.items():
+            if operator == "$set":
+                document[key] = copy.deepcopy(value)
+            elif operator == "$inc":
+                document[key] = document.get(key, 0) + value
+            elif operator == "$push":
+                document.setdefault(key, []).append(copy.deepcopy(value))
+            else:
+                raise NotImplementedError(operator)
+
+
+class FakeCursor:
+    def __init__(self, documents: list[dict]) -> None:
+        self._documents = documents
+
+    def sort(self, keys: str | list[tuple[str, int]], direction: int = 1) -> FakeCursor:
+        if isinstance(keys, str):
+            keys = [(keys, direction)]
+        for key, direction in reversed(keys):
+            self._documents.sort(key=lambda document: document.get(key), reverse=direction < 0)
+        return self
+
+    def batch_size(self, size: int) -> FakeCursor:
+        return self
+
+    def limit(self, count: int) -> FakeCursor:
+        self._documents = self._documents[:count]
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self._documents:
+            yield document
+
+
+class FakeCollection:
+    def __init__(self) -> None:
+        self.documents: list[dict] = []
+        # Runs before each write is applied, to simulate another writer racing with it.
+        self.before_write = None
+
+    async def insert_one(self, document: dict):
+        document.setdefault("_id", ObjectId())
+        self.documents.append(copy.deepcopy(document))
+        return type("InsertOneResult", (), {"inserted_id": document["_id"]})()
+
+    async def find_one(self, query: dict, projection: dict | None = None) -> dict | None:
+        for document in self.documents:
+            if matches(document, query):
+                return copy.deepcopy(document)
+        return None
+
+    def find(self, query: dict, projection: dict | None = None) -> FakeCursor:
+        return FakeCursor([copy.deepcopy(document) for document in self.documents if matches(document, query)])
+
+    async def find_one_and_update(self, query: dict, update: dict, return_document: Any = None) -> dict | None:
+        if self.before_write:
+            await self.before_write()
+        return copy.deepcopy(self._update_one(query, update))
+
+    async def update_one(self, query: dict, update: dict):
+        matched = self._update_one(query, update) is not None
+        return type("UpdateResult", (), {"matched_count": int(matched), "modified_count": int(matched)})()
+
+    async def bulk_write(self, operations: list, ordered: bool = True):
+        if self.before_write:
+            await self.before_write()
+        modified = sum(self._update_one(operation._filter, operation._doc) is not None for operation in operations)
+        return type("BulkWriteResult", (), {"matched_count": modified, "modified_count": modified})()
+
+    def _update_one(self, query: dict, update: dict) -> dict | None:
+        for document in self.documents:
+            if matches(document, query):
+                apply_update(document, update)
+                return document
+        return None
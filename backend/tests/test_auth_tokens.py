@@ -0,0 +1,44 @@
+import pytest
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.dependencies import auth
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    auth.token_cache.clear()
+    yield
+    auth.token_cache.clear()
+
+
+def test_token_is_verified_once_then_served_from_cache(monkeypatch):
+    decodes = []
+    real_decode = auth.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decodes.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    token = create_access_token("user-1", {"role": "employee", "company_id": "company-1"})
+
+    first = auth.decode_token(token)
+    second = auth.decode_token(token)
+
+    assert first is second
+    assert first.sub == "user-1"
+    assert len(decodes) == 1
+
+
+def test_invalid_and_expired_tokens_are_rejected_and_not_cached(monkeypatch):
+    token = create_access_token("user-1", {"role": "employee", "company_id": "company-1"})
+    assert auth.decode_token(token[:-2] + "xx") is None
+
+    expired = create_access_token("user-1", {"role": "employee", "company_id": "company-1"}, expires_minutes=-1)
+    assert auth.decode_token(expired) is None
+    assert len(auth.token_cache) == 0
+
+    monkeypatch.setattr(settings, "token_cache_enabled", False)
+    assert auth.decode_token(token).sub == "user-1"
+    assert len(auth.token_cache) == 0
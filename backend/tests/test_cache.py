@@ -0,0 +1,55 @@
+from app.utils.cache import TTLCache
+from app.utils.metrics import CacheMetrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_and_least_recently_used_is_evicted():
+    clock = FakeClock()
+    metrics = CacheMetrics("test")
+    cache = TTLCache(max_entries=2, ttl_seconds=10, metrics=metrics, clock=clock)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    cache.set("short", 4, ttl_seconds=1)
+    clock.now = 5
+    assert cache.get("short") is None
+    clock.now = 11
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+    snapshot = metrics.snapshot()
+    assert snapshot["hits"] == 2
+    assert snapshot["misses"] == 3
+    assert snapshot["evictions"] == 2
+    assert snapshot["expirations"] == 2
+
+
+def test_invalidate_removes_entry():
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("user", {"role": "employee"})
+    cache.invalidate("user")
+    cache.invalidate("missing")
+    assert cache.get("user") is None
+
+
+def test_fill_from_before_an_invalidation_is_dropped():
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    epoch = cache.epoch
+    cache.invalidate("user-1")
+    cache.set("user-1", "stale", epoch=epoch)
+    assert cache.get("user-1") is None
+
+    cache.set("user-1", "fresh", epoch=cache.epoch)
+    assert cache.get("user-1") == "fresh"
@@ -0,0 +1,63 @@
+import pytest
+
+from app.core.config import settings
+from app.services.company_config import CompanyConfigCache
+
+
+class FakeCompanyRepository:
+    def __init__(self):
+        self.reads = 0
+        self.currency_code = "USD"
+
+    async def get_company_by_id(self, company_id):
+        self.reads += 1
+        return {"_id": company_id, "name": "Acme", "currency_code": self.currency_code}
+
+
+class FakeRuleRepository:
+    def __init__(self):
+        self.reads = 0
+        self.rules = [{"_id": "rule-1", "company_id": "company-1", "is_active": True}]
+
+    async def list_active_rules_for_company(self, company_id):
+        self.reads += 1
+        return [dict(rule) for rule in self.rules]
+
+
+@pytest.fixture
+def cache():
+    cache = CompanyConfigCache(max_entries=10, ttl_seconds=60)
+    cache.company_repo = FakeCompanyRepository()
+    cache.rule_repo = FakeRuleRepository()
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_company_is_read_once_until_invalidated(cache):
+    first = await cache.get_company("company-1")
+    first["currency_code"] = "mutated"
+    second = await cache.get_company("company-1")
+
+    assert second == {"id": "company-1", "name": "Acme", "currency_code": "USD"}
+    assert cache.company_repo.reads == 1
+
+    cache.company_repo.currency_code = "EUR"
+    cache.invalidate_company("company-1")
+    assert (await cache.get_company("company-1"))["currency_code"] == "EUR"
+    assert cache.company_repo.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_active_rules_are_cached_per_company(cache, monkeypatch):
+    assert [rule["id"] for rule in await cache.list_active_rules("company-1")] == ["rule-1"]
+    await cache.list_active_rules("company-1")
+    assert cache.rule_repo.reads == 1
+
+    cache.rule_repo.rules.append({"_id": "rule-2", "company_id": "company-1", "is_active": True})
+    cache.invalidate_rules("company-1")
+    assert [rule["id"] for rule in await cache.list_active_rules("company-1")] == ["rule-1", "rule-2"]
+
+    monkeypatch.setattr(settings, "company_cache_enabled", False)
+    await cache.list_active_rules("company-1")
+    await cache.list_active_rules("company-1")
+    assert cache.rule_repo.reads == 4
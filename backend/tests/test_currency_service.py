@@ -0,0 +1,217 @@
+import asyncio
+import math
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.currency_service import CurrencyService
+from app.utils.metrics import cache_metrics
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "http_retry_backoff_seconds", 0.0)
+    monkeypatch.setattr(settings, "country_snapshot_path", str(tmp_path / "countries.json"))
+    cache_metrics("exchange_rates").reset()
+
+
+def _service(handler):
+    return CurrencyService(
+        restcountries_url="http://rates.test/countries",
+        currency_api_base_url="http://rates.test/latest/",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+@pytest.mark.asyncio
+async def test_rates_are_fetched_once_and_retried_on_server_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"rates": {"USD": 1.0, "EUR": 0.5, "GBP": 0.25}})
+
+    service = _service(handler)
+    assert await service.convert_to_company_currency(10, "eur", "usd") == pytest.approx((20.0, 2.0))
+    assert await service.convert_to_company_currency(10, "GBP", "EUR") == pytest.approx((20.0, 2.0))
+    await service.shutdown()
+
+    assert calls == ["/latest/USD", "/latest/USD"]
+
+
+@pytest.mark.asyncio
+async def test_convert_many_uses_one_rate_table_and_marks_unknown_codes():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"rates": {"USD": 1.0, "EUR": 0.5, "JPY": 150.0}})
+
+    service = _service(handler)
+    converted, rates = await service.convert_many([10, 300, 4, 1], ["EUR", "jpy", "USD", "XXX"], "USD")
+    await service.shutdown()
+
+    assert converted[:3].tolist() == pytest.approx([20.0, 2.0, 4.0])
+    assert rates[:3].tolist() == pytest.approx([2.0, 1 / 150, 1.0])
+    assert math.isnan(converted[3]) and math.isnan(rates[3])
+    assert calls == ["/latest/USD"]
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(404)
+
+    service = _service(handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        await service.get_country_currency("fr")
+    await service.shutdown()
+
+    assert calls == ["/countries"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch_and_stale_rates_are_served_while_refreshing():
+    calls = []
+    release = asyncio.Event()
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await release.wait()
+        return httpx.Response(200, json={"rates": {"USD": 1.0, "EUR": 1.0 / (1 + len(calls))}})
+
+    service = _service(handler)
+    waiters = [asyncio.create_task(service.convert_to_company_currency(1, "EUR", "USD")) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert {result for result in await asyncio.gather(*waiters)} == {(2.0, 2.0)}
+    assert len(calls) == 1
+    assert service.rates_metrics.snapshot()["coalesced"] == 4
+
+    fresh_until, usable_until, table = service._rate_table
+    service._rate_table = (datetime.now(timezone.utc) - timedelta(seconds=1), usable_until, table)
+    assert await service.convert_to_company_currency(1, "EUR", "USD") == (2.0, 2.0)
+    await asyncio.gather(*service._background)
+    assert await service.convert_to_company_currency(1, "EUR", "USD") == (3.0, 3.0)
+    assert service.rates_metrics.snapshot()["stale_serves"] == 1
+    await service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_country_index_is_fetched_once_and_persisted_for_offline_use(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(
+            200,
+            json=[
+                {"cca2": "FR", "currencies": {"EUR": {}}},
+                {"cca2": "JP", "currencies": {"JPY": {}}},
+                {"cca2": "AQ", "currencies": {}},
+            ],
+        )
+
+    service = _service(handler)
+    assert await service.get_country_currency("fr") == "EUR"
+    assert await service.get_country_currency("JP") == "JPY"
+    with pytest.raises(ValueError):
+        await service.get_country_currency("AQ")
+    await service.shutdown()
+    assert calls == ["/countries"]
+
+    monkeypatch.setattr(settings, "country_index_offline", True)
+    offline = _service(lambda request: pytest.fail("offline mode must not fetch"))
+    await offline.startup()
+    assert await offline.get_country_currency("JP") == "JPY"
+    await offline.shutdown()
+
+
+class _MemoryRateStore:
+    def __init__(self):
+        self.tables = {}
+
+    async def upsert_tables(self, pivot, tables, source):
+        for day, rates in tables.items():
+            self.tables[(pivot, day)] = rates
+        return len(tables)
+
+    async def get_table_on_or_before(self, pivot, day, max_gap_days):
+        candidates = [d for p, d in self.tables if p == pivot and day - timedelta(days=max_gap_days) <= d <= day]
+        if not candidates:
+            return None
+        latest = max(candidates)
+        return {"date": datetime.combine(latest, datetime.min.time()), "rates": self.tables[(pivot, latest)]}
+
+
+@pytest.mark.asyncio
+async def test_historical_conversions_backfill_once_then_read_from_the_store():
+    calls = []
+
+    def handler(request):
+        if "/latest/" in str(request.url):
+            return httpx.Response(200, json={"rates": {"EUR": 0.9}})
+        calls.append(str(request.url))
+        return httpx.Response(
+            200,
+            json={"rates": {"2024-03-01": {"EUR": 0.5}, "2024-03-04": {"EUR": 0.25}}},
+        )
+
+    service = _service(handler)
+    service.currency_history_base_url = "http://rates.test/history"
+    service.rate_repo = _MemoryRateStore()
+
+    # 2024-03-02 is a Saturday: the Friday table applies.
+    assert await service.convert_to_company_currency(10, "EUR", "USD", on_date=date(2024, 3, 2)) == (20.0, 2.0)
+    assert await service.convert_to_company_currency(10, "EUR", "USD", on_date=date(2024, 3, 4)) == (40.0, 4.0)
+    converted, _ = await service.convert_many([1, 1], ["EUR", "USD"], "USD", on_date=date(2024, 3, 1))
+    await service.shutdown()
+
+    assert converted.tolist() == [2.0, 1.0]
+    assert calls == ["http://rates.test/history/2024-02-24..2024-03-02?from=USD"]
+
+
+@pytest.mark.asyncio
+async def test_currencies_missing_from_history_use_live_rates():
+    def handler(request):
+        if "/history/" in str(request.url):
+            return httpx.Response(200, json={"rates": {"2024-03-01": {"EUR": 0.5}}})
+        return httpx.Response(200, json={"rates": {"EUR": 0.9, "AED": 4.0}})
+
+    service = _service(handler)
+    service.currency_history_base_url = "http://rates.test/history"
+    service.rate_repo = _MemoryRateStore()
+
+    assert await service.convert_to_company_currency(8, "AED", "USD", on_date=date(2024, 3, 1)) == (2.0, 0.25)
+    # Currencies the history does cover keep their historical rate.
+    assert await service.convert_to_company_currency(10, "EUR", "USD", on_date=date(2024, 3, 1)) == (20.0, 2.0)
+    await service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_backfill_is_not_retried_for_a_while():
+    history_calls = []
+
+    def handler(request):
+        if "/history/" in str(request.url):
+            history_calls.append(str(request.url))
+            return httpx.Response(503)
+        return httpx.Response(200, json={"rates": {"EUR": 0.5}})
+
+    service = _service(handler)
+    service.currency_history_base_url = "http://rates.test/history"
+    service.rate_repo = _MemoryRateStore()
+
+    for _ in range(3):
+        assert await service.convert_to_company_currency(10, "EUR", "USD", on_date=date(2024, 3, 1)) == (20.0, 2.0)
+    await service.shutdown()
+
+    # One backfill attempt with its retries; later lookups use the live table straight away.
+    assert len(history_calls) == settings.http_retries + 1
@@ -0,0 +1,26 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.executor import BoundedExecutor
+
+
+@pytest.mark.asyncio
+async def test_saturated_executor_rejects_with_retry_after():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1, retry_after_seconds=3)
+    release = threading.Event()
+    running = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as excinfo:
+        await executor.run(lambda: None)
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "3"}
+
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+    assert executor.pending == 0
+    assert await executor.run(sum, [1, 2]) == 3
+    executor.shutdown()
@@ -0,0 +1,178 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.db.repositories.expense_repository import ExpenseRepository
+from app.schemas.expense import ApprovalAction, BulkApprovalItem
+from app.services import expense_service as expense_module
+from app.services.expense_service import ExpenseService
+from tests.fake_mongo import FakeCollection
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(ExpenseRepository, "collection", property(lambda self: collection))
+    return collection
+
+
+@pytest.fixture
+def rollup_changes(monkeypatch):
+    changes = []
+
+    async def record_changes(batch):
+        changes.extend(batch)
+
+    monkeypatch.setattr(expense_module.rollup_service, "record_changes", record_changes)
+    return changes
+
+
+def _pending_expense(collection, sequence=("manager", "director"), **fields):
+    expense = {
+        "_id": ObjectId(),
+        "company_id": "company-1",
+        "employee_id": "employee-1",
+        "status": "pending",
+        "approver_sequence": list(sequence),
+        "current_step_index": 0,
+        "current_approver_id": sequence[0],
+        "approval_rule_id": None,
+        "approval_history": [],
+        "approval_count": 0,
+        "specific_approved": False,
+        "converted_amount": 50.0,
+        "expense_date": datetime(2024, 3, 1, tzinfo=timezone.utc),
+        "created_at": datetime(2024, 3, 1, tzinfo=timezone.utc),
+        "version": 0,
+        **fields,
+    }
+    collection.documents.append(expense)
+    return str(expense["_id"])
+
+
+def _item(expense_id, decision="approved"):
+    return BulkApprovalItem(expense_id=expense_id, decision=decision)
+
+
+@pytest.mark.asyncio
+async def test_bulk_outcomes_applied_not_found_and_duplicate(collection, rollup_changes):
+    applied = _pending_expense(collection)
+    rejected = _pending_expense(collection)
+    other_approver = _pending_expense(collection, sequence=("someone-else",))
+
+    results = await ExpenseService().record_approvals(
+        "company-1",
+        "manager",
+        [_item(applied), _item(rejected, "rejected"), _item(applied), _item(other_approver), _item("not-an-id")],
+    )
+
+    assert [(result["outcome"], result["status"]) for result in results] == [
+        ("applied", "pending"),
+        ("applied", "rejected"),
+        ("duplicate", None),
+        ("not_found", None),
+        ("not_found", None),
+    ]
+    assert collection.documents[0]["current_approver_id"] == "director"
+    assert [after["status"] for _, after in rollup_changes] == ["pending", "rejected"]
+
+
+@pytest.mark.asyncio
+async def test_write_that_lost_a_race_is_reported_as_conflict(collection, rollup_changes):
+    expense_id = _pending_expense(collection)
+
+    async def concurrent_single_approval():
+        document = collection.documents[0]
+        document.update(version=1, current_step_index=1, current_approver_id="director")
+
+    collection.before_write = concurrent_single_approval
+    results = await ExpenseService().record_approvals("company-1", "manager", [_item(expense_id)])
+
+    assert results[0]["outcome"] == "conflict"
+    assert rollup_changes == []
+
+
+@pytest.mark.asyncio
+async def test_write_followed_by_another_is_still_reported_as_applied(collection, rollup_changes, monkeypatch):
+    expense_id = _pending_expense(collection)
+    bulk_write = collection.bulk_write
+
+    async def bulk_write_then_next_approver(operations, ordered=True):
+        await bulk_write(operations, ordered)
+        document = collection.documents[0]
+        document["approval_history"].append({"approver_id": "director", "decision": "approved"})
+        document.update(version=document["version"] + 1, status="approved")
+
+    monkeypatch.setattr(collection, "bulk_write", bulk_write_then_next_approver)
+    results = await ExpenseService().record_approvals("company-1", "manager", [_item(expense_id)])
+
+    assert (results[0]["outcome"], results[0]["status"]) == ("applied", "pending")
+    assert len(rollup_changes) == 1
+
+
+def _action(decision="approved"):
+    return ApprovalAction(decision=decision)
+
+
+@pytest.mark.asyncio
+async def test_single_approval_advances_the_step_and_version(collection, rollup_changes):
+    expense_id = _pending_expense(collection)
+
+    updated = await ExpenseService().record_approval("company-1", expense_id, "manager", _action())
+
+    assert (updated["current_approver_id"], updated["version"], updated["approval_count"]) == ("director", 1, 1)
+    assert ObjectId.is_valid(updated["approval_history"][0]["id"])
+    assert len(rollup_changes) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_version_is_a_conflict(collection, rollup_changes):
+    expense_id = _pending_expense(collection)
+
+    async def concurrent_edit():
+        collection.documents[0]["version"] = 1
+
+    collection.before_write = concurrent_edit
+    with pytest.raises(HTTPException) as excinfo:
+        await ExpenseService().record_approval("company-1", expense_id, "manager", _action())
+
+    assert excinfo.value.status_code == 409
+    assert collection.documents[0]["approval_history"] == []
+    assert rollup_changes == []
+
+
+@pytest.mark.asyncio
+async def test_step_mismatch_is_a_conflict(collection, rollup_changes):
+    expense_id = _pending_expense(collection)
+
+    async def step_moved():
+        collection.documents[0].update(current_step_index=1, current_approver_id="director")
+
+    collection.before_write = step_moved
+    with pytest.raises(HTTPException) as excinfo:
+        await ExpenseService().record_approval("company-1", expense_id, "manager", _action())
+
+    assert excinfo.value.status_code == 409
+    assert collection.documents[0]["approval_history"] == []
+
+
+@pytest.mark.asyncio
+async def test_documents_without_a_version_are_guarded_by_its_absence(collection, rollup_changes):
+    expense_id = _pending_expense(collection)
+    del collection.documents[0]["version"]
+
+    updated = await ExpenseService().record_approval("company-1", expense_id, "manager", _action())
+    assert updated["version"] == 1
+
+    legacy_id = _pending_expense(collection)
+    del collection.documents[1]["version"]
+
+    async def migrated_meanwhile():
+        collection.documents[1]["version"] = 1
+
+    collection.before_write = migrated_meanwhile
+    with pytest.raises(HTTPException) as excinfo:
+        await ExpenseService().record_approval("company-1", legacy_id, "manager", _action())
+    assert excinfo.value.status_code == 409
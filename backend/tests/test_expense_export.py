@@ -0,0 +1,43 @@
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.services.expense_export import encode_rows
+
+
+async def _expenses(count):
+    for index in range(count):
+        yield {
+            "_id": ObjectId(),
+            "title": f"Taxi {index}",
+            "amount": 10.0,
+            "expense_date": datetime(2024, 5, 1),
+            "created_at": datetime(2024, 5, 2, 9, 30),
+            "approval_history": [],
+        }
+
+
+async def _collect(rows):
+    return "".join([chunk async for chunk in rows])
+
+
+@pytest.mark.asyncio
+async def test_encode_rows_csv_writes_header_and_date_only_expense_date():
+    output = await _collect(encode_rows(_expenses(2), "csv"))
+    lines = output.strip().splitlines()
+    assert lines[0].startswith("id,employee_id,title")
+    assert len(lines) == 3
+    assert ",Taxi 0,," in lines[1]
+    assert "2024-05-01,,2024-05-02T09:30:00," in lines[1]
+
+
+@pytest.mark.asyncio
+async def test_encode_rows_ndjson_chunks_large_exports():
+    chunks = [chunk async for chunk in encode_rows(_expenses(1200), "ndjson")]
+    assert len(chunks) == 3
+    rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert len(rows) == 1200
+    assert rows[0]["expense_date"] == "2024-05-01"
+    assert "_id" not in rows[0] and len(rows[0]["id"]) == 24
@@ -0,0 +1,145 @@
+import csv
+from io import BytesIO
+
+import httpx
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import expense_service as expense_module
+from app.services.expense_import import detect_format, iter_rows
+from app.services.expense_service import ExpenseService
+from app.services.org_tree import OrgTree
+
+
+def test_iter_rows_csv_skips_blank_cells_and_reports_line_numbers():
+    upload = BytesIO(b"title,category,amount,currency_code,expense_date,description\nTaxi,Travel,12.5,EUR,2024-05-01,\n")
+    assert list(iter_rows(upload, "csv")) == [
+        (2, {"title": "Taxi", "category": "Travel", "amount": "12.5", "currency_code": "EUR", "expense_date": "2024-05-01"}, None)
+    ]
+
+
+def test_iter_rows_csv_rejects_unknown_columns():
+    rows = list(iter_rows(BytesIO(b"title,colour\nTaxi,red\n"), "csv"))
+    assert rows == [(1, None, "Unknown columns: colour")]
+
+
+def test_iter_rows_ndjson_reports_bad_lines_and_continues():
+    upload = BytesIO(b'{"title": "Taxi"}\n\nnot json\n[1]\n{"title": "Hotel"}\n')
+    rows = list(iter_rows(upload, "ndjson"))
+    assert [(row, data) for row, data, _ in rows] == [(1, {"title": "Taxi"}), (3, None), (4, None), (5, {"title": "Hotel"})]
+    assert rows[2][2] == "Each line must be a JSON object"
+
+
+def test_detect_format():
+    assert detect_format("statement.ndjson", None) == "ndjson"
+    assert detect_format("statement.csv", "text/csv") == "csv"
+    assert detect_format(None, "application/x-ndjson") == "ndjson"
+
+
+def test_undecodable_lines_fail_only_their_own_row():
+    csv_rows = list(iter_rows(BytesIO(b"\xef\xbb\xbftitle,amount\nTaxi,1\nBad\xff,2\nHotel,3\n"), "csv"))
+    assert [(row, data) for row, data, _ in csv_rows] == [(2, {"title": "Taxi", "amount": "1"}), (3, None), (4, {"title": "Hotel", "amount": "3"})]
+    assert csv_rows[1][2].startswith("Line is not valid UTF-8")
+
+    ndjson_rows = list(iter_rows(BytesIO(b'{"title": "a"}\n{"title": "\xff"}\n{"title": "b"}\n'), "ndjson"))
+    assert [(row, data) for row, data, _ in ndjson_rows] == [(1, {"title": "a"}), (2, None), (3, {"title": "b"})]
+
+
+def test_csv_errors_are_reported_per_row():
+    limit = csv.field_size_limit(20)
+    try:
+        rows = list(iter_rows(BytesIO(b"title,amount\nTaxi,1\n" + b"x" * 50 + b",2\nHotel,3\n"), "csv"))
+    finally:
+        csv.field_size_limit(limit)
+    assert [(row, data is None) for row, data, _ in rows] == [(2, False), (3, True), (4, False)]
+    assert rows[1][2].startswith("Invalid CSV")
+
+
+@pytest.mark.asyncio
+async def test_rows_up_to_the_limit_are_imported_and_the_rest_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "expense_import_chunk_size", 3)
+    monkeypatch.setattr(settings, "expense_import_max_rows", 4)
+    service = ExpenseService()
+    employee = {"_id": "employee-1", "company_id": "company-1", "role": "employee"}
+
+    async def get_user_by_id(user_id):
+        return employee
+
+    async def get_company(company_id):
+        return {"id": company_id, "currency_code": "USD"}
+
+    async def get_tree(company_id):
+        return OrgTree({})
+
+    imported = []
+
+    async def import_chunk(company_id, employee_id, chunk, context):
+        imported.extend(row for row, _, _ in chunk)
+
+    monkeypatch.setattr(service.user_repo, "get_user_by_id", get_user_by_id)
+    monkeypatch.setattr(expense_module.company_config, "get_company", get_company)
+    monkeypatch.setattr(expense_module.org_trees, "get", get_tree)
+    monkeypatch.setattr(service, "_import_chunk", import_chunk)
+
+    upload = BytesIO(b"".join(b'{"title": "row %d"}\n' % number for number in range(1, 8)))
+    result = await service.import_expenses("company-1", "employee-1", upload, "ndjson")
+
+    assert imported == [1, 2, 3, 4]
+    assert [error["row"] for error in result["errors"]] == [5]
+
+
+@pytest.mark.asyncio
+async def test_rate_lookup_failures_fail_only_the_rows_of_that_date(monkeypatch):
+    service = ExpenseService()
+    employee = {"_id": "employee-1", "company_id": "company-1", "role": "employee", "manager_id": "manager", "is_manager_approver": True}
+
+    async def get_user_by_id(user_id):
+        return employee
+
+    async def get_company(company_id):
+        return {"id": company_id, "currency_code": "USD"}
+
+    async def get_tree(company_id):
+        return OrgTree({"manager": None})
+
+    async def list_active_rules(company_id):
+        return []
+
+    async def convert_many(amounts, from_codes, to_code, on_date=None):
+        if str(on_date) == "2024-05-01":
+            raise httpx.ConnectError("history API down")
+        return np.array(amounts) * 2, np.full(len(amounts), 2.0)
+
+    inserted = []
+
+    async def create_expenses(documents):
+        for number, document in enumerate(documents, start=len(inserted)):
+            document["_id"] = f"expense-{number}"
+        inserted.extend(documents)
+
+    async def record_changes(changes):
+        pass
+
+    monkeypatch.setattr(service.user_repo, "get_user_by_id", get_user_by_id)
+    monkeypatch.setattr(service.expense_repo, "create_expenses", create_expenses)
+    monkeypatch.setattr(expense_module.company_config, "get_company", get_company)
+    monkeypatch.setattr(expense_module.company_config, "list_active_rules", list_active_rules)
+    monkeypatch.setattr(expense_module.org_trees, "get", get_tree)
+    monkeypatch.setattr(expense_module.currency_service, "convert_many", convert_many)
+    monkeypatch.setattr(expense_module.rollup_service, "record_changes", record_changes)
+
+    rows = [("Taxi", "2024-05-01"), ("Hotel", "2024-05-02"), ("Lunch", "2024-05-01")]
+    upload = BytesIO(
+        b"".join(
+            b'{"title": "%s", "category": "Travel", "amount": 10, "currency_code": "EUR", "expense_date": "%s"}\n'
+            % (title.encode(), day.encode())
+            for title, day in rows
+        )
+    )
+    result = await service.import_expenses("company-1", "employee-1", upload, "ndjson")
+
+    assert [document["title"] for document in inserted] == ["Hotel"]
+    assert inserted[0]["converted_amount"] == 20.0
+    assert (result["imported"], result["failed"]) == (1, 2)
+    assert [error["row"] for error in result["errors"]] == [1, 3]
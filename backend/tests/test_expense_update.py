@@ -0,0 +1,160 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.db.repositories.approval_rule_repository import ApprovalRuleRepository
+from app.db.repositories.expense_repository import ExpenseRepository
+from app.db.repositories.user_repository import UserRepository
+from app.schemas.expense import ExpenseUpdate
+from app.services import expense_service as expense_module
+from app.services.expense_service import ExpenseService
+from app.services.org_tree import org_trees
+from tests.fake_mongo import FakeCollection
+
+EMPLOYEE = {"id": "employee-1", "role": "employee"}
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(ExpenseRepository, "collection", property(lambda self: collection))
+    return collection
+
+
+@pytest.fixture
+def rollup_changes(monkeypatch):
+    changes = []
+
+    async def record_changes(batch):
+        changes.extend(batch)
+
+    monkeypatch.setattr(expense_module.rollup_service, "record_changes", record_changes)
+    return changes
+
+
+def _pending_expense(collection, **fields):
+    expense = {
+        "_id": ObjectId(),
+        "company_id": "company-1",
+        "employee_id": "employee-1",
+        "title": "Taxi",
+        "status": "pending",
+        "approver_sequence": ["manager"],
+        "current_step_index": 0,
+        "current_approver_id": "manager",
+        "approval_rule_id": None,
+        "approval_history": [],
+        "approval_count": 0,
+        "specific_approved": False,
+        "amount": 50.0,
+        "currency_code": "USD",
+        "converted_amount": 50.0,
+        "expense_date": datetime(2024, 3, 1, tzinfo=timezone.utc),
+        "version": 0,
+        **fields,
+    }
+    collection.documents.append(expense)
+    return str(expense["_id"])
+
+
+@pytest.mark.asyncio
+async def test_edit_bumps_the_version_and_records_the_post_image(collection, rollup_changes):
+    expense_id = _pending_expense(collection)
+
+    updated = await ExpenseService().update_expense("company-1", expense_id, ExpenseUpdate(title="Airport taxi"), EMPLOYEE)
+
+    assert (updated["title"], updated["version"]) == ("Airport taxi", 1)
+    assert [(before["title"], after["title"]) for before, after in rollup_changes] == [("Taxi", "Airport taxi")]
+
+
+@pytest.mark.asyncio
+async def test_edit_racing_with_an_approval_is_a_conflict(collection, rollup_changes):
+    expense_id = _pending_expense(collection)
+
+    async def approved_meanwhile():
+        collection.documents[0].update(status="approved", version=1)
+
+    collection.before_write = approved_meanwhile
+    with pytest.raises(HTTPException) as excinfo:
+        await ExpenseService().update_expense("company-1", expense_id, ExpenseUpdate(title="Airport taxi"), EMPLOYEE)
+
+    assert excinfo.value.status_code == 409
+    assert collection.documents[0]["title"] == "Taxi"
+    assert rollup_changes == []
+
+
+@pytest.fixture
+def org(monkeypatch):
+    """An employee under a lead and a director, and a rule escalating to both managers above 100."""
+    users, rules = FakeCollection(), FakeCollection()
+    monkeypatch.setattr(UserRepository, "collection", property(lambda self: users))
+    monkeypatch.setattr(ApprovalRuleRepository, "collection", property(lambda self: rules))
+
+    async def get_company(company_id):
+        return {"id": company_id, "currency_code": "USD"}
+
+    monkeypatch.setattr(expense_module.company_config, "get_company", get_company)
+    org_trees.clear()
+
+    director, lead, employee = ObjectId(), ObjectId(), ObjectId()
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    users.documents += [
+        {"_id": director, "company_id": "company-1", "role": "manager", "created_at": created},
+        {"_id": lead, "company_id": "company-1", "role": "manager", "manager_id": str(director), "created_at": created},
+        {
+            "_id": employee,
+            "company_id": "company-1",
+            "role": "employee",
+            "manager_id": str(lead),
+            "is_manager_approver": True,
+            "created_at": created,
+        },
+    ]
+    rule = ObjectId()
+    rules.documents.append(
+        {"_id": rule, "company_id": "company-1", "rule_type": "sequential", "escalation_amount": 100.0, "escalation_manager_levels": 2}
+    )
+    yield {"employee": str(employee), "lead": str(lead), "director": str(director), "rule": str(rule)}
+    org_trees.clear()
+
+
+@pytest.mark.asyncio
+async def test_raising_the_amount_past_escalation_adds_the_next_manager(collection, rollup_changes, org):
+    expense_id = _pending_expense(
+        collection,
+        employee_id=org["employee"],
+        approval_rule_id=org["rule"],
+        approver_sequence=[org["lead"]],
+        current_approver_id=org["lead"],
+    )
+    requester = {"id": org["employee"], "role": "employee"}
+
+    updated = await ExpenseService().update_expense("company-1", expense_id, ExpenseUpdate(amount=500), requester)
+
+    assert updated["approver_sequence"] == [org["lead"], org["director"]]
+    assert (updated["current_step_index"], updated["current_approver_id"]) == (0, org["lead"])
+
+
+@pytest.mark.asyncio
+async def test_lowering_the_amount_below_escalation_restarts_a_shorter_chain(collection, rollup_changes, org):
+    expense_id = _pending_expense(
+        collection,
+        employee_id=org["employee"],
+        approval_rule_id=org["rule"],
+        amount=500.0,
+        converted_amount=500.0,
+        approver_sequence=[org["lead"], org["director"]],
+        current_step_index=1,
+        current_approver_id=org["director"],
+        approval_count=1,
+        approval_history=[{"approver_id": org["lead"], "decision": "approved"}],
+    )
+    requester = {"id": org["employee"], "role": "employee"}
+
+    updated = await ExpenseService().update_expense("company-1", expense_id, ExpenseUpdate(amount=80), requester)
+
+    assert updated["approver_sequence"] == [org["lead"]]
+    assert (updated["current_step_index"], updated["current_approver_id"], updated["approval_count"]) == (0, org["lead"], 0)
+    assert len(updated["approval_history"]) == 1
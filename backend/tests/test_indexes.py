@@ -0,0 +1,62 @@
+import inspect
+import re
+
+import pytest
+from pymongo import ASCENDING, IndexModel
+
+from app.db.indexes import REPOSITORIES, reconcile_indexes
+
+
+class FakeCollection:
+    name = "fake"
+
+    def __init__(self, existing: dict):
+        self.existing = existing
+        self.dropped: list[str] = []
+        self.created: list[str] = []
+
+    async def index_information(self):
+        return self.existing
+
+    async def drop_index(self, name):
+        self.dropped.append(name)
+
+    async def create_indexes(self, indexes):
+        self.created.extend(index.document["name"] for index in indexes)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_indexes_creates_missing_and_rebuilds_drifted():
+    collection = FakeCollection(
+        {
+            "_id_": {"key": [("_id", 1)]},
+            "email_unique": {"key": [("email", 1)]},
+            "company_created": {"key": [("company_id", 1), ("created_at", 1)]},
+        }
+    )
+    indexes = [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("company_id", ASCENDING), ("created_at", ASCENDING)], name="company_created"),
+        IndexModel([("company_id", ASCENDING), ("status", ASCENDING)], name="company_status"),
+    ]
+
+    created = await reconcile_indexes(collection, indexes)
+
+    assert collection.dropped == ["email_unique"]
+    assert created == collection.created == ["email_unique", "company_status"]
+
+
+_QUERY_CALL = re.compile(r"\.(find|find_one|find_one_and_update|aggregate)\(|\bfind_page\(")
+
+
+@pytest.mark.parametrize("repository", REPOSITORIES, ids=lambda repository: repository.__name__)
+def test_every_repository_query_declares_its_shape(repository):
+    methods = {
+        name
+        for name, member in vars(repository).items()
+        if inspect.isfunction(member) and _QUERY_CALL.search(inspect.getsource(member))
+    }
+    declared = {shape.method for shape in repository.query_shapes}
+
+    assert methods - declared == set(), "add these to query_shapes so check_query_plans explains them"
+    assert declared <= set(vars(repository)), "query_shapes names a method that does not exist"
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from io import BytesIO
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageDraw
+
+from app.services import ocr_service as ocr_module
+from app.services.ocr_service import OCRService
+from app.services.receipt_preprocessing import PreprocessOptions, preprocess
+from app.utils.executor import BoundedExecutor
+
+
+class _MemoryResultStore:
+    def __init__(self):
+        self.results = {}
+
+    async def get_result(self, key):
+        return self.results.get(key)
+
+    async def save_result(self, key, result):
+        self.results[key] = result
+
+    async def trim(self, max_entries):
+        return 0
+
+
+@pytest.fixture
+def service():
+    # Threads instead of spawned processes keep the test fast and let it patch the worker function.
+    service = OCRService()
+    service.executor = BoundedExecutor("ocr", 1, 1, executor_factory=lambda workers: ThreadPoolExecutor(workers))
+    service.result_repo = _MemoryResultStore()
+    yield service
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_invalid_image_is_a_bad_request(service):
+    with pytest.raises(HTTPException) as excinfo:
+        await service.run_ocr(b"not an image")
+    assert excinfo.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_tesseract_timeout_is_a_gateway_timeout(service, monkeypatch):
+    def timed_out(content, timeout_seconds, options):
+        raise RuntimeError("Tesseract process timeout")
+
+    monkeypatch.setattr(ocr_module, "_extract_text", timed_out)
+    with pytest.raises(HTTPException) as excinfo:
+        await service.run_ocr(b"image")
+    assert excinfo.value.status_code == 504
+
+
+class _MemoryJobStore:
+    def __init__(self):
+        self.jobs = {}
+
+    async def create_job(self, job_data, ttl):
+        job_data.update(_id=ObjectId(), created_at=datetime.now(timezone.utc), expires_at=datetime.now(timezone.utc) + ttl)
+        self.jobs[str(job_data["_id"])] = dict(job_data)
+        return str(job_data["_id"])
+
+    async def get_job(self, job_id):
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def update_job(self, job_id, update_data, ttl=None):
+        self.jobs[job_id].update(update_data)
+
+
+@pytest.mark.asyncio
+async def test_job_is_queued_immediately_and_result_is_streamed(service, monkeypatch):
+    release = threading.Event()
+
+    def slow_ocr(content, timeout_seconds, options):
+        release.wait(5)
+        return f" {content.decode()} \n"
+
+    monkeypatch.setattr(ocr_module, "_extract_text", slow_ocr)
+    service.available = True
+    service.job_repo = _MemoryJobStore()
+    user = {"id": "user-1", "company_id": "company-1"}
+
+    job = await service.submit_job(user, UploadFile(BytesIO(b"TOTAL 12.50"), filename="receipt.png"))
+    assert job["status"] == "queued"
+    events = await service.job_events(user, job["id"])
+
+    release.set()
+    messages = [message async for message in events]
+    assert messages[-1].startswith("event: succeeded\n")
+    assert (await service.get_job(user, job["id"]))["text"] == "TOTAL 12.50"
+    with pytest.raises(HTTPException):
+        await service.get_job({"id": "someone-else"}, job["id"])
+
+
+def test_preprocessing_downscales_and_binarizes_photos():
+    photo = Image.new("RGB", (4000, 3000), (200, 190, 180))
+    ImageDraw.Draw(photo).rectangle((1000, 1000, 1400, 1100), fill=(20, 20, 20))
+
+    processed = preprocess(photo, PreprocessOptions(max_dimension=1000))
+
+    assert processed.size == (1000, 750)
+    assert processed.mode == "L"
+    assert set(processed.getdata()) == {0, 255}
+    assert preprocess(photo, PreprocessOptions(enabled=False)) is photo
+
+
+@pytest.mark.asyncio
+async def test_repeat_uploads_are_served_from_the_result_cache(service, monkeypatch):
+    runs = []
+
+    def fake_ocr(content, timeout_seconds, options):
+        runs.append(content)
+        return "TOTAL 9.99"
+
+    monkeypatch.setattr(ocr_module, "_extract_text", fake_ocr)
+    results = await asyncio.gather(*(service.run_ocr(b"same receipt") for _ in range(3)))
+    assert results == ["TOTAL 9.99"] * 3
+    assert await service.run_ocr(b"same receipt") == "TOTAL 9.99"
+    assert await service.run_ocr(b"another receipt") == "TOTAL 9.99"
+    assert runs == [b"same receipt", b"another receipt"]
+
+
+@pytest.mark.asyncio
+async def test_batch_splits_multipage_tiffs_and_streams_each_file(service, monkeypatch):
+    def fake_ocr(content, timeout_seconds, options):
+        with Image.open(BytesIO(content)) as image:
+            return f"width {image.width}"
+
+    monkeypatch.setattr(ocr_module, "_extract_text", fake_ocr)
+    service.available = True
+    tiff = BytesIO()
+    pages = [Image.new("L", (width, 10), 255) for width in (10, 20, 30)]
+    pages[0].save(tiff, format="TIFF", save_all=True, append_images=pages[1:])
+    png = BytesIO()
+    Image.new("L", (40, 10), 255).save(png, format="PNG")
+    uploads = [
+        UploadFile(BytesIO(tiff.getvalue()), filename="bundle.tiff"),
+        UploadFile(BytesIO(png.getvalue()), filename="single.png"),
+        UploadFile(BytesIO(b"garbage"), filename="broken.jpg"),
+    ]
+
+    lines = [json.loads(line) async for line in await service.extract_batch(uploads)]
+
+    by_file = {line["filename"]: line for line in lines}
+    assert by_file["bundle.tiff"]["pages"] == ["width 10", "width 20", "width 30"]
+    assert by_file["single.png"]["text"] == "width 40"
+    assert by_file["broken.jpg"]["status_code"] == 400
+
+
+@pytest.mark.asyncio
+async def test_unexpected_failures_are_reported_per_file_without_ending_the_stream(service, monkeypatch):
+    def flaky_ocr(content, timeout_seconds, options):
+        with Image.open(BytesIO(content)) as image:
+            if image.width == 20:
+                raise RuntimeError("tesseract crashed")
+            return f"width {image.width}"
+
+    monkeypatch.setattr(ocr_module, "_extract_text", flaky_ocr)
+    service.available = True
+    tiff = BytesIO()
+    pages = [Image.new("L", (width, 10), 255) for width in (10, 11)]
+    pages[0].save(tiff, format="TIFF", save_all=True, append_images=pages[1:])
+    uploads = []
+    for name, width in (("ok.png", 10), ("crash.png", 20), ("after.png", 30)):
+        png = BytesIO()
+        Image.new("L", (width, 10), 255).save(png, format="PNG")
+        uploads.append(UploadFile(BytesIO(png.getvalue()), filename=name))
+    # A multi-page TIFF cut off after its first page fails while splitting.
+    uploads.append(UploadFile(BytesIO(tiff.getvalue()[: len(tiff.getvalue()) - 40]), filename="truncated.tiff"))
+
+    lines = [json.loads(line) async for line in await service.extract_batch(uploads)]
+
+    by_file = {line["filename"]: line for line in lines}
+    assert set(by_file) == {"ok.png", "crash.png", "after.png", "truncated.tiff"}
+    assert by_file["ok.png"]["text"] == "width 10"
+    assert by_file["after.png"]["text"] == "width 30"
+    assert (by_file["crash.png"]["status_code"], by_file["crash.png"]["error"]) == (500, "OCR failed")
+    assert by_file["truncated.tiff"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_uploads_over_the_size_cap_are_rejected(service, monkeypatch):
+    monkeypatch.setattr(ocr_module.settings, "ocr_max_upload_bytes", 8)
+    with pytest.raises(HTTPException) as excinfo:
+        await service.read_upload(UploadFile(BytesIO(b"0123456789"), filename="big.png"))
+    assert excinfo.value.status_code == 413
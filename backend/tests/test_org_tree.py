@@ -0,0 +1,53 @@
+import pytest
+
+from app.services.org_tree import OrgTree, OrgTreeCache
+
+
+def test_chains_follow_managers_and_are_updated_for_the_whole_subtree():
+    tree = OrgTree({"ceo": None, "vp": "ceo", "director": "vp", "lead": "director", "dev": "lead"})
+
+    assert tree.ancestors("dev") == ("lead", "director", "vp", "ceo")
+    assert tree.management_chain("lead") == ("lead", "director", "vp", "ceo")
+
+    tree.set_manager("director", "ceo")
+    assert tree.ancestors("dev") == ("lead", "director", "ceo")
+
+    tree.remove("director")
+    assert tree.ancestors("dev") == ("lead",)
+
+
+def test_cycles_are_detected_and_existing_ones_do_not_loop():
+    tree = OrgTree({"ceo": None, "vp": "ceo", "dev": "vp"})
+
+    assert tree.would_cycle("vp", "dev")
+    assert tree.would_cycle("vp", "vp")
+    assert not tree.would_cycle("dev", "ceo")
+    assert not tree.would_cycle("dev", None)
+
+    looped = OrgTree({"a": "b", "b": "c", "c": "a", "d": "a"})
+    assert looped.ancestors("a") == ("b", "c")
+    assert looped.ancestors("d") == ("a", "b", "c")
+
+
+class FakeUserRepository:
+    def __init__(self):
+        self.scans = 0
+
+    async def list_users_by_company(self, company_id, projection=None):
+        self.scans += 1
+        return [{"_id": "ceo"}, {"_id": "vp", "manager_id": "ceo"}, {"_id": "dev", "manager_id": "vp"}]
+
+
+@pytest.mark.asyncio
+async def test_tree_is_built_from_one_scan_and_edited_in_place():
+    cache = OrgTreeCache(max_entries=10, ttl_seconds=60)
+    cache.user_repo = FakeUserRepository()
+
+    tree = await cache.get("company-1")
+    assert tree.ancestors("dev") == ("vp", "ceo")
+
+    cache.set_manager("company-1", "new", "dev")
+    cache.remove_user("company-1", "vp")
+    tree = await cache.get("company-1")
+    assert tree.ancestors("new") == ("dev",)
+    assert cache.user_repo.scans == 1
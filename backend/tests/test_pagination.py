@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.schemas.expense import ExpenseListResponse, ExpensePartial, ExpensePublic
+from app.utils.pagination import decode_cursor, encode_cursor, next_cursor
+
+
+def test_cursor_round_trip():
+    document = {"created_at": datetime(2024, 5, 1, 12, 30), "_id": ObjectId()}
+    assert decode_cursor(encode_cursor(document)) == (document["created_at"], document["_id"])
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_next_cursor_only_when_page_is_full():
+    documents = [{"created_at": datetime(2024, 5, day), "_id": ObjectId()} for day in (1, 2)]
+    assert next_cursor(documents, None) is None
+    assert next_cursor(documents, 3) is None
+    assert decode_cursor(next_cursor(documents, 2))[1] == documents[-1]["_id"]
+
+
+def test_list_response_accepts_projected_expenses():
+    response = ExpenseListResponse(expenses=[{"id": "abc", "title": "Taxi"}])
+    assert isinstance(response.expenses[0], ExpensePartial)
+    assert response.model_dump()["expenses"] == [{"id": "abc", "title": "Taxi"}]
+    assert not isinstance(response.expenses[0], ExpensePublic)
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.db.repositories.expense_repository import ExpenseRepository
+from scripts import backfill_current_approver
+from scripts.backfill_current_approver import current_approver_for
+from tests.fake_mongo import FakeCollection
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(ExpenseRepository, "collection", property(lambda self: collection))
+    monkeypatch.setattr(backfill_current_approver, "get_collection", lambda name: collection)
+
+    async def reconcile_indexes(collection, indexes):
+        return None
+
+    monkeypatch.setattr(backfill_current_approver, "reconcile_indexes", reconcile_indexes)
+    return collection
+
+
+def _expense(status="pending", step=0, sequence=("manager", "director"), day=1, **fields):
+    return {
+        "_id": ObjectId(),
+        "company_id": "company-1",
+        "status": status,
+        "approver_sequence": list(sequence),
+        "current_step_index": step,
+        "created_at": datetime(2024, 3, day, tzinfo=timezone.utc),
+        **fields,
+    }
+
+
+def test_current_approver_is_only_set_for_pending_expenses_with_a_step_left():
+    assert current_approver_for(_expense(step=1)) == "director"
+    assert current_approver_for(_expense(status="approved", step=2)) is None
+    assert current_approver_for(_expense(status="rejected", step=0)) is None
+    assert current_approver_for(_expense(step=2)) is None
+    assert current_approver_for(_expense(sequence=())) is None
+
+
+@pytest.mark.asyncio
+async def test_backfill_sets_the_field_once(collection):
+    collection.documents = [
+        _expense(step=1),
+        _expense(status="approved", step=2),
+        _expense(sequence=()),
+        _expense(current_approver_id="manager"),
+    ]
+
+    assert await backfill_current_approver.backfill(batch_size=2) == 3
+    assert [document["current_approver_id"] for document in collection.documents] == ["director", None, None, "manager"]
+    assert await backfill_current_approver.backfill(batch_size=2) == 0
+
+
+@pytest.mark.asyncio
+async def test_pending_queue_filters_on_the_current_approver(collection):
+    collection.documents = [
+        _expense(day=3, current_approver_id="manager"),
+        _expense(day=1, current_approver_id="manager"),
+        _expense(step=1, current_approver_id="director"),
+        _expense(status="approved", step=2, current_approver_id=None),
+        _expense(current_approver_id="manager", company_id="company-2"),
+    ]
+
+    pending = await ExpenseRepository().list_pending_for_approver("company-1", "manager")
+
+    assert [document["_id"] for document in pending] == [collection.documents[1]["_id"], collection.documents[0]["_id"]]
+    assert await ExpenseRepository().list_pending_for_approver("company-1", "nobody") == []
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.rollup_service import RollupService
+
+
+class FakeRollupRepository:
+    def __init__(self):
+        self.deltas = []
+
+    async def apply_deltas(self, deltas):
+        self.deltas.extend(deltas)
+
+
+def _expense(**overrides):
+    expense = {
+        "company_id": "c1",
+        "employee_id": "e1",
+        "category": "Travel",
+        "status": "pending",
+        "company_currency": "USD",
+        "expense_date": datetime(2024, 5, 3),
+        "converted_amount": 100.0,
+    }
+    expense.update(overrides)
+    return expense
+
+
+@pytest.fixture
+def service():
+    service = RollupService()
+    service.repo = FakeRollupRepository()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_status_change_moves_amount_between_buckets(service):
+    before = _expense()
+    await service.record_changes([(None, before), (before, {**before, "status": "approved"})])
+
+    totals = {key["status"]: (amount, count) for key, amount, count in service.repo.deltas}
+    assert totals == {"approved": (100.0, 1)}
+    assert service.repo.deltas[0][0]["month"] == "2024-05"
+
+
+@pytest.mark.asyncio
+async def test_amount_change_applies_difference_and_step_changes_are_ignored(service):
+    before = _expense()
+    await service.record_changes(
+        [
+            (before, {**before, "converted_amount": 130.0}),
+            (before, {**before, "current_step_index": 1}),
+        ]
+    )
+
+    [(key, amount, count)] = service.repo.deltas
+    assert key["status"] == "pending"
+    assert amount == pytest.approx(30.0)
+    assert count == 0
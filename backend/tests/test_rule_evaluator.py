@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+from app.services.rule_evaluator import CompiledRule, RuleEvaluatorCache
+
+
+def _expense(sequence, step=0, **counters):
+    return {"approver_sequence": sequence, "current_step_index": step, "approval_history": [], **counters}
+
+
+def test_sequence_puts_manager_first_and_drops_duplicates():
+    rule = CompiledRule.from_rule(
+        {"id": "r1", "rule_type": "specific", "order": ["a", "m", "b"], "approver_ids": ["b", "c"], "specific_approver_id": "a"}
+    )
+
+    assert rule.approver_sequence({"manager_id": "m", "is_manager_approver": True}) == ["m", "a", "b", "c"]
+    assert rule.approver_sequence({"manager_id": "m", "is_manager_approver": False}) == ["a", "m", "b", "c"]
+
+
+def test_percentage_threshold_uses_running_counter():
+    rule = CompiledRule.from_rule({"id": "r1", "rule_type": "percentage", "percentage_threshold": 50})
+    sequence = ["a", "b", "c", "d"]
+
+    first = rule.evaluate(_expense(sequence, approval_count=0, specific_approved=False), "a", True)
+    assert first == {"approval_count": 1, "specific_approved": False, "current_step_index": 1, "current_approver_id": "b"}
+
+    second = rule.evaluate(_expense(sequence, step=1, approval_count=1, specific_approved=False), "b", True)
+    assert second["status"] == "approved"
+    assert second["approval_count"] == 2
+    assert second["current_approver_id"] is None
+
+
+def test_specific_approver_and_rejection():
+    rule = CompiledRule.from_rule({"id": "r1", "rule_type": "hybrid", "percentage_threshold": 100, "specific_approver_id": "b"})
+    sequence = ["a", "b", "c"]
+
+    update = rule.evaluate(_expense(sequence, step=1, approval_count=1, specific_approved=False), "b", True)
+    assert update["status"] == "approved"
+    assert update["specific_approved"] is True
+
+    rejected = rule.evaluate(_expense(sequence, approval_count=0, specific_approved=False), "a", False)
+    assert rejected == {"status": "rejected", "current_step_index": 3, "current_approver_id": None}
+
+
+def test_legacy_expense_counters_come_from_history():
+    rule = CompiledRule.from_rule({"id": "r1", "rule_type": "percentage", "percentage_threshold": 60})
+    expense = _expense(["a", "b", "c"], step=1)
+    expense["approval_history"] = [{"approver_id": "a", "decision": "approved"}]
+
+    update = rule.evaluate(expense, "b", True)
+    assert update["approval_count"] == 2
+    assert update["status"] == "approved"
+
+
+def test_compiled_rules_are_reused_until_the_rule_changes():
+    cache = RuleEvaluatorCache(max_entries=10, ttl_seconds=60)
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rule = {"id": "r1", "rule_type": "specific", "specific_approver_id": "a", "updated_at": created}
+
+    compiled = cache.compile(rule)
+    assert cache.compile(dict(rule)) is compiled
+    assert cache.current("r1") is compiled
+
+    cache.invalidate("r1")
+    assert cache.current("r1") is None
+    changed = cache.compile({**rule, "specific_approver_id": "b", "updated_at": datetime(2024, 2, 1, tzinfo=timezone.utc)})
+    assert changed is not compiled
+    assert changed.specific_approver_id == "b"
+
+
+def test_amounts_above_the_escalation_threshold_add_management_levels():
+    rule = CompiledRule.from_rule(
+        {"id": "r1", "rule_type": "percentage", "approver_ids": ["finance", "vp"], "escalation_amount": 1000, "escalation_manager_levels": 3}
+    )
+    employee = {"manager_id": "lead", "is_manager_approver": True}
+    managers = ("lead", "director", "vp", "ceo")
+
+    assert rule.approver_sequence(employee, managers, 500) == ["lead", "finance", "vp"]
+    assert rule.approver_sequence(employee, managers, 5000) == ["lead", "director", "vp", "finance"]
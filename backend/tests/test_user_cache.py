@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.core.security import create_access_token
+from app.dependencies import auth
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService, user_cache
+
+USER_ID = ObjectId()
+
+
+class FakeUserRepository:
+    def __init__(self):
+        self.user = {"_id": USER_ID, "company_id": "company-1", "role": "employee", "is_active": True, "password_hash": "x"}
+        self.reads = 0
+        # When set, reads return the document as it was and then wait, like a slow query.
+        self.pause_reads: asyncio.Event | None = None
+
+    async def get_user_by_id(self, user_id):
+        self.reads += 1
+        snapshot = dict(self.user) if self.user else None
+        if self.pause_reads is not None:
+            await self.pause_reads.wait()
+        return snapshot
+
+    async def update_user(self, user_id, update_data):
+        self.user.update(update_data)
+        return True
+
+    async def delete_user(self, user_id):
+        self.user = None
+        return True
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    repo = FakeUserRepository()
+    monkeypatch.setattr(auth, "UserRepository", lambda: repo)
+    user_cache.clear()
+    yield repo
+    user_cache.clear()
+
+
+@pytest.fixture
+def token():
+    return create_access_token(str(USER_ID), {"role": "employee", "company_id": "company-1"})
+
+
+def _service(repo):
+    service = UserService()
+    service.user_repo = repo
+    return service
+
+
+@pytest.mark.asyncio
+async def test_role_change_and_deletion_are_seen_on_the_next_request(repo, token):
+    assert (await auth.get_current_user(token))["role"] == "employee"
+    await auth.get_current_user(token)
+    assert repo.reads == 1
+
+    await _service(repo).update_user("company-1", str(USER_ID), UserUpdate(role="manager"))
+    assert (await auth.get_current_user(token))["role"] == "manager"
+
+    await _service(repo).delete_user("company-1", str(USER_ID))
+    with pytest.raises(HTTPException) as excinfo:
+        await auth.get_current_user(token)
+    assert excinfo.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_a_read_that_raced_with_an_update_is_not_cached(repo, token):
+    slow_read = repo.pause_reads = asyncio.Event()
+    stale_request = asyncio.create_task(auth.get_current_user(token))
+    await asyncio.sleep(0)
+
+    repo.pause_reads = None
+    await _service(repo).update_user("company-1", str(USER_ID), UserUpdate(role="manager"))
+    slow_read.set()
+
+    assert (await stale_request)["role"] == "employee"
+    assert (await auth.get_current_user(token))["role"] == "manager"